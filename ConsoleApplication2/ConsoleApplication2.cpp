@@ -3,9 +3,21 @@
 #include <vector>
 #include <iomanip>
 #include <cstring>
+#include <cstdlib>
 #include <algorithm>
+#include <string>
+#include <stdexcept>
+#include <chrono>
+#include <new>
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <exception>
+#include <cerrno>
 #include <unistd.h>
+#include <fcntl.h>
 #include <sys/stat.h>
+#include <sys/mman.h>
 
 
 const size_t BLOCK_SIZE = 64; 
@@ -180,7 +192,8 @@ void E_function(unsigned char* K, unsigned char* m, unsigned char* result) {
 }
 
 
-void g_function(unsigned char* h, unsigned char* N, unsigned char* m) {
+// Эталонная (побайтовая) реализация функции сжатия; оставлена для перекрёстной проверки
+void g_function_reference(unsigned char* h, const unsigned char* N, const unsigned char* m) {
     unsigned char K[64];
     memcpy(K, h, 64);
 
@@ -199,6 +212,213 @@ void g_function(unsigned char* h, unsigned char* N, unsigned char* m) {
     }
 }
 
+// Табличная реализация: S, P и L объединены в 8 таблиц по 256 64-битных слов.
+// Состояние — 8 строк по 8 байт в порядке little-endian; строка i результата LPS
+// равна XOR по j значений LPS_TABLE[j][байт i строки j].
+uint64_t LPS_TABLE[8][256];
+
+void initLpsTables() {
+    // Строка матрицы L для бита bit: 8 байт C[0][63 - bit + k] (как в L_transform,
+    // при bit = 0 чтение продолжается в C[1])
+    const unsigned char* window = &C[0][0];
+    uint64_t rows[64];
+    for (int bit = 0; bit < 64; ++bit) {
+        uint64_t row = 0;
+        for (int k = 0; k < 8; ++k) {
+            row |= static_cast<uint64_t>(window[63 - bit + k]) << (8 * k);
+        }
+        rows[bit] = row;
+    }
+    for (int j = 0; j < 8; ++j) {
+        for (int b = 0; b < 256; ++b) {
+            uint64_t acc = 0;
+            for (int t = 0; t < 8; ++t) {
+                if (Pi[b] & (0x80 >> t)) {
+                    acc ^= rows[8 * j + t];
+                }
+            }
+            LPS_TABLE[j][b] = acc;
+        }
+    }
+}
+
+inline void LPS_table(const uint64_t* in, uint64_t* out) {
+    for (int i = 0; i < 8; ++i) {
+        const int shift = 8 * i;
+        out[i] = LPS_TABLE[0][(in[0] >> shift) & 0xFF] ^ LPS_TABLE[1][(in[1] >> shift) & 0xFF]
+            ^ LPS_TABLE[2][(in[2] >> shift) & 0xFF] ^ LPS_TABLE[3][(in[3] >> shift) & 0xFF]
+            ^ LPS_TABLE[4][(in[4] >> shift) & 0xFF] ^ LPS_TABLE[5][(in[5] >> shift) & 0xFF]
+            ^ LPS_TABLE[6][(in[6] >> shift) & 0xFF] ^ LPS_TABLE[7][(in[7] >> shift) & 0xFF];
+    }
+}
+
+void g_function_table(unsigned char* h, const unsigned char* N, const unsigned char* m) {
+    uint64_t hv[8], nv[8], mv[8], s[8], t[8];
+    memcpy(hv, h, 64);
+    memcpy(nv, N, 64);
+    memcpy(mv, m, 64);
+
+    LPS_table(hv, s);
+    for (int r = 1; r < 12; ++r) {
+        LPS_table(s, t);
+        memcpy(s, t, 64);
+    }
+    for (int i = 0; i < 8; ++i) {
+        t[i] = s[i] ^ hv[i] ^ nv[i];
+    }
+    LPS_table(t, s);
+    for (int i = 0; i < 8; ++i) {
+        hv[i] = s[i] ^ mv[i];
+    }
+    memcpy(h, hv, 64);
+}
+
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#include <immintrin.h>
+#define STRIBOG_HAVE_AVX2 1
+
+// AVX2: 4 строки результата за раз через _mm256_i64gather_epi64 из таблицы каждой входной строки
+__attribute__((target("avx2")))
+static inline void LPS_avx2(const uint64_t* in, uint64_t* out) {
+    const __m256i shiftsLo = _mm256_set_epi64x(24, 16, 8, 0);
+    const __m256i shiftsHi = _mm256_set_epi64x(56, 48, 40, 32);
+    const __m256i mask = _mm256_set1_epi64x(0xFF);
+    __m256i lo = _mm256_setzero_si256();
+    __m256i hi = _mm256_setzero_si256();
+    for (int j = 0; j < 8; ++j) {
+        const __m256i v = _mm256_set1_epi64x(static_cast<long long>(in[j]));
+        const long long* table = reinterpret_cast<const long long*>(LPS_TABLE[j]);
+        lo = _mm256_xor_si256(lo, _mm256_i64gather_epi64(table, _mm256_and_si256(_mm256_srlv_epi64(v, shiftsLo), mask), 8));
+        hi = _mm256_xor_si256(hi, _mm256_i64gather_epi64(table, _mm256_and_si256(_mm256_srlv_epi64(v, shiftsHi), mask), 8));
+    }
+    _mm256_storeu_si256(reinterpret_cast<__m256i*>(out), lo);
+    _mm256_storeu_si256(reinterpret_cast<__m256i*>(out + 4), hi);
+}
+
+__attribute__((target("avx2")))
+void g_function_avx2(unsigned char* h, const unsigned char* N, const unsigned char* m) {
+    alignas(32) uint64_t hv[8], s[8], t[8];
+    memcpy(hv, h, 64);
+
+    LPS_avx2(hv, s);
+    for (int r = 1; r < 12; ++r) {
+        LPS_avx2(s, t);
+        memcpy(s, t, 64);
+    }
+    for (int half = 0; half < 64; half += 32) {
+        __m256i x = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(reinterpret_cast<unsigned char*>(s) + half));
+        x = _mm256_xor_si256(x, _mm256_loadu_si256(reinterpret_cast<const __m256i*>(h + half)));
+        x = _mm256_xor_si256(x, _mm256_loadu_si256(reinterpret_cast<const __m256i*>(N + half)));
+        _mm256_storeu_si256(reinterpret_cast<__m256i*>(reinterpret_cast<unsigned char*>(t) + half), x);
+    }
+    LPS_avx2(t, s);
+    for (int half = 0; half < 64; half += 32) {
+        __m256i x = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(reinterpret_cast<unsigned char*>(s) + half));
+        x = _mm256_xor_si256(x, _mm256_loadu_si256(reinterpret_cast<const __m256i*>(m + half)));
+        _mm256_storeu_si256(reinterpret_cast<__m256i*>(h + half), x);
+    }
+}
+#endif
+
+typedef void (*GFunction)(unsigned char* h, const unsigned char* N, const unsigned char* m);
+
+struct GImplementation {
+    const char* name;
+    GFunction func;
+    bool (*supported)();
+};
+
+static bool alwaysSupported() { return true; }
+#ifdef STRIBOG_HAVE_AVX2
+static bool avx2Supported() { return __builtin_cpu_supports("avx2"); }
+#endif
+
+const GImplementation G_IMPLEMENTATIONS[] = {
+#ifdef STRIBOG_HAVE_AVX2
+    { "avx2", g_function_avx2, avx2Supported },
+#endif
+    { "table", g_function_table, alwaysSupported },
+    { "reference", g_function_reference, alwaysSupported },
+};
+const size_t G_IMPLEMENTATION_COUNT = sizeof(G_IMPLEMENTATIONS) / sizeof(G_IMPLEMENTATIONS[0]);
+
+// Выбор реализации при первом вызове: самая быстрая из поддерживаемых процессором
+// или заданная переменной окружения STRIBOG_IMPL (avx2, table, reference).
+// Неизвестная или не поддерживаемая процессором STRIBOG_IMPL даёт предупреждение
+// в stderr и самую быструю из поддерживаемых реализаций.
+static const GImplementation* selectGImplementation() {
+    initLpsTables();
+    const GImplementation* fastest = nullptr;
+    for (size_t i = 0; i < G_IMPLEMENTATION_COUNT && !fastest; ++i) {
+        if (G_IMPLEMENTATIONS[i].supported()) {
+            fastest = &G_IMPLEMENTATIONS[i];
+        }
+    }
+    const char* forced = getenv("STRIBOG_IMPL");
+    if (!forced || !*forced) {
+        return fastest;
+    }
+    for (size_t i = 0; i < G_IMPLEMENTATION_COUNT; ++i) {
+        const GImplementation& impl = G_IMPLEMENTATIONS[i];
+        if (strcmp(forced, impl.name) == 0 && impl.supported()) {
+            return &impl;
+        }
+    }
+    std::cerr << "Warning: STRIBOG_IMPL=" << forced << " is unknown or not supported by this CPU, using "
+              << fastest->name << std::endl;
+    return fastest;
+}
+
+const GImplementation& activeGImplementation() {
+    static const GImplementation* impl = selectGImplementation();
+    return *impl;
+}
+
+void g_function(unsigned char* h, const unsigned char* N, const unsigned char* m) {
+    static const GFunction func = activeGImplementation().func;
+    func(h, N, m);
+}
+
+// Сверяет все поддерживаемые реализации с эталонной на случайных входах.
+bool selfTestGImplementations(int rounds) {
+    activeGImplementation();
+    unsigned int seed = 12345;
+    auto next = [&seed]() { seed = seed * 1103515245u + 12345u; return static_cast<unsigned char>(seed >> 16); };
+    for (int r = 0; r < rounds; ++r) {
+        unsigned char h[64], N[64], m[64], expected[64];
+        for (int i = 0; i < 64; ++i) {
+            h[i] = next();
+            N[i] = next();
+            m[i] = next();
+        }
+        memcpy(expected, h, 64);
+        g_function_reference(expected, N, m);
+        for (size_t i = 0; i < G_IMPLEMENTATION_COUNT; ++i) {
+            const GImplementation& impl = G_IMPLEMENTATIONS[i];
+            if (!impl.supported()) {
+                continue;
+            }
+            unsigned char actual[64];
+            memcpy(actual, h, 64);
+            impl.func(actual, N, m);
+            if (memcmp(actual, expected, 64) != 0) {
+                std::cerr << "Self-test failed: " << impl.name << std::endl;
+                return false;
+            }
+        }
+    }
+    return true;
+}
+
+
+// Сериализованное состояние хешера (контрольная точка), формат общий с hashing.StribogHash.export_state:
+//   "STRBST01", размер хеша (1 байт), длина буфера (1 байт), 6 байт резерва (в контрольной точке
+//   --state — отпечаток файла, см. fileFingerprint),
+//   totalSize (uint64 LE), h, N, Sigma, buffer (по 64 байта)
+const size_t STATE_SIZE = 280;
+const unsigned char STATE_MAGIC[8] = { 'S', 'T', 'R', 'B', 'S', 'T', '0', '1' };
+const size_t STATE_H = 24, STATE_N = 88, STATE_SIGMA = 152, STATE_BUFFER = 216;
+const size_t STATE_FINGERPRINT = 10, FINGERPRINT_SIZE = 6;
 
 class StribogHash {
 private:
@@ -227,24 +447,92 @@ public:
     void update(const unsigned char* data, size_t len) {
         totalSize += len;
 
-        while (len > 0) {
+        if (bufferSize > 0) {
             size_t toCopy = std::min(BLOCK_SIZE - bufferSize, len);
             memcpy(buffer + bufferSize, data, toCopy);
             bufferSize += toCopy;
             data += toCopy;
             len -= toCopy;
 
-            if (bufferSize == BLOCK_SIZE) {
-                processBlock();
-                bufferSize = 0;
+            if (bufferSize < BLOCK_SIZE) {
+                return;
             }
+            processBlock(buffer);
+            bufferSize = 0;
+        }
+
+        // Полные блоки сжимаются прямо из входных данных, без копирования в buffer
+        if (len >= BLOCK_SIZE) {
+            while (len >= BLOCK_SIZE) {
+                processBlock(data);
+                data += BLOCK_SIZE;
+                len -= BLOCK_SIZE;
+            }
+            // final() не затирает последний байт buffer, поэтому он должен
+            // совпадать с последним байтом сжатого блока, как при копировании
+            buffer[BLOCK_SIZE - 1] = data[-1];
+        }
+
+        if (len > 0) {
+            memcpy(buffer, data, len);
+            bufferSize = len;
+        }
+    }
+
+    size_t digestSize() const {
+        return is_512 ? HASH_SIZE_512 : HASH_SIZE_256;
+    }
+
+    uint64_t processedBytes() const {
+        return totalSize;
+    }
+
+    void exportState(unsigned char* out) const {
+        memcpy(out, STATE_MAGIC, sizeof(STATE_MAGIC));
+        out[8] = static_cast<unsigned char>(is_512 ? HASH_SIZE_512 : HASH_SIZE_256);
+        out[9] = static_cast<unsigned char>(bufferSize);
+        memset(out + 10, 0, 6);
+        for (int i = 0; i < 8; ++i) {
+            out[16 + i] = static_cast<unsigned char>(totalSize >> (8 * i));
+        }
+        memcpy(out + STATE_H, h, BLOCK_SIZE);
+        memcpy(out + STATE_N, N, BLOCK_SIZE);
+        memcpy(out + STATE_SIGMA, Sigma, BLOCK_SIZE);
+        // Кроме данных буфера сохраняется только его последний байт, который final() не затирает
+        memset(out + STATE_BUFFER, 0, BLOCK_SIZE);
+        memcpy(out + STATE_BUFFER, buffer, bufferSize);
+        if (bufferSize < BLOCK_SIZE - 1) {
+            out[STATE_BUFFER + BLOCK_SIZE - 1] = buffer[BLOCK_SIZE - 1];
         }
     }
 
-    void processBlock() {
+    void importState(const unsigned char* in) {
+        if (memcmp(in, STATE_MAGIC, sizeof(STATE_MAGIC)) != 0) {
+            throw std::runtime_error("Invalid state");
+        }
+        if (in[8] != HASH_SIZE_256 && in[8] != HASH_SIZE_512) {
+            throw std::runtime_error("Invalid state digest size");
+        }
+        uint64_t size = 0;
+        for (int i = 0; i < 8; ++i) {
+            size |= static_cast<uint64_t>(in[16 + i]) << (8 * i);
+        }
+        if (in[9] >= BLOCK_SIZE || size % BLOCK_SIZE != in[9]) {
+            throw std::runtime_error("Invalid state buffer length");
+        }
+        is_512 = in[8] == HASH_SIZE_512;
+        bufferSize = in[9];
+        totalSize = size;
+        memcpy(h, in + STATE_H, BLOCK_SIZE);
+        memcpy(N, in + STATE_N, BLOCK_SIZE);
+        memcpy(Sigma, in + STATE_SIGMA, BLOCK_SIZE);
+        memcpy(buffer, in + STATE_BUFFER, BLOCK_SIZE);
+    }
+
+    void processBlock(const unsigned char* block) {
         
         unsigned char carry = 0;
-        for (int i = 0; i < BLOCK_SIZE; ++i) {
+        for (size_t i = 0; i < BLOCK_SIZE; ++i) {
             unsigned int sum = N[i] + (BLOCK_SIZE * 8) + carry;
             N[i] = sum & 0xFF;
             carry = sum >> 8;
@@ -252,14 +540,14 @@ public:
 
         
         carry = 0;
-        for (int i = 0; i < BLOCK_SIZE; ++i) {
-            unsigned int sum = Sigma[i] + buffer[i] + carry;
+        for (size_t i = 0; i < BLOCK_SIZE; ++i) {
+            unsigned int sum = Sigma[i] + block[i] + carry;
             Sigma[i] = sum & 0xFF;
             carry = sum >> 8;
         }
 
         
-        g_function(h, N, buffer);
+        g_function(h, N, block);
     }
 
     void final(unsigned char* hash) {
@@ -269,7 +557,7 @@ public:
             buffer[bufferSize] = 0x01;
         }
 
-        processBlock();
+        processBlock(buffer);
 
         unsigned char zeroBlock[BLOCK_SIZE] = { 0 };
         g_function(h, N, zeroBlock);
@@ -286,8 +574,381 @@ public:
     }
 };
 
+// Статистика хеширования для флага --stats
+struct HashStats {
+    double readSeconds = 0;
+    double compressSeconds = 0;
+    double finalSeconds = 0;
+    uint64_t bytes = 0;
+    uint64_t blocks = 0;
+};
+
+double secondsSince(std::chrono::steady_clock::time_point start) {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+// Два состояния (256 и 512 бит), получающие одни и те же данные за одно чтение входа.
+// Данные подаются окнами, чтобы второе состояние читало их ещё из кеша процессора.
+class DualStribogHash {
+public:
+    StribogHash h256;
+    StribogHash h512;
+
+    DualStribogHash() : h256(false), h512(true) {}
+
+    void update(const unsigned char* data, size_t len) {
+        const size_t WINDOW = 64 * 1024;
+        while (len > 0) {
+            size_t n = std::min(WINDOW, len);
+            h256.update(data, n);
+            h512.update(data, n);
+            data += n;
+            len -= n;
+        }
+    }
+};
+
+// Размер порции чтения и число буферов конвейера чтения (--chunk-size меняет размер порции)
+size_t readChunkSize = 1024 * 1024;
+const size_t READ_AHEAD_BUFFERS = 3;
+
+// Конвейер чтения: поток-читатель заполняет кольцо из READ_AHEAD_BUFFERS заранее выделенных
+// буферов, пока вызывающий поток обрабатывает предыдущий, поэтому диск и процессор не ждут
+// друг друга. read(buf, size) возвращает число прочитанных байт (0 — конец данных),
+// consume(buf, n) вызывается по порядку в вызывающем потоке.
+// Первая порция читается синхронно, поток-читатель запускается, только если данные остались.
+// remaining — сколько байт осталось в обычном файле (-1, если неизвестно): файл короче порции
+// читается одним вызовом read в буфер по его размеру, без потока и без буферов конвейера.
+template <typename Reader, typename Consumer>
+void readAhead(Reader read, Consumer consume, HashStats* stats = nullptr, long long remaining = -1) {
+    const size_t chunkSize = readChunkSize;
+    size_t firstSize = chunkSize;
+    if (remaining >= 0 && static_cast<unsigned long long>(remaining) < chunkSize) {
+        firstSize = static_cast<size_t>(remaining) + 1;
+    }
+    {
+        std::vector<unsigned char> first(firstSize);
+        auto t0 = std::chrono::steady_clock::now();
+        size_t n = read(first.data(), firstSize);
+        if (stats) {
+            stats->readSeconds += secondsSince(t0);
+        }
+        if (n == 0) {
+            return;
+        }
+        t0 = std::chrono::steady_clock::now();
+        consume(first.data(), n);
+        if (stats) {
+            stats->compressSeconds += secondsSince(t0);
+            stats->bytes += n;
+        }
+        // Короткое чтение обычного файла — конец данных
+        if (remaining >= 0 && n < firstSize) {
+            return;
+        }
+    }
+
+    std::vector<std::vector<unsigned char>> buffers(READ_AHEAD_BUFFERS, std::vector<unsigned char>(chunkSize));
+    std::vector<size_t> sizes(READ_AHEAD_BUFFERS);
+    std::mutex mutex;
+    std::condition_variable changed;
+    size_t produced = 0, consumed = 0;
+    bool stop = false;
+    std::exception_ptr error;
+
+    std::thread reader([&] {
+        try {
+            while (true) {
+                {
+                    std::unique_lock<std::mutex> lock(mutex);
+                    changed.wait(lock, [&] { return stop || produced - consumed < READ_AHEAD_BUFFERS; });
+                    if (stop) {
+                        return;
+                    }
+                }
+                size_t slot = produced % READ_AHEAD_BUFFERS;
+                size_t n = read(buffers[slot].data(), chunkSize);
+                {
+                    std::lock_guard<std::mutex> lock(mutex);
+                    sizes[slot] = n;
+                    ++produced;
+                }
+                changed.notify_all();
+                if (n == 0) {
+                    return;
+                }
+            }
+        }
+        catch (...) {
+            std::lock_guard<std::mutex> lock(mutex);
+            error = std::current_exception();
+            changed.notify_all();
+        }
+    });
+
+    try {
+        while (true) {
+            size_t slot, n;
+            {
+                auto t0 = std::chrono::steady_clock::now();
+                std::unique_lock<std::mutex> lock(mutex);
+                changed.wait(lock, [&] { return consumed < produced || error; });
+                if (consumed == produced) {
+                    std::rethrow_exception(error);
+                }
+                slot = consumed % READ_AHEAD_BUFFERS;
+                n = sizes[slot];
+                if (stats) {
+                    stats->readSeconds += secondsSince(t0);
+                }
+            }
+            if (n == 0) {
+                break;
+            }
+            auto t0 = std::chrono::steady_clock::now();
+            consume(buffers[slot].data(), n);
+            if (stats) {
+                stats->compressSeconds += secondsSince(t0);
+                stats->bytes += n;
+            }
+            {
+                std::lock_guard<std::mutex> lock(mutex);
+                ++consumed;
+            }
+            changed.notify_all();
+        }
+    }
+    catch (...) {
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            stop = true;
+        }
+        changed.notify_all();
+        reader.join();
+        throw;
+    }
+    reader.join();
+}
+
+template <typename Hasher>
+void hashStream(std::istream& in, Hasher& hasher, HashStats* stats = nullptr, long long remaining = -1) {
+    readAhead(
+        [&](unsigned char* buffer, size_t size) {
+            in.read(reinterpret_cast<char*>(buffer), size);
+            return static_cast<size_t>(in.gcount());
+        },
+        [&](const unsigned char* data, size_t n) { hasher.update(data, n); },
+        stats, remaining);
+}
+
+// Файлы, изменённые меньше MMAP_MIN_AGE секунд назад, считаются дописываемыми и читаются через
+// read(): усечение отображённого файла во время чтения завершает процесс сигналом SIGBUS.
+const long long MMAP_MIN_AGE = 2;
+// Отображение хешируется окнами; перед каждым окном проверяется, что файл не стал короче.
+// Усечение внутри окна по-прежнему приводит к SIGBUS — проверка только сужает это окно.
+const size_t MMAP_WINDOW = 64 * 1024 * 1024;
+
+// Хеширует обычный файл через mmap: блоки сжимаются прямо из отображённой памяти.
+// Возвращает false, если отобразить файл нельзя (пустой файл, не обычный файл и т.п.)
+// или он недавно изменялся (см. MMAP_MIN_AGE).
+template <typename Hasher>
+bool hashMappedFile(const char* filename, Hasher& hasher) {
+    int fd = open(filename, O_RDONLY);
+    if (fd < 0) {
+        throw std::runtime_error("Cannot open file");
+    }
+    struct stat s;
+    long long now = static_cast<long long>(std::chrono::system_clock::to_time_t(std::chrono::system_clock::now()));
+    if (fstat(fd, &s) != 0 || !S_ISREG(s.st_mode) || s.st_size == 0
+        || now - static_cast<long long>(s.st_mtime) < MMAP_MIN_AGE) {
+        close(fd);
+        return false;
+    }
+    size_t size = static_cast<size_t>(s.st_size);
+    void* data = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+    if (data == MAP_FAILED) {
+        close(fd);
+        return false;
+    }
+    madvise(data, size, MADV_SEQUENTIAL);
+    for (size_t pos = 0; pos < size; pos += MMAP_WINDOW) {
+        if (fstat(fd, &s) != 0 || static_cast<size_t>(s.st_size) < size) {
+            munmap(data, size);
+            close(fd);
+            throw std::runtime_error("File was truncated while hashing");
+        }
+        hasher.update(static_cast<const unsigned char*>(data) + pos, std::min(MMAP_WINDOW, size - pos));
+    }
+    munmap(data, size);
+    close(fd);
+    return true;
+}
+
+// Читает stdin до конца (имя файла "-")
+template <typename Hasher>
+void hashStdin(Hasher& hasher, HashStats* stats) {
+    readAhead(
+        [](unsigned char* buffer, size_t size) {
+            size_t n = fread(buffer, 1, size, stdin);
+            if (n == 0 && ferror(stdin)) {
+                throw std::runtime_error("Cannot read stdin");
+            }
+            return n;
+        },
+        [&](const unsigned char* data, size_t n) { hasher.update(data, n); },
+        stats);
+}
+
+// Подаёт содержимое файла в hasher; "-" — данные из stdin.
+// Со статистикой файл читается через ifstream, чтобы время чтения и сжатия измерялось раздельно.
+template <typename Hasher>
+void feedFile(const char* filename, Hasher& hasher, HashStats* stats) {
+    if (strcmp(filename, "-") == 0) {
+        hashStdin(hasher, stats);
+        return;
+    }
+    struct stat s;
+    bool known = stat(filename, &s) == 0;
+    if (known && S_ISDIR(s.st_mode)) {
+        throw std::runtime_error("Path is a directory");
+    }
+
+    if (stats || !hashMappedFile(filename, hasher)) {
+        std::ifstream file(filename, std::ios::binary);
+        if (!file) {
+            throw std::runtime_error("Cannot open file");
+        }
+        hashStream(file, hasher, stats, known && S_ISREG(s.st_mode) ? static_cast<long long>(s.st_size) : -1);
+    }
+}
+
 // Ф-я для вычисления хеша файла
-void calculateFileHash(const char* filename, bool is_512bit, unsigned char* hash) {
+void calculateFileHash(const char* filename, bool is_512bit, unsigned char* hash, HashStats* stats = nullptr) {
+    StribogHash hasher(is_512bit);
+    feedFile(filename, hasher, stats);
+
+    auto t0 = std::chrono::steady_clock::now();
+    hasher.final(hash);
+    if (stats) {
+        stats->finalSeconds += secondsSince(t0);
+        // Полные блоки, блок дополнения и два финальных вызова g
+        stats->blocks += stats->bytes / BLOCK_SIZE + 3;
+    }
+}
+
+// Хеши Стрибог-256 и Стрибог-512 за одно чтение файла
+void calculateFileHashes(const char* filename, unsigned char* hash256, unsigned char* hash512,
+                         HashStats* stats = nullptr) {
+    DualStribogHash hasher;
+    feedFile(filename, hasher, stats);
+
+    auto t0 = std::chrono::steady_clock::now();
+    hasher.h256.final(hash256);
+    hasher.h512.final(hash512);
+    if (stats) {
+        stats->finalSeconds += secondsSince(t0);
+        stats->blocks += 2 * (stats->bytes / BLOCK_SIZE + 3);
+    }
+}
+
+// Каждые сколько байт сохраняется контрольная точка при --state
+const uint64_t CHECKPOINT_EVERY = 256ull * 1024 * 1024;
+
+// Отпечаток файла для контрольной точки: первые FINGERPRINT_SIZE байт Стрибог-256 от st_dev,
+// st_ino (uint64 LE) и последнего полного блока перед смещением aligned. Так замена файла
+// обнаруживается, даже если смещение точки выровнено по блоку и незавершённого блока нет.
+void fileFingerprint(std::istream& file, const struct stat& s, uint64_t aligned, unsigned char* out) {
+    unsigned char data[16 + BLOCK_SIZE];
+    const uint64_t id[2] = { static_cast<uint64_t>(s.st_dev), static_cast<uint64_t>(s.st_ino) };
+    for (int k = 0; k < 2; ++k) {
+        for (int i = 0; i < 8; ++i) {
+            data[8 * k + i] = static_cast<unsigned char>(id[k] >> (8 * i));
+        }
+    }
+    size_t n = aligned < BLOCK_SIZE ? static_cast<size_t>(aligned) : BLOCK_SIZE;
+    file.clear();
+    file.seekg(static_cast<std::streamoff>(aligned - n));
+    if (!file.read(reinterpret_cast<char*>(data + 16), n)) {
+        throw std::runtime_error("Cannot read file");
+    }
+    StribogHash hasher(false);
+    hasher.update(data, 16 + n);
+    unsigned char digest[HASH_SIZE_512];
+    hasher.final(digest);
+    memcpy(out, digest, FINGERPRINT_SIZE);
+}
+
+void saveState(const char* stateFile, const StribogHash& hasher, const unsigned char* fingerprint = nullptr) {
+    unsigned char state[STATE_SIZE];
+    hasher.exportState(state);
+    if (fingerprint) {
+        memcpy(state + STATE_FINGERPRINT, fingerprint, FINGERPRINT_SIZE);
+    }
+    // Временный файл сбрасывается на диск до rename: после сбоя на месте точки остаётся
+    // либо старая, либо новая, но не недописанная
+    std::string tmp = std::string(stateFile) + ".tmp";
+    int fd = open(tmp.c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0644);
+    bool written = fd >= 0 && write(fd, state, STATE_SIZE) == static_cast<ssize_t>(STATE_SIZE) && fsync(fd) == 0;
+    if (fd >= 0 && close(fd) != 0) {
+        written = false;
+    }
+    if (!written || rename(tmp.c_str(), stateFile) != 0) {
+        unlink(tmp.c_str());
+        throw std::runtime_error("Cannot write state file");
+    }
+}
+
+// Читает контрольную точку, если она есть и подходит к файлу: файл не короче сохранённого
+// смещения, отпечаток (fileFingerprint) и байты незавершённого блока совпадают с файлом.
+// Иначе, в том числе если точка повреждена (не тот размер, неверный заголовок), хешер
+// не меняется и хеширование начинается с нуля.
+bool loadState(const char* stateFile, std::ifstream& file, const struct stat& s, StribogHash& hasher) {
+    unsigned char state[STATE_SIZE];
+    std::ifstream saved(stateFile, std::ios::binary);
+    if (!saved.read(reinterpret_cast<char*>(state), STATE_SIZE)
+        || saved.peek() != std::char_traits<char>::eof()) {
+        return false;
+    }
+    StribogHash restored;
+    try {
+        restored.importState(state);
+    }
+    catch (const std::runtime_error&) {
+        return false;
+    }
+    if (state[8] != hasher.digestSize()) {
+        throw std::runtime_error("State digest size mismatch");
+    }
+    uint64_t offset = restored.processedBytes();
+    size_t pending = state[9];
+    if (offset > static_cast<uint64_t>(s.st_size)) {
+        return false;
+    }
+    unsigned char fingerprint[FINGERPRINT_SIZE];
+    fileFingerprint(file, s, offset - pending, fingerprint);
+    if (memcmp(fingerprint, state + STATE_FINGERPRINT, FINGERPRINT_SIZE) != 0) {
+        file.clear();
+        file.seekg(0);
+        return false;
+    }
+    unsigned char tail[BLOCK_SIZE];
+    if (!file.read(reinterpret_cast<char*>(tail), pending) || memcmp(tail, state + STATE_BUFFER, pending) != 0) {
+        file.clear();
+        file.seekg(0);
+        return false;
+    }
+    hasher = restored;
+    return true;
+}
+
+// Хеширует файл с контрольной точкой в stateFile: если она подходит, хеширование продолжается
+// с сохранённого смещения. Состояние сохраняется каждые CHECKPOINT_EVERY байт и в конце,
+// поэтому для дописываемого файла следующий запуск хеширует только новые байты.
+void calculateFileHashResumable(const char* filename, bool is_512bit, const char* stateFile,
+                                unsigned char* hash, HashStats* stats = nullptr) {
+    if (strcmp(filename, "-") == 0) {
+        throw std::runtime_error("--state requires a file, not stdin");
+    }
     struct stat s;
     if (stat(filename, &s) == 0 && S_ISDIR(s.st_mode)) {
         throw std::runtime_error("Path is a directory");
@@ -296,26 +957,277 @@ void calculateFileHash(const char* filename, bool is_512bit, unsigned char* hash
     if (!file) {
         throw std::runtime_error("Cannot open file");
     }
-
     StribogHash hasher(is_512bit);
-    unsigned char buffer[4096];
+    loadState(stateFile, file, s, hasher);
+    long long remaining = S_ISREG(s.st_mode)
+        ? static_cast<long long>(s.st_size) - static_cast<long long>(file.tellg()) : -1;
 
-    while (file) {
-        file.read(reinterpret_cast<char*>(buffer), sizeof(buffer));
-        hasher.update(buffer, file.gcount());
-    }
+    // Отпечаток читается через отдельный ifstream: file в это время читает поток-читатель
+    std::ifstream probe(filename, std::ios::binary);
+    auto checkpoint = [&]() {
+        unsigned char fingerprint[FINGERPRINT_SIZE];
+        uint64_t offset = hasher.processedBytes();
+        fileFingerprint(probe, s, offset - offset % BLOCK_SIZE, fingerprint);
+        saveState(stateFile, hasher, fingerprint);
+    };
+
+    uint64_t sinceCheckpoint = 0;
+    readAhead(
+        [&](unsigned char* buffer, size_t size) {
+            file.read(reinterpret_cast<char*>(buffer), size);
+            return static_cast<size_t>(file.gcount());
+        },
+        [&](const unsigned char* data, size_t n) {
+            hasher.update(data, n);
+            sinceCheckpoint += n;
+            if (sinceCheckpoint >= CHECKPOINT_EVERY) {
+                checkpoint();
+                sinceCheckpoint = 0;
+            }
+        },
+        stats, remaining < 0 ? -1 : remaining);
+    checkpoint();
 
+    auto t0 = std::chrono::steady_clock::now();
     hasher.final(hash);
+    if (stats) {
+        stats->finalSeconds += secondsSince(t0);
+        stats->blocks += stats->bytes / BLOCK_SIZE + 3;
+    }
+}
+
+void printStats(const HashStats& stats) {
+    double total = stats.readSeconds + stats.compressSeconds + stats.finalSeconds;
+    std::cerr << std::fixed << std::setprecision(3)
+        << "[STATS] read_ms=" << stats.readSeconds * 1000
+        << " compress_ms=" << stats.compressSeconds * 1000
+        << " final_ms=" << stats.finalSeconds * 1000
+        << " bytes=" << stats.bytes
+        << " blocks=" << stats.blocks
+        << " mb_per_s=" << (total > 0 ? stats.bytes / total / 1e6 : 0.0)
+        << " impl=" << activeGImplementation().name
+        << std::endl;
+}
+
+std::string toHex(const unsigned char* data, size_t len) {
+    static const char digits[] = "0123456789abcdef";
+    std::string out(len * 2, '0');
+    for (size_t i = 0; i < len; ++i) {
+        out[2 * i] = digits[data[i] >> 4];
+        out[2 * i + 1] = digits[data[i] & 0x0F];
+    }
+    return out;
+}
+
+// Режим сервера (--serve): читает запросы из stdin, на каждый отвечает одной строкой.
+//   FILE <путь>\n            -> хеш файла
+//   DATA <длина>\n<байты>    -> хеш переданных данных
+// Ответ: "OK <hex>\n" или "ERR <сообщение>\n"
+int runServer() {
+    std::ios::sync_with_stdio(false);
+    std::string line;
+    while (std::getline(std::cin, line)) {
+        if (!line.empty() && line.back() == '\r') {
+            line.pop_back();
+        }
+        if (line.empty()) {
+            continue;
+        }
+        try {
+            unsigned char hash[HASH_SIZE_512];
+            if (line.compare(0, 5, "FILE ") == 0) {
+                // stdin занят протоколом, поэтому "-" здесь — обычное имя файла
+                std::string path = line.substr(5) == "-" ? "./-" : line.substr(5);
+                calculateFileHash(path.c_str(), true, hash);
+            }
+            else if (line.compare(0, 5, "DATA ") == 0) {
+                char* end = nullptr;
+                unsigned long long len = std::strtoull(line.c_str() + 5, &end, 10);
+                if (end == line.c_str() + 5 || *end != '\0') {
+                    throw std::runtime_error("Invalid data length");
+                }
+                StribogHash hasher(true);
+                unsigned char buffer[4096];
+                while (len > 0) {
+                    size_t toRead = static_cast<size_t>(std::min<unsigned long long>(len, sizeof(buffer)));
+                    std::cin.read(reinterpret_cast<char*>(buffer), toRead);
+                    if (static_cast<size_t>(std::cin.gcount()) != toRead) {
+                        std::cout << "ERR Unexpected end of input" << std::endl;
+                        return 1;
+                    }
+                    hasher.update(buffer, toRead);
+                    len -= toRead;
+                }
+                hasher.final(hash);
+            }
+            else {
+                throw std::runtime_error("Unknown command");
+            }
+            std::cout << "OK " << toHex(hash, HASH_SIZE_512) << std::endl;
+        }
+        catch (const std::exception& e) {
+            std::cout << "ERR " << e.what() << std::endl;
+        }
+    }
+    return 0;
+}
+
+// C ABI для сборки разделяемой библиотекой (ctypes в external_gost):
+//   g++ -O2 -shared -fPIC -DSTRIBOG_NO_MAIN -o libstribog.so ConsoleApplication2.cpp
+#if defined(_WIN32)
+#define STRIBOG_API extern "C" __declspec(dllexport)
+#else
+#define STRIBOG_API extern "C" __attribute__((visibility("default")))
+#endif
+
+STRIBOG_API void* stribog_new(int is_512bit) {
+    return new (std::nothrow) StribogHash(is_512bit != 0);
+}
+
+STRIBOG_API void* stribog_copy(const void* ctx) {
+    return new (std::nothrow) StribogHash(*static_cast<const StribogHash*>(ctx));
+}
+
+STRIBOG_API void stribog_free(void* ctx) {
+    delete static_cast<StribogHash*>(ctx);
+}
+
+STRIBOG_API void stribog_update(void* ctx, const unsigned char* data, size_t len) {
+    static_cast<StribogHash*>(ctx)->update(data, len);
+}
+
+// Не меняет состояние: финализируется копия, поэтому можно продолжать update
+STRIBOG_API void stribog_final(const void* ctx, unsigned char* hash) {
+    StribogHash copy(*static_cast<const StribogHash*>(ctx));
+    copy.final(hash);
+}
+
+static void copyError(const std::exception& e, char* err, size_t errlen) {
+    if (err && errlen > 0) {
+        strncpy(err, e.what(), errlen - 1);
+        err[errlen - 1] = '\0';
+    }
+}
+
+STRIBOG_API size_t stribog_state_size() {
+    return STATE_SIZE;
+}
+
+// Записывает в out STATE_SIZE байт состояния
+STRIBOG_API void stribog_export_state(const void* ctx, unsigned char* out) {
+    static_cast<const StribogHash*>(ctx)->exportState(out);
+}
+
+// Создаёт хешер из сохранённого состояния; при ошибке возвращает NULL и текст ошибки в err
+STRIBOG_API void* stribog_import_state(const unsigned char* state, char* err, size_t errlen) {
+    StribogHash* hasher = new (std::nothrow) StribogHash();
+    if (!hasher) {
+        return nullptr;
+    }
+    try {
+        hasher->importState(state);
+        return hasher;
+    }
+    catch (const std::exception& e) {
+        copyError(e, err, errlen);
+        delete hasher;
+        return nullptr;
+    }
+}
+
+// Возвращает 0 при успехе, иначе -1 и текст ошибки в err
+STRIBOG_API int stribog_hash_file(const char* filename, int is_512bit, unsigned char* hash,
+                                  char* err, size_t errlen) {
+    try {
+        calculateFileHash(filename, is_512bit != 0, hash);
+        return 0;
+    }
+    catch (const std::exception& e) {
+        copyError(e, err, errlen);
+        return -1;
+    }
+}
+
+// Оба хеша (256 и 512 бит) за одно чтение файла
+STRIBOG_API int stribog_hash_file_both(const char* filename, unsigned char* hash256, unsigned char* hash512,
+                                       char* err, size_t errlen) {
+    try {
+        calculateFileHashes(filename, hash256, hash512);
+        return 0;
+    }
+    catch (const std::exception& e) {
+        copyError(e, err, errlen);
+        return -1;
+    }
+}
+
+#ifndef STRIBOG_NO_MAIN
+// Ошибка в аргументах: сообщение и строка использования в stderr, код возврата 2
+int usageError(const std::string& message) {
+    std::cerr << "Error: " << message << std::endl;
+    std::cerr << "Usage: ConsoleApplication2 [--stats] [--256 | --both] [--state FILE] [--chunk-size BYTES] [FILE | -]"
+              << std::endl;
+    return 2;
 }
 
 int main(int argc, char* argv[]) {
+    if (argc > 1 && std::string(argv[1]) == "--serve") {
+        return runServer();
+    }
+    if (argc > 1 && std::string(argv[1]) == "--self-test") {
+        if (!selfTestGImplementations(1000)) {
+            return 1;
+        }
+        std::cout << "Self-test OK, active implementation: " << activeGImplementation().name << std::endl;
+        return 0;
+    }
+    bool showStats = false;
+    bool want256 = false;
+    bool want512 = true;
+    std::string stateFile;
+    int argi = 1;
+    for (; argi < argc; ++argi) {
+        std::string flag = argv[argi];
+        if (flag == "--stats") {
+            showStats = true;
+        }
+        else if (flag == "--256") {
+            want256 = true;
+            want512 = false;
+        }
+        else if (flag == "--both") {
+            want256 = true;
+            want512 = true;
+        }
+        else if (flag == "--state" || flag == "--chunk-size") {
+            if (argi + 1 >= argc || argv[argi + 1][0] == '\0') {
+                return usageError(flag + " requires a value");
+            }
+            const char* value = argv[++argi];
+            if (flag == "--state") {
+                stateFile = value;
+                continue;
+            }
+            // Только десятичное число целиком: без знака, пробелов и хвоста вроде "10abc"
+            char* end = nullptr;
+            errno = 0;
+            unsigned long long size = std::strtoull(value, &end, 10);
+            if (value[0] < '0' || value[0] > '9' || *end != '\0' || errno == ERANGE || size == 0) {
+                return usageError(std::string("invalid --chunk-size: ") + value);
+            }
+            readChunkSize = static_cast<size_t>(size);
+        }
+        else {
+            break;
+        }
+    }
     std::string filename;
     char cwd[1024];
     getcwd(cwd, sizeof(cwd));
     std::cout << "[DEBUG] Current working dir: " << cwd << std::endl;
-    if (argc > 1 && argv[1] && std::string(argv[1]).length() > 0) {
-        std::cout << "[DEBUG] argv[1] = '" << argv[1] << "'" << std::endl;
-        filename = argv[1];
+    if (argc > argi && argv[argi] && std::string(argv[argi]).length() > 0) {
+        std::cout << "[DEBUG] argv[" << argi << "] = '" << argv[argi] << "'" << std::endl;
+        filename = argv[argi];
     } else {
         std::cout << "Введите имя файла (Enter для sisiy.pdf): ";
         std::getline(std::cin, filename);
@@ -323,18 +1235,44 @@ int main(int argc, char* argv[]) {
     }
     try {
         unsigned char hash[HASH_SIZE_512];
-        calculateFileHash(filename.c_str(), true, hash);  
+        unsigned char hash256[HASH_SIZE_256];
+        HashStats stats;
+        if (!stateFile.empty()) {
+            if (want256 && want512) {
+                throw std::runtime_error("--state cannot be combined with --both");
+            }
+            calculateFileHashResumable(filename.c_str(), want512, stateFile.c_str(), want512 ? hash : hash256,
+                                       showStats ? &stats : nullptr);
+        }
+        else if (want256 && want512) {
+            calculateFileHashes(filename.c_str(), hash256, hash, showStats ? &stats : nullptr);
+        }
+        else if (want256) {
+            calculateFileHash(filename.c_str(), false, hash256, showStats ? &stats : nullptr);
+        }
+        else {
+            calculateFileHash(filename.c_str(), true, hash, showStats ? &stats : nullptr);
+        }
 
-        std::cout << "Stribog-512 hash of " << filename << ":\n";
-        for (size_t i = 0; i < HASH_SIZE_512; ++i) {
-            std::cout << std::hex << std::setw(2) << std::setfill('0')
-                << static_cast<int>(hash[i]);
+        if (want256) {
+            std::cout << "Stribog-256 hash of " << filename << ":\n" << toHex(hash256, HASH_SIZE_256) << std::endl;
+        }
+        if (want512) {
+            std::cout << "Stribog-512 hash of " << filename << ":\n";
+            for (size_t i = 0; i < HASH_SIZE_512; ++i) {
+                std::cout << std::hex << std::setw(2) << std::setfill('0')
+                    << static_cast<int>(hash[i]);
+            }
+            std::cout << std::dec << std::endl;
+        }
+        if (showStats) {
+            printStats(stats);
         }
-        std::cout << std::dec << std::endl;
     }
     catch (const std::exception& e) {
         std::cerr << "Error: " << e.what() << std::endl;
         return 1;
     }
     return 0;
-}
\ No newline at end of file
+}
+#endif
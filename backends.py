@@ -0,0 +1,282 @@
+"""
+Реестр бэкендов хеширования.
+
+Бэкенд — функция путь -> hex-хеш Стрибог-512. Реестр проверяет, какие бэкенды
+доступны, прогоняет каждый на эталонных векторах (KNOWN_ANSWERS), один раз
+замеряет задержку на наборе размеров, кеширует замеры на диске и для каждого
+вызова выбирает бэкенд с наименьшей ожидаемой задержкой для размера файла.
+"""
+
+import json
+import os
+import platform
+import shutil
+import tempfile
+import threading
+
+# Эталоны ConsoleApplication2 (см. tests/test_console_application2.py, tests/test_hashing.py)
+KNOWN_ANSWERS = [
+    (b'', '317dd1d2b3447094f9c51f51dd05267f88a2ae046323365412e72c7ec5508c19'
+          '72f7dd8423423c450edde5e2287b62fcb50ad86f002f957c169d0d040056ef77'),
+    (b'test data for gost hash', 'd4743a69cb73e7ed25dea17258c355eac94b361231c2b2fc61c45b7390fc3aa9'
+                                 '2c4bb9e5382174e200f8649ea0e63309ba78e3d8a6083c0eb9233406502dcb61'),
+    (b'A' * 1000, 'cadddd6f2d2014106896dbff22b68eb68cef40096aa78239e905755bee8ecb6f'
+                  'f4b28ca4c732bd01fb673d723c75494354bed4487b76745ece7dbb6756ad48df'),
+]
+
+# Размеры входа для калибровки; если по уже сделанным замерам вызов бэкенда
+# займёт больше MAX_CALL_SECONDS, этот и бо́льшие размеры не замеряются, а экстраполируются
+CALIBRATION_SIZES = [0, 4096, 64 * 1024, 1024 * 1024]
+MAX_CALL_SECONDS = 0.2
+CACHE_VERSION = 1
+
+
+def _binary_backend():
+    import external_gost
+
+    binary_path = external_gost.default_binary_path()
+    if not os.path.exists(binary_path):
+        return None
+    return lambda path: external_gost.gost_hash_by_binary(path, binary_path)
+
+
+def _worker_backend():
+    import external_gost
+
+    binary_path = external_gost.default_binary_path()
+    if not os.path.exists(binary_path):
+        return None
+    return lambda path: external_gost.gost_hash_by_worker(path, binary_path)
+
+
+def _library_backend():
+    import external_gost
+
+    library_path = external_gost.default_library_path()
+    if not os.path.exists(library_path):
+        return None
+    return lambda path: external_gost.gost_hash_by_library(path, library_path)
+
+
+def _python_backend():
+    import hashing
+
+    return hashing.gost_hash
+
+
+def _pygost_backend():
+    try:
+        from pygost import gost34112012512
+    except ImportError:
+        return None
+
+    def run(path):
+        with open(path, 'rb') as f:
+            return gost34112012512.new(f.read()).hexdigest()
+    return run
+
+
+BACKENDS = {
+    'binary': _binary_backend,
+    'worker': _worker_backend,
+    'library': _library_backend,
+    'python': _python_backend,
+    'pygost': _pygost_backend,
+}
+
+
+def available_backends(names=None):
+    """Возвращает {имя: функция(путь) -> hex} для доступных бэкендов."""
+    result = {}
+    for name in names or BACKENDS:
+        if name not in BACKENDS:
+            raise ValueError(f'Unknown backend: {name}')
+        func = BACKENDS[name]()
+        if func is not None:
+            result[name] = func
+    return result
+
+
+def _artifact_stamp(name):
+    """Отметка версии бэкенда для кеша калибровки: mtime собранного артефакта или версия пакета."""
+    try:
+        if name in ('binary', 'worker'):
+            import external_gost
+            return os.stat(external_gost.default_binary_path()).st_mtime_ns
+        if name == 'library':
+            import external_gost
+            return os.stat(external_gost.default_library_path()).st_mtime_ns
+        if name == 'python':
+            import hashing
+            return os.stat(hashing.__file__).st_mtime_ns
+        if name == 'pygost':
+            import pygost
+            return getattr(pygost, '__version__', None)
+    except (ImportError, OSError):
+        pass
+    return None
+
+
+def default_cache_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'gost-hasher', 'backends.json')
+
+
+def self_test(func, tmpdir=None):
+    """Прогоняет бэкенд на KNOWN_ANSWERS. Возвращает None при успехе, иначе описание ошибки."""
+    import hashing
+
+    own_tmpdir = tmpdir is None
+    if own_tmpdir:
+        tmpdir = tempfile.mkdtemp()
+    try:
+        for i, (data, expected) in enumerate(KNOWN_ANSWERS):
+            path = os.path.join(tmpdir, f'kat_{i}.bin')
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(data)
+            try:
+                result = func(path)
+            except Exception as e:
+                return f'vector {i}: {e}'
+            if not hashing.compare_hashes(result, expected):
+                return f'vector {i}: expected {expected[:16]}..., got {str(result)[:16]}...'
+        return None
+    finally:
+        if own_tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _interpolate(points, size):
+    """Оценка задержки по замерам [(размер, секунды), ...]; за последним замером — по последнему отрезку."""
+    if len(points) == 1:
+        return points[0][1]
+    for (s0, t0), (s1, t1) in zip(points, points[1:]):
+        if size <= s1:
+            break
+    slope = max(0.0, (t1 - t0) / (s1 - s0)) if s1 > s0 else 0.0
+    return max(0.0, t0 + slope * (size - s0))
+
+
+class BackendRegistry:
+    """Доступные бэкенды, прошедшие самопроверку, и выбор самого быстрого по размеру входа.
+
+    Калибровка выполняется при первом выборе и сохраняется в cache_path; кеш
+    сбрасывается, если изменились собранные артефакты, набор бэкендов или размеров.
+    """
+
+    def __init__(self, cache_path=None, names=None, sizes=None, max_call_seconds=MAX_CALL_SECONDS):
+        self.cache_path = default_cache_path() if cache_path is None else cache_path
+        self.sizes = sorted(CALIBRATION_SIZES if sizes is None else sizes)
+        self.max_call_seconds = max_call_seconds
+        self.funcs = available_backends(names)
+        self.calibration = None
+        self.rejected = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        return {
+            'version': CACHE_VERSION,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'sizes': self.sizes,
+            'backends': {name: _artifact_stamp(name) for name in sorted(self.funcs)},
+        }
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('fingerprint') != self.fingerprint():
+            return False
+        self.calibration = cached['calibration']
+        self.rejected = cached['rejected']
+        return True
+
+    def _save_cache(self):
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.cache_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint(), 'calibration': self.calibration,
+                       'rejected': self.rejected}, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def _run_calibration(self):
+        import benchmark
+
+        calibration = {}
+        rejected = {}
+        tmpdir = tempfile.mkdtemp()
+        try:
+            paths = {}
+            for size in self.sizes:
+                paths[size] = os.path.join(tmpdir, f'calibrate_{size}.bin')
+                with open(paths[size], 'wb') as f:
+                    f.write(os.urandom(size))
+            for name, func in self.funcs.items():
+                error = self_test(func, tmpdir)
+                if error is not None:
+                    rejected[name] = error
+                    continue
+                points = []
+                for size in self.sizes:
+                    if points and _interpolate(points, size) > self.max_call_seconds:
+                        break
+                    entry = benchmark.measure(func, paths[size], size, min_calls=5, budget=0)
+                    points.append([size, entry['p50_ms'] / 1000])
+                calibration[name] = points
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        self.calibration = calibration
+        self.rejected = rejected
+
+    def calibrate(self, force=False):
+        """Возвращает {бэкенд: [[размер, секунды], ...]}, при необходимости выполняя калибровку."""
+        with self._lock:
+            if self.calibration is None or force:
+                if force or not self._load_cache():
+                    self._run_calibration()
+                    try:
+                        self._save_cache()
+                    except OSError:
+                        pass
+            return self.calibration
+
+    def estimate(self, name, size):
+        """Ожидаемая задержка (секунды) бэкенда name на входе size байт."""
+        return _interpolate(self.calibrate()[name], size)
+
+    def choose(self, size):
+        """Имя бэкенда с наименьшей ожидаемой задержкой для входа size байт."""
+        calibration = self.calibrate()
+        if not calibration:
+            raise RuntimeError(f'No backend passed the self-test: {self.rejected}')
+        return min(calibration, key=lambda name: _interpolate(calibration[name], size))
+
+    def gost_hash(self, file_like_or_path):
+        """Хеш через самый быстрый для этого размера бэкенд; потоки хешируются в процессе."""
+        if not isinstance(file_like_or_path, (str, bytes, os.PathLike)):
+            import hashing
+            return hashing.gost_hash(file_like_or_path)
+        return self.funcs[self.choose(os.path.getsize(file_like_or_path))](file_like_or_path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Общий реестр процесса (кеш калибровки — default_cache_path())."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = BackendRegistry()
+        return _registry
+
+
+def gost_hash(file_like_or_path):
+    """Хеширует файл бэкендом, выбранным общим реестром по размеру."""
+    return get_registry().gost_hash(file_like_or_path)
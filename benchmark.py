@@ -0,0 +1,175 @@
+"""
+Замеры скорости хеширования: пропускная способность (МБ/с) и перцентили задержки
+для каждого доступного бэкенда на наборе размеров входа.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --output new.json --compare bench.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from backends import BACKENDS, available_backends
+
+# Размеры из tests/test_console_application2.py
+DEFAULT_SIZES = [0, 1, 63, 64, 65, 4096, 10 * 1024 * 1024, 100 * 1024 * 1024]
+DEFAULT_THRESHOLD = 0.10
+# Пары (бэкенд, размер), где по предыдущим замерам один вызов займёт дольше, не замеряются
+MAX_CALL_SECONDS = 10.0
+
+
+def percentile(values, p):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure(func, path, size, min_calls=3, max_calls=1000, budget=2.0):
+    """Вызывает func(path) не менее min_calls раз, пока не исчерпан бюджет времени.
+
+    Если уже прогревочный вызов дольше budget (при budget > 0), он и считается
+    единственным замером: повторять медленный вызов min_calls раз незачем.
+    """
+    t0 = time.perf_counter()
+    func(path)  # прогрев
+    warmup = time.perf_counter() - t0
+    if 0 < budget <= warmup:
+        return _summary(size, [warmup])
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_calls:
+        t0 = time.perf_counter()
+        func(path)
+        latencies.append(time.perf_counter() - t0)
+        if len(latencies) >= min_calls and time.perf_counter() - started >= budget:
+            break
+    return _summary(size, latencies)
+
+
+def _summary(size, latencies):
+    total = sum(latencies)
+    return {
+        'size': size,
+        'calls': len(latencies),
+        'mean_ms': total / len(latencies) * 1000,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mb_per_s': size * len(latencies) / total / 1e6 if size and total else None,
+    }
+
+
+def run_benchmark(sizes=None, backends=None, min_calls=3, budget=2.0, log=None,
+                  max_call_seconds=MAX_CALL_SECONDS):
+    """Прогоняет все бэкенды по всем размерам, возвращает словарь для JSON.
+
+    Размеры идут по возрастанию; если по последнему замеру бэкенда один вызов на
+    следующем размере займёт больше max_call_seconds (None — без ограничения),
+    эта пара пропускается и в результаты не попадает.
+    """
+    sizes = sorted(DEFAULT_SIZES if sizes is None else sizes)
+    funcs = available_backends(backends)
+    results = []
+    last = {}
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            path = os.path.join(tmpdir, f'bench_{size}.bin')
+            with open(path, 'wb') as f:
+                f.write(os.urandom(size))
+            for name, func in funcs.items():
+                if max_call_seconds is not None and name in last and last[name][0]:
+                    estimate = last[name][1] * size / last[name][0]
+                    if estimate > max_call_seconds:
+                        if log:
+                            log(f'{name:>8} {size:>10} B  skipped (about {estimate:.1f} s per call)')
+                        continue
+                entry = measure(func, path, size, min_calls=min_calls, budget=budget)
+                entry['backend'] = name
+                results.append(entry)
+                last[name] = (size, entry['p50_ms'] / 1000)
+                if log:
+                    log(format_entry(entry))
+            os.unlink(path)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def format_entry(entry):
+    speed = f"{entry['mb_per_s']:.2f} MB/s" if entry['mb_per_s'] is not None else '-'
+    return (f"{entry['backend']:>8} {entry['size']:>10} B  calls={entry['calls']:<5} "
+            f"p50={entry['p50_ms']:.3f} ms  p99={entry['p99_ms']:.3f} ms  {speed}")
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Сравнивает результаты с сохранённой базой.
+
+    Регрессия — рост медианной задержки более чем на threshold (доля) для той же
+    пары (бэкенд, размер). Возвращает список описаний регрессий.
+    """
+    base = {(e['backend'], e['size']): e for e in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        old = base.get((entry['backend'], entry['size']))
+        if old is None or not old['p50_ms']:
+            continue
+        ratio = entry['p50_ms'] / old['p50_ms']
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{entry['backend']} size={entry['size']}: p50 {old['p50_ms']:.3f} -> "
+                f"{entry['p50_ms']:.3f} ms (+{(ratio - 1) * 100:.1f}%)"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк бэкендов хеширования ГОСТ 34.11-2012')
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')],
+                        help='размеры входа через запятую (по умолчанию как в тестах)')
+    parser.add_argument('--backends', type=lambda s: s.split(','),
+                        help=f"бэкенды через запятую ({', '.join(BACKENDS)})")
+    parser.add_argument('--budget', type=float, default=2.0, help='секунд на один замер')
+    parser.add_argument('--min-calls', type=int, default=3)
+    parser.add_argument('--max-call', type=float, default=MAX_CALL_SECONDS,
+                        help='пропускать размеры, где один вызов бэкенда по оценке дольше стольких секунд')
+    parser.add_argument('--output', help='куда сохранить результаты (JSON)')
+    parser.add_argument('--compare', help='JSON с базовыми результатами для сравнения')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='допустимый рост медианной задержки (доля)')
+    args = parser.parse_args(argv)
+
+    current = run_benchmark(args.sizes, args.backends, args.min_calls, args.budget, log=print,
+                            max_call_seconds=args.max_call)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for line in regressions:
+            print('REGRESSION', line)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
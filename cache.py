@@ -0,0 +1,220 @@
+"""
+Постоянный кеш хешей файлов в SQLite с вытеснением LRU.
+
+Ключ — (устройство, inode, алгоритм); запись действительна, пока совпадают
+размер, mtime_ns и ctime_ns файла. Если файл изменился во время хеширования,
+результат не кешируется.
+"""
+
+import functools
+import os
+import sqlite3
+import threading
+
+import hashing
+
+# Примерный размер записи в базе сверх длины пути (ключ, хеш, служебные поля)
+ENTRY_OVERHEAD = 128
+
+# Отметки использования (last_used) при попаданиях копятся в памяти и пишутся одной
+# транзакцией в store, close или после стольких попаданий
+TOUCH_FLUSH_EVERY = 1000
+
+# Версия схемы (PRAGMA user_version); база старой версии пересоздаётся
+SCHEMA_VERSION = 2
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    path TEXT NOT NULL,
+    entry_bytes INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (dev, ino, algorithm)
+);
+CREATE INDEX IF NOT EXISTS digests_last_used ON digests (last_used);
+'''
+
+
+def algorithm_name(hash_func):
+    """Имя алгоритма для ключа кеша: модуль и имя функции, у functools.partial — ещё и аргументы.
+
+    hashing.gost_hash, явный или по умолчанию (None), — 'streebog512'.
+    """
+    if hash_func is None or hash_func is hashing.gost_hash:
+        return 'streebog512'
+    if isinstance(hash_func, functools.partial):
+        if not hash_func.args and not hash_func.keywords:
+            return algorithm_name(hash_func.func)
+        args = [repr(a) for a in hash_func.args] + [f'{k}={v!r}' for k, v in sorted(hash_func.keywords.items())]
+        return f'{algorithm_name(hash_func.func)}({", ".join(args)})'
+    module = getattr(hash_func, '__module__', None) or ''
+    name = getattr(hash_func, '__qualname__', None) or type(hash_func).__qualname__
+    return f'{module}.{name}'
+
+
+class DigestCache:
+    """Кеш хешей перед hashing.gost_hash (или другой функцией hash_func).
+
+    max_entries и max_bytes ограничивают число записей и их примерный объём;
+    при превышении удаляются давно не использованные записи. Записи разных
+    алгоритмов хранятся раздельно: algorithm (по умолчанию algorithm_name(hash_func))
+    должен однозначно определять функцию и размер хеша — для lambda и
+    замыканий его стоит задать явно, например 'streebog256'.
+    """
+
+    def __init__(self, db_path, max_entries=None, max_bytes=None, hash_func=None, algorithm=None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.algorithm = algorithm or algorithm_name(hash_func)
+        self.hash_func = hash_func or hashing.gost_hash
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self._conn.execute('DROP TABLE IF EXISTS digests')
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self._conn.executescript(_SCHEMA)
+        self._clock, self._entries, self._bytes = self._conn.execute(
+            'SELECT COALESCE(MAX(last_used), 0), COUNT(*), COALESCE(SUM(entry_bytes), 0) FROM digests'
+        ).fetchone()
+        self._touched = {}
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def lookup(self, path, st=None):
+        """Возвращает закешированный хеш файла или None, если файла нет в кеше или он изменился."""
+        if st is None:
+            st = os.stat(path)
+        key = (st.st_dev, st.st_ino, self.algorithm)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, ctime_ns, digest FROM digests WHERE dev = ? AND ino = ? AND algorithm = ?',
+                key,
+            ).fetchone()
+            if row is None or row[:3] != (st.st_size, st.st_mtime_ns, st.st_ctime_ns):
+                return None
+            self._touched[key] = self._tick()
+            if len(self._touched) >= TOUCH_FLUSH_EVERY:
+                self._flush_touches()
+                self._conn.commit()
+            return row[3].hex()
+
+    def _flush_touches(self):
+        """Записывает накопленные отметки last_used (под self._lock, без commit)."""
+        if self._touched:
+            self._conn.executemany(
+                'UPDATE digests SET last_used = ? WHERE dev = ? AND ino = ? AND algorithm = ?',
+                [(used,) + key for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def store(self, path, st, hexdigest):
+        """Сохраняет хеш файла с метаданными st и при необходимости вытесняет старые записи."""
+        name = os.fsdecode(path)
+        entry_bytes = len(name.encode('utf-8', 'surrogateescape')) + len(self.algorithm) + ENTRY_OVERHEAD
+        key = (st.st_dev, st.st_ino, self.algorithm)
+        with self._lock:
+            old = self._conn.execute(
+                'SELECT entry_bytes FROM digests WHERE dev = ? AND ino = ? AND algorithm = ?', key
+            ).fetchone()
+            if old is not None:
+                self._entries -= 1
+                self._bytes -= old[0]
+            self._conn.execute(
+                'INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                key + (st.st_size, st.st_mtime_ns, st.st_ctime_ns, bytes.fromhex(hexdigest),
+                       name, entry_bytes, self._tick()),
+            )
+            self._entries += 1
+            self._bytes += entry_bytes
+            self._flush_touches()
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        # Базу могут менять другие процессы: счётчики пересчитываются внутри той же транзакции
+        self._entries, self._bytes = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(entry_bytes), 0) FROM digests'
+        ).fetchone()
+        while self._over_limit():
+            victims = self._conn.execute(
+                'SELECT dev, ino, algorithm, entry_bytes FROM digests ORDER BY last_used LIMIT ?',
+                (max(1, self._entries // 10),),
+            ).fetchall()
+            if not victims:
+                break
+            for dev, ino, algorithm, entry_bytes in victims:
+                if not self._over_limit():
+                    break
+                self._conn.execute('DELETE FROM digests WHERE dev = ? AND ino = ? AND algorithm = ?',
+                                   (dev, ino, algorithm))
+                self._entries -= 1
+                self._bytes -= entry_bytes
+                self.evictions += 1
+
+    def _over_limit(self):
+        return ((self.max_entries is not None and self._entries > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def gost_hash(self, path):
+        """Возвращает хеш файла из кеша или вычисляет его и сохраняет."""
+        st = os.stat(path)
+        cached = self.lookup(path, st)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+        with self._lock:
+            self.misses += 1
+        hexdigest = self.hash_func(path)
+        after = os.stat(path)
+        if (after.st_size, after.st_mtime_ns, after.st_ctime_ns, after.st_ino) == \
+                (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino):
+            self.store(path, st, hexdigest)
+        return hexdigest
+
+    def stats(self):
+        """Статистика кеша: попадания, промахи, вытеснения, число записей и их объём."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': self._entries,
+                'bytes': self._bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute('DELETE FROM digests')
+            self._conn.commit()
+            self._entries = 0
+            self._bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
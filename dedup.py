@@ -0,0 +1,188 @@
+"""
+Поиск дубликатов файлов.
+
+Полный хеш Стрибог-512 считается только для файлов, которые не удалось
+различить дешевле:
+
+  1. файлы группируются по размеру — уникальный размер сразу исключает файл;
+     жёсткие ссылки на один inode считаются одним файлом;
+  2. в группах одного размера считается Стрибог-256 от первых и последних
+     sample_size байт (файлы не больше 2 × sample_size этот шаг пропускают);
+  3. файлы, совпавшие по выборке, хешируются полностью (hashing.gost_hash).
+
+Шаги 2 и 3 выполняются в пуле процессов.
+"""
+
+import argparse
+import os
+import stat
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import hashing
+import manifest
+
+# Сколько байт с начала и с конца файла попадает в предварительный хеш
+SAMPLE_SIZE = 4096
+
+
+def sample_hash(path, size, sample_size=SAMPLE_SIZE):
+    """Стрибог-256 от первых и последних sample_size байт файла размера size."""
+    hasher = hashing.new(digest_size=hashing.HASH_SIZE_256)
+    with open(path, 'rb') as f:
+        hasher.update(f.read(sample_size))
+        f.seek(max(sample_size, size - sample_size))
+        hasher.update(f.read(sample_size))
+    return hasher.digest()
+
+
+def _safe(func, args):
+    """Вызов в процессе пула: ошибка чтения возвращается как результат, чтобы не терять остальные файлы."""
+    try:
+        return func(*args)
+    except OSError as e:
+        return e
+
+
+def _map(executor, func, args):
+    """Результаты func(*a) для каждого a из args по порядку; в пуле процессов, если он есть."""
+    if executor is None:
+        return [_safe(func, a) for a in args]
+    return list(executor.map(_safe, [func] * len(args), args, chunksize=max(1, len(args) // 64)))
+
+
+def iter_candidates(roots, min_size=1, errors=None):
+    """Выдаёт (путь, размер) обычных файлов из roots (каталогов или файлов) размером от min_size.
+
+    Недоступные корни и каталоги пропускаются; если передан список errors,
+    в него добавляется (путь, OSError), иначе исключение пробрасывается.
+    """
+    def onerror(e):
+        if errors is None:
+            raise e
+        errors.append((e.filename, e))
+
+    for root in roots:
+        try:
+            st = os.stat(root)
+        except OSError as e:
+            onerror(e)
+            continue
+        if not stat.S_ISDIR(st.st_mode):
+            if stat.S_ISREG(st.st_mode) and st.st_size >= min_size:
+                yield root, st.st_size
+            continue
+        for rel, size in manifest.iter_files(root, onerror):
+            if size >= min_size:
+                yield os.path.join(root, *rel.split('/')), size
+
+
+def _group(items, results, errors):
+    """Группирует (путь, размер) по (размер, результат); ошибки чтения переносит в errors."""
+    groups = {}
+    for (path, size), result in zip(items, results):
+        if isinstance(result, OSError):
+            errors.append((path, result))
+        else:
+            groups.setdefault((size, result), []).append(path)
+    return groups
+
+
+def find_duplicates(roots, min_size=1, sample_size=SAMPLE_SIZE, max_workers=None, stats=None, errors=None):
+    """Находит наборы одинаковых файлов в roots.
+
+    Возвращает список (размер, хеш Стрибог-512, [пути]) от наибольшего числа
+    лишних байт к наименьшему. В stats (dict) записывается, сколько файлов
+    дошло до каждого шага; в errors (list) — (путь, OSError) для файлов,
+    которые не удалось прочитать (в результат они не попадают).
+    """
+    if stats is None:
+        stats = {}
+    if errors is None:
+        errors = []
+    by_size = {}
+    stats['files'] = 0
+    for path, size in iter_candidates(roots, min_size, errors):
+        stats['files'] += 1
+        by_size.setdefault(size, []).append(path)
+
+    # Шаг 1: одинаковый размер; повторы одного inode (жёсткие ссылки, пересекающиеся корни) убираются
+    candidates = []
+    seen = set()
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        unique = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                errors.append((path, e))
+                continue
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                unique.append(path)
+        if len(unique) > 1:
+            candidates.extend((path, size) for path in unique)
+    stats['same_size'] = len(candidates)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 and candidates else None
+    try:
+        # Шаг 2: выборка из начала и конца; мелкие файлы сразу идут на полный хеш
+        small = [(path, size) for path, size in candidates if size <= 2 * sample_size]
+        large = [(path, size) for path, size in candidates if size > 2 * sample_size]
+        samples = _map(executor, sample_hash, [(path, size, sample_size) for path, size in large])
+        stats['sampled'] = len(large)
+        full = small + [(path, size) for (size, _), paths in _group(large, samples, errors).items()
+                        if len(paths) > 1 for path in paths]
+
+        # Шаг 3: полный хеш, крупные файлы первыми
+        full.sort(key=lambda item: item[1], reverse=True)
+        digests = _map(executor, hashing.gost_hash, [(path,) for path, _ in full])
+        stats['full_hashed'] = len(full)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    sets = [(size, hexdigest, sorted(paths))
+            for (size, hexdigest), paths in _group(full, digests, errors).items() if len(paths) > 1]
+    sets.sort(key=lambda item: (-wasted_bytes(item), item[2]))
+    return sets
+
+
+def wasted_bytes(duplicate_set):
+    """Байты, которые освободились бы, если оставить одну копию из набора."""
+    size, _, paths = duplicate_set
+    return size * (len(paths) - 1)
+
+
+def summarize(sets):
+    """(число наборов, число лишних копий, лишние байты) по результату find_duplicates."""
+    return len(sets), sum(len(paths) - 1 for _, _, paths in sets), sum(wasted_bytes(s) for s in sets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Поиск дубликатов файлов по хешу Стрибог-512')
+    parser.add_argument('roots', nargs='+', help='каталоги или файлы')
+    parser.add_argument('--min-size', type=int, default=1, help='пропускать файлы меньше этого размера (байт)')
+    parser.add_argument('--sample-size', type=int, default=SAMPLE_SIZE,
+                        help='байт с начала и конца файла для предварительного хеша')
+    parser.add_argument('--workers', type=int, default=None, help='число процессов')
+    args = parser.parse_args(argv)
+
+    errors = []
+    sets = find_duplicates(args.roots, args.min_size, args.sample_size, args.workers, errors=errors)
+    for size, hexdigest, paths in sets:
+        print(f'{hexdigest} {size}')
+        for path in paths:
+            print(f'  {manifest.escape_path(path)}')
+    for path, e in errors:
+        print(f'dedup: {path}: {e}', file=sys.stderr)
+    count, copies, wasted = summarize(sets)
+    print(f'{count} duplicate sets, {copies} extra copies, {wasted} bytes wasted')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
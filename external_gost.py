@@ -1,31 +1,504 @@
+import atexit
+import ctypes
 import subprocess
 import sys
 import os
+import threading
 
-def gost_hash_by_binary(file_path, binary_path=None):
+def default_binary_path():
+    if sys.platform == 'win32':
+        binary_name = 'ConsoleApplication2.exe'
+    else:
+        binary_name = 'ConsoleApplication2'
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), 'x64', 'Debug', binary_name))
+
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+def parse_hash_output(stdout):
+    """Ищет строку с 128-символьным hex-хешем в выводе бинарника."""
+    for l in stdout.splitlines():
+        l = l.strip()
+        if len(l) == 128 and all(c in _HEX_DIGITS for c in l):
+            return l
+    raise ValueError('Hash not found in output')
+
+_STATS_FIELDS = {
+    'read_ms': ('read_time', lambda v: float(v) / 1000),
+    'compress_ms': ('compress_time', lambda v: float(v) / 1000),
+    'final_ms': ('finalize_time', lambda v: float(v) / 1000),
+    'bytes': ('bytes', int),
+    'blocks': ('blocks', int),
+}
+
+def parse_stats_output(stderr):
+    """Разбирает строку [STATS] из stderr бинарника в словарь полей HashStats."""
+    for l in stderr.splitlines():
+        if l.startswith('[STATS]'):
+            result = {}
+            for item in l.split()[1:]:
+                key, _, value = item.partition('=')
+                if key in _STATS_FIELDS:
+                    name, convert = _STATS_FIELDS[key]
+                    result[name] = convert(value)
+            return result
+    return {}
+
+def gost_hash_by_binary(file_path, binary_path=None, stats=None, state_path=None):
+    """Хеширует файл отдельным процессом бинарника.
+
+    Путь передаётся через argv, бинарник запускается на месте без копирования
+    и без os.chdir, поэтому функцию можно вызывать из нескольких потоков.
+    Если передан stats (hashing.HashStats), бинарник запускается с --stats
+    и его замеры добавляются к stats. С state_path хеширование продолжается
+    с контрольной точки (--state, формат общий с hashing.gost_hash_resumable).
+    """
     if binary_path is None:
-        if sys.platform == 'win32':
-            binary_name = 'ConsoleApplication2.exe'
-        else:
-            binary_name = 'ConsoleApplication2'
-        binary_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'x64', 'Debug', binary_name))
-    temp_dir = os.path.dirname(file_path)
-    exe_path = os.path.join(temp_dir, os.path.basename(binary_path))
-    if not os.path.exists(exe_path):
-        import shutil
-        shutil.copy(binary_path, exe_path)
-        if sys.platform != 'win32':
-            os.chmod(exe_path, 0o755)
-    orig_cwd = os.getcwd()
-    os.chdir(temp_dir)
+        binary_path = default_binary_path()
+    path = os.path.abspath(os.fsdecode(file_path))
+    args = [binary_path]
+    if stats is not None:
+        args.append('--stats')
+    if state_path is not None:
+        args += ['--state', os.path.abspath(os.fsdecode(state_path))]
+    args.append(path)
+    result = subprocess.run(
+        args, stdin=subprocess.DEVNULL, capture_output=True, text=True, errors='replace',
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    if stats is not None:
+        for name, value in parse_stats_output(result.stderr).items():
+            setattr(stats, name, getattr(stats, name) + value)
+    return parse_hash_output(result.stdout)
+
+def gost_hash_stream_by_binary(stream, binary_path=None, chunk_size=64 * 1024):
+    """Хеширует поток бинарником без временного файла: данные передаются в stdin ('-') порциями."""
+    if binary_path is None:
+        binary_path = default_binary_path()
+    proc = subprocess.Popen(
+        [binary_path, '-'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
     try:
-        result = subprocess.run([exe_path], capture_output=True, text=True)
-    finally:
-        os.chdir(orig_cwd)
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            proc.stdin.write(chunk)
+    except BrokenPipeError:
+        pass
+    except BaseException:
+        proc.kill()
+        proc.communicate()
+        raise
+    stdout, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode('utf-8', 'replace'))
+    return parse_hash_output(stdout.decode('utf-8', 'replace'))
+
+def parse_named_hashes(stdout):
+    """Разбирает вывод вида 'Stribog-NNN hash of ...:' + строка хеша в {'streebog256': hex, ...}."""
+    result = {}
+    lines = stdout.splitlines()
+    for i, l in enumerate(lines[:-1]):
+        for bits in ('256', '512'):
+            if l.startswith(f'Stribog-{bits} hash of '):
+                result[f'streebog{bits}'] = lines[i + 1].strip()
+    return result
+
+def gost_hash_both_by_binary(file_path, binary_path=None):
+    """Стрибог-256 и Стрибог-512 файла за одно чтение (ConsoleApplication2 --both)."""
+    if binary_path is None:
+        binary_path = default_binary_path()
+    path = os.path.abspath(os.fsdecode(file_path))
+    result = subprocess.run(
+        [binary_path, '--both', path],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True, errors='replace',
+    )
     if result.returncode != 0:
         raise RuntimeError(result.stderr)
-    lines = result.stdout.splitlines()
-    for l in lines:
-        if l and not l.startswith('Stribog-512') and len(l.strip()) == 128:
-            return l.strip()
-    raise ValueError('Hash not found in output') 
\ No newline at end of file
+    hashes = parse_named_hashes(result.stdout)
+    if set(hashes) != {'streebog256', 'streebog512'}:
+        raise ValueError('Hash not found in output')
+    return hashes
+
+def hash_many(paths, max_workers=None, binary_path=None):
+    """Хеширует файлы параллельно на max_workers воркерах, возвращает хеши в порядке paths."""
+    from concurrent.futures import ThreadPoolExecutor
+    paths = list(paths)
+    if not paths:
+        return []
+    max_workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    with WorkerPool(max_workers, binary_path) as pool, ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(pool.hash_file, paths))
+
+
+class GostWorker:
+    """Долгоживущий процесс ConsoleApplication2 в режиме --serve."""
+
+    def __init__(self, binary_path=None):
+        if binary_path is None:
+            binary_path = default_binary_path()
+        self.binary_path = binary_path
+        self._proc = subprocess.Popen(
+            [binary_path, '--serve'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+
+    @property
+    def alive(self):
+        return self._proc.poll() is None
+
+    def _request(self, header, payload=b''):
+        try:
+            self._proc.stdin.write(header)
+            if payload:
+                self._proc.stdin.write(payload)
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline()
+        except (BrokenPipeError, OSError) as e:
+            self.close()
+            raise RuntimeError(f'Worker failed: {e}')
+        if not line:
+            self.close()
+            raise RuntimeError('Worker exited unexpectedly')
+        status, _, value = line.decode('utf-8', 'replace').rstrip('\r\n').partition(' ')
+        if status == 'OK' and len(value) == 128:
+            return value
+        if status == 'ERR':
+            raise RuntimeError(value)
+        self.close()
+        raise ValueError('Hash not found in output')
+
+    def hash_file(self, file_path):
+        path = os.path.abspath(os.fsdecode(file_path))
+        if '\n' in path or '\r' in path:
+            raise ValueError('Path must not contain line breaks')
+        return self._request(f'FILE {path}\n'.encode('utf-8', 'surrogateescape'))
+
+    def hash_bytes(self, data):
+        data = memoryview(data).cast('B')
+        return self._request(f'DATA {len(data)}\n'.encode('ascii'), data)
+
+    def close(self):
+        if self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WorkerPool:
+    """Пул прогретых GostWorker, переиспользуемых между вызовами (потокобезопасен)."""
+
+    def __init__(self, size=None, binary_path=None):
+        self.size = size or os.cpu_count() or 1
+        self.binary_path = binary_path
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._closed = False
+
+    def _acquire(self):
+        self._slots.acquire()
+        with self._lock:
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError('Pool is closed')
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return GostWorker(self.binary_path)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker):
+        with self._lock:
+            keep = worker.alive and not self._closed
+            if keep:
+                self._idle.append(worker)
+        if not keep:
+            worker.close()
+        self._slots.release()
+
+    def _call(self, method, arg):
+        worker = self._acquire()
+        try:
+            return getattr(worker, method)(arg)
+        finally:
+            self._release(worker)
+
+    def hash_file(self, file_path):
+        return self._call('hash_file', file_path)
+
+    def hash_bytes(self, data):
+        return self._call('hash_bytes', data)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_worker_pool(binary_path=None):
+    """Возвращает общий пул воркеров для бинарника (создаётся при первом вызове)."""
+    if binary_path is None:
+        binary_path = default_binary_path()
+    with _pools_lock:
+        pool = _pools.get(binary_path)
+        if pool is None:
+            pool = _pools[binary_path] = WorkerPool(binary_path=binary_path)
+        return pool
+
+@atexit.register
+def close_worker_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+def gost_hash_by_worker(file_path, binary_path=None):
+    """Как gost_hash_by_binary, но через общий пул долгоживущих воркеров."""
+    return get_worker_pool(binary_path).hash_file(file_path)
+
+
+def default_library_path():
+    if sys.platform == 'win32':
+        library_name = 'stribog.dll'
+    elif sys.platform == 'darwin':
+        library_name = 'libstribog.dylib'
+    else:
+        library_name = 'libstribog.so'
+    return os.path.join(os.path.dirname(default_binary_path()), library_name)
+
+
+def source_path():
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), 'ConsoleApplication2', 'ConsoleApplication2.cpp'))
+
+
+def build_native(force=False):
+    """Собирает ConsoleApplication2 и libstribog из ConsoleApplication2.cpp (как в README).
+
+    Пересобирается только отсутствующий или более старый, чем исходник, файл;
+    компилятор берётся из $CXX (по умолчанию g++). Возвращает True, если оба
+    файла актуальны; без компилятора и на Windows (там сборка идёт проектом
+    Visual Studio) — False. Ошибка компиляции выбрасывается как RuntimeError.
+    """
+    source = source_path()
+    source_mtime = os.path.getmtime(source)
+    targets = [
+        (default_binary_path(), ['-O2']),
+        (default_library_path(), ['-O2', '-shared', '-fPIC', '-DSTRIBOG_NO_MAIN']),
+    ]
+    built = True
+    for target, flags in targets:
+        if not force and os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+            continue
+        if sys.platform == 'win32':
+            built = False
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Сборка во временный файл: параллельный процесс не увидит недописанный бинарник
+        tmp = f'{target}.{os.getpid()}.tmp'
+        try:
+            result = subprocess.run([os.environ.get('CXX', 'g++'), *flags, '-o', tmp, source],
+                                    stdin=subprocess.DEVNULL, capture_output=True, text=True, errors='replace')
+        except OSError:
+            built = False
+            continue
+        if result.returncode != 0:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise RuntimeError(result.stderr)
+        os.replace(tmp, target)
+    return built
+
+
+class _PyBuffer(ctypes.Structure):
+    # obj — ссылка, которой владеют PyObject_GetBuffer/PyBuffer_Release; c_void_p, чтобы
+    # ctypes не менял её счётчик ссылок
+    _fields_ = [
+        ('buf', ctypes.c_void_p),
+        ('obj', ctypes.c_void_p),
+        ('len', ctypes.c_ssize_t),
+        ('itemsize', ctypes.c_ssize_t),
+        ('readonly', ctypes.c_int),
+        ('ndim', ctypes.c_int),
+        ('format', ctypes.c_char_p),
+        ('shape', ctypes.POINTER(ctypes.c_ssize_t)),
+        ('strides', ctypes.POINTER(ctypes.c_ssize_t)),
+        ('suboffsets', ctypes.POINTER(ctypes.c_ssize_t)),
+        ('internal', ctypes.c_void_p),
+    ]
+
+
+_get_buffer = ctypes.pythonapi.PyObject_GetBuffer
+_get_buffer.argtypes = [ctypes.py_object, ctypes.POINTER(_PyBuffer), ctypes.c_int]
+_get_buffer.restype = ctypes.c_int
+_release_buffer = ctypes.pythonapi.PyBuffer_Release
+_release_buffer.argtypes = [ctypes.POINTER(_PyBuffer)]
+_release_buffer.restype = None
+_PYBUF_SIMPLE = 0
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+def load_library(library_path=None):
+    """Загружает libstribog (сборка ConsoleApplication2.cpp с -DSTRIBOG_NO_MAIN)."""
+    if library_path is None:
+        library_path = default_library_path()
+    with _libraries_lock:
+        lib = _libraries.get(library_path)
+        if lib is None:
+            lib = ctypes.CDLL(library_path)
+            lib.stribog_new.argtypes = [ctypes.c_int]
+            lib.stribog_new.restype = ctypes.c_void_p
+            lib.stribog_copy.argtypes = [ctypes.c_void_p]
+            lib.stribog_copy.restype = ctypes.c_void_p
+            lib.stribog_free.argtypes = [ctypes.c_void_p]
+            lib.stribog_free.restype = None
+            lib.stribog_update.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+            lib.stribog_update.restype = None
+            lib.stribog_final.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+            lib.stribog_final.restype = None
+            lib.stribog_hash_file.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p,
+                                              ctypes.c_char_p, ctypes.c_size_t]
+            lib.stribog_hash_file.restype = ctypes.c_int
+            lib.stribog_hash_file_both.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p,
+                                                   ctypes.c_char_p, ctypes.c_size_t]
+            lib.stribog_hash_file_both.restype = ctypes.c_int
+            lib.stribog_state_size.argtypes = []
+            lib.stribog_state_size.restype = ctypes.c_size_t
+            lib.stribog_export_state.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+            lib.stribog_export_state.restype = None
+            lib.stribog_import_state.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t]
+            lib.stribog_import_state.restype = ctypes.c_void_p
+            _libraries[library_path] = lib
+        return lib
+
+
+class NativeStribogHash:
+    """Хешер Стрибог из libstribog через ctypes с интерфейсом hashlib.
+
+    update() принимает любой объект с buffer protocol (bytes, bytearray,
+    memoryview, mmap, массивы) и передаёт указатель на его память без копирования;
+    на время вызова GIL отпускается.
+    """
+
+    block_size = 64
+
+    def __init__(self, data=b'', digest_size=64, library_path=None, _ctx=None):
+        if digest_size not in (32, 64):
+            raise ValueError('digest_size must be 32 or 64')
+        self.digest_size = digest_size
+        self._lib = load_library(library_path)
+        self._ctx = _ctx if _ctx is not None else self._lib.stribog_new(1 if digest_size == 64 else 0)
+        if not self._ctx:
+            raise MemoryError('stribog_new failed')
+        if data:
+            self.update(data)
+
+    @property
+    def name(self):
+        return 'streebog512' if self.digest_size == 64 else 'streebog256'
+
+    def update(self, data):
+        view = _PyBuffer()
+        if _get_buffer(data, ctypes.byref(view), _PYBUF_SIMPLE) != 0:
+            raise TypeError('object does not support the contiguous buffer protocol')
+        try:
+            if view.len:
+                self._lib.stribog_update(self._ctx, view.buf, view.len)
+        finally:
+            _release_buffer(ctypes.byref(view))
+
+    def copy(self):
+        ctx = self._lib.stribog_copy(self._ctx)
+        if not ctx:
+            raise MemoryError('stribog_copy failed')
+        clone = NativeStribogHash.__new__(NativeStribogHash)
+        clone.digest_size = self.digest_size
+        clone._lib = self._lib
+        clone._ctx = ctx
+        return clone
+
+    def export_state(self):
+        """Состояние хешера в формате hashing.StribogHash.export_state."""
+        out = ctypes.create_string_buffer(self._lib.stribog_state_size())
+        self._lib.stribog_export_state(self._ctx, out)
+        return out.raw
+
+    @classmethod
+    def from_state(cls, state, library_path=None):
+        lib = load_library(library_path)
+        state = bytes(state)
+        if len(state) != lib.stribog_state_size():
+            raise ValueError('Invalid state size')
+        err = ctypes.create_string_buffer(256)
+        ctx = lib.stribog_import_state(state, err, len(err))
+        if not ctx:
+            raise ValueError(err.value.decode('utf-8', 'replace'))
+        return cls(digest_size=state[8], library_path=library_path, _ctx=ctx)
+
+    def digest(self):
+        out = ctypes.create_string_buffer(self.digest_size)
+        self._lib.stribog_final(self._ctx, out)
+        return out.raw
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def __del__(self):
+        ctx = getattr(self, '_ctx', None)
+        if ctx:
+            self._lib.stribog_free(ctx)
+            self._ctx = None
+
+
+def gost_hash_by_library(file_path, library_path=None, digest_size=64):
+    """Хеширует файл нативной библиотекой в текущем процессе (без запуска бинарника)."""
+    if digest_size not in (32, 64):
+        raise ValueError('digest_size must be 32 or 64')
+    lib = load_library(library_path)
+    out = ctypes.create_string_buffer(digest_size)
+    err = ctypes.create_string_buffer(256)
+    path = os.fsencode(os.path.abspath(os.fsdecode(file_path)))
+    if lib.stribog_hash_file(path, 1 if digest_size == 64 else 0, out, err, len(err)) != 0:
+        raise RuntimeError(err.value.decode('utf-8', 'replace'))
+    return out.raw.hex()
+
+
+def gost_hash_both_by_library(file_path, library_path=None):
+    """Стрибог-256 и Стрибог-512 файла за одно чтение нативной библиотекой."""
+    lib = load_library(library_path)
+    out256 = ctypes.create_string_buffer(32)
+    out512 = ctypes.create_string_buffer(64)
+    err = ctypes.create_string_buffer(256)
+    path = os.fsencode(os.path.abspath(os.fsdecode(file_path)))
+    if lib.stribog_hash_file_both(path, out256, out512, err, len(err)) != 0:
+        raise RuntimeError(err.value.decode('utf-8', 'replace'))
+    return {'streebog256': out256.raw.hex(), 'streebog512': out512.raw.hex()}
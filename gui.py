@@ -1,15 +1,347 @@
 """
 Графический интерфейс на tkinter для выбора файла, отображения и сравнения хеша.
+
+Хеширование и обход папок идут в фоновых потоках (HashWorker), которые складывают
+события в очередь; главный цикл Tk забирает их через after(), поэтому окно не
+зависает даже на больших файлах, больших деревьях и очередях из сотен файлов.
 """
 
+import os
+import queue
+import threading
+import time
+
+import hashing
+
+# Период опроса очереди событий (мс) и лимит событий за один тик
+POLL_INTERVAL_MS = 50
+MAX_EVENTS_PER_POLL = 500
+
+
 def process_file_and_compare(file_path, reference_hash):
     """Обрабатывает файл, вычисляет хеш и сравнивает с эталоном. Возвращает (хеш, совпадение: bool)."""
-    raise NotImplementedError
+    file_hash = gost_hash(file_path)
+    is_match = compare_hashes(file_hash, reference_hash)
+    return (file_hash, is_match)
 
 def gost_hash(file_like):
-    raise NotImplementedError
+    return hashing.gost_hash(file_like)
 
 def compare_hashes(hash1, hash2):
-    raise NotImplementedError
+    return hashing.compare_hashes(hash1, hash2)
+
+
+class HashCancelled(Exception):
+    """Хеширование текущего файла отменено пользователем."""
+
+
+class HashWorker:
+    """Фоновый поток, хеширующий файлы из очереди заданий.
+
+    События для GUI кладутся в events:
+      ('queued', job_id, path)       — файл найден обходом папки (submit_folder)
+      ('scan_error', path, message)  — каталог не удалось прочитать при обходе
+      ('scan_done', folder, count)   — обход папки закончен, count файлов в очереди
+      ('start', job_id, path, size)
+      ('progress', job_id, done_bytes, size, mb_per_s)
+      ('done', job_id, hexdigest)
+      ('error', job_id, message)
+      ('cancelled', job_id)
+    """
+
+    def __init__(self, events=None, progress_every=hashing.CHUNK_SIZE):
+        self.events = events if events is not None else queue.Queue()
+        self.progress_every = progress_every
+        self._jobs = queue.Queue()
+        self._cancel_current = threading.Event()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._thread = threading.Thread(target=self._run, name='HashWorker', daemon=True)
+        self._thread.start()
+
+    def submit(self, path):
+        """Ставит файл в очередь, возвращает идентификатор задания."""
+        with self._lock:
+            return self._submit(path, self._generation)
+
+    def _submit(self, path, generation, announce=False):
+        # Вызывается под self._lock; 'queued' кладётся до задания, чтобы опередить его 'start'
+        job_id = self._next_id
+        self._next_id += 1
+        if announce:
+            self.events.put(('queued', job_id, path))
+        self._jobs.put((generation, job_id, path))
+        return job_id
+
+    def submit_folder(self, folder):
+        """Обходит папку в отдельном потоке и ставит найденные файлы в очередь.
+
+        Файлы сообщаются событиями 'queued' по мере обхода, и хеширование
+        начинается, не дожидаясь его конца; cancel_all останавливает и обход.
+        """
+        with self._lock:
+            generation = self._generation
+        thread = threading.Thread(target=self._scan, args=(folder, generation), name='HashWorker-scan', daemon=True)
+        thread.start()
+        return thread
+
+    def _scan(self, folder, generation):
+        import manifest
+
+        def onerror(e):
+            self.events.put(('scan_error', e.filename, str(e)))
+
+        count = 0
+        for rel, _ in manifest.iter_files(folder, onerror):
+            with self._lock:
+                if generation != self._generation:
+                    break
+                self._submit(os.path.join(folder, *rel.split('/')), generation, announce=True)
+            count += 1
+        self.events.put(('scan_done', folder, count))
+
+    def cancel_current(self):
+        """Отменяет файл, который хешируется сейчас."""
+        self._cancel_current.set()
+
+    def cancel_all(self):
+        """Отменяет текущий файл и все ещё не начатые задания."""
+        with self._lock:
+            self._generation += 1
+        self._cancel_current.set()
+
+    def stop(self):
+        self.cancel_all()
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            generation, job_id, path = job
+            with self._lock:
+                stale = generation != self._generation
+            if stale:
+                self.events.put(('cancelled', job_id))
+                continue
+            self._cancel_current.clear()
+            self._hash_one(job_id, path)
+
+    def _hash_one(self, job_id, path):
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            self.events.put(('error', job_id, str(e)))
+            return
+        self.events.put(('start', job_id, path, size))
+        started = time.perf_counter()
+
+        def progress(done, stats):
+            if self._cancel_current.is_set():
+                raise HashCancelled()
+            elapsed = time.perf_counter() - started
+            speed = done / elapsed / 1e6 if elapsed > 0 else 0.0
+            self.events.put(('progress', job_id, done, size, speed))
+
+        try:
+            digest = hashing.gost_hash(path, progress=progress, progress_every=self.progress_every)
+        except HashCancelled:
+            self.events.put(('cancelled', job_id))
+        except Exception as e:
+            self.events.put(('error', job_id, str(e)))
+        else:
+            self.events.put(('done', job_id, digest))
+
+
+class VirtualList:
+    """Виртуализированный список на ttk.Treeview: в виджете живут только видимые строки.
+
+    Данные хранятся в Python-списке rows; при прокрутке меняются значения
+    фиксированного набора элементов Treeview, поэтому тысячи строк не тормозят окно.
+    """
+
+    def __init__(self, master, columns, headings, height=20):
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.rows = []
+        self.height = height
+        self.offset = 0
+        self.frame = ttk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show='headings', height=height,
+                                 selectmode='browse')
+        for column, heading in zip(columns, headings):
+            self.tree.heading(column, text=heading)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scroll)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+        self._items = [self.tree.insert('', 'end', values=()) for _ in range(height)]
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(3))
+        self._dirty = True
+
+    def append(self, values):
+        self.rows.append(values)
+        self._dirty = True
+        return len(self.rows) - 1
+
+    def update_row(self, index, values):
+        self.rows[index] = values
+        if self.offset <= index < self.offset + self.height:
+            self._dirty = True
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, max(0, len(self.rows) - self.height)))
+        self._dirty = True
+        self.refresh()
+
+    def scroll_by(self, delta):
+        self.scroll_to(self.offset + delta)
+
+    def _on_wheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_scroll(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == 'scroll':
+            step = self.height if args[2] == 'pages' else 1
+            self.scroll_by(int(args[1]) * step)
+
+    def refresh(self):
+        """Перерисовывает видимое окно строк, если что-то изменилось."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        for i, item in enumerate(self._items):
+            index = self.offset + i
+            self.tree.item(item, values=self.rows[index] if index < len(self.rows) else ())
+        total = len(self.rows)
+        if total <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+
+
+class HasherApp:
+    """Главное окно: выбор файлов/папки, очередь хеширования, прогресс и сравнение с эталоном."""
+
+    def __init__(self, root):
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.root = root
+        root.title('ГОСТ 34.11-2012 — хеширование файлов')
+        self.worker = HashWorker()
+        self._row_of_job = {}
+        self._path_of_job = {}
+
+        toolbar = ttk.Frame(root)
+        toolbar.pack(fill=tk.X, padx=6, pady=4)
+        ttk.Button(toolbar, text='Файлы…', command=self.choose_files).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text='Папка…', command=self.choose_folder).pack(side=tk.LEFT, padx=4)
+        ttk.Button(toolbar, text='Отменить файл', command=self.worker.cancel_current).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text='Отменить всё', command=self.worker.cancel_all).pack(side=tk.LEFT, padx=4)
+
+        reference = ttk.Frame(root)
+        reference.pack(fill=tk.X, padx=6)
+        ttk.Label(reference, text='Эталонный хеш:').pack(side=tk.LEFT)
+        self.reference_var = tk.StringVar()
+        ttk.Entry(reference, textvariable=self.reference_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        status = ttk.Frame(root)
+        status.pack(fill=tk.X, padx=6, pady=4)
+        self.progress = ttk.Progressbar(status, mode='determinate', maximum=1.0)
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.status_var = tk.StringVar(value='Готово')
+        ttk.Label(status, textvariable=self.status_var, width=40).pack(side=tk.LEFT, padx=4)
+
+        self.results = VirtualList(root, ('path', 'state', 'hash', 'match'),
+                                   ('Файл', 'Состояние', 'Хеш', 'Совпадение'))
+        self.results.frame.pack(fill=tk.BOTH, expand=True, padx=6, pady=4)
+
+        root.protocol('WM_DELETE_WINDOW', self.close)
+        root.after(POLL_INTERVAL_MS, self.poll)
+
+    def choose_files(self):
+        from tkinter import filedialog
+
+        self.enqueue(filedialog.askopenfilenames())
+
+    def choose_folder(self):
+        from tkinter import filedialog
+
+        folder = filedialog.askdirectory()
+        if folder:
+            # Обход идёт в потоке воркера, строки добавляются по событиям 'queued'
+            self.status_var.set(f'Обход {folder}…')
+            self.worker.submit_folder(folder)
+
+    def enqueue(self, paths):
+        for path in paths:
+            self._add_row(self.worker.submit(path), path)
+
+    def _add_row(self, job_id, path):
+        self._row_of_job[job_id] = self.results.append((path, 'в очереди', '', ''))
+        self._path_of_job[job_id] = path
+
+    def _set_row(self, job_id, state, digest='', match=''):
+        self.results.update_row(self._row_of_job[job_id], (self._path_of_job[job_id], state, digest, match))
+
+    def poll(self):
+        """Забирает события воркера без блокировки и обновляет виджеты."""
+        events = self.worker.events
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+            kind, job_id = event[0], event[1]
+            if kind == 'queued':
+                self._add_row(job_id, event[2])
+            elif kind == 'scan_error':
+                self.results.append((event[1], f'ошибка: {event[2]}', '', ''))
+            elif kind == 'scan_done':
+                self.status_var.set(f'Найдено файлов: {event[2]}')
+            elif kind == 'start':
+                self.progress['value'] = 0.0
+                self.status_var.set(os.path.basename(event[2]))
+                self._set_row(job_id, 'хеширование')
+            elif kind == 'progress':
+                done, size, speed = event[2:]
+                self.progress['value'] = done / size if size else 1.0
+                self.status_var.set(f'{done / 1e6:.1f} / {size / 1e6:.1f} МБ, {speed:.2f} МБ/с')
+            elif kind == 'done':
+                digest = event[2]
+                reference = self.reference_var.get().strip()
+                match = ('да' if compare_hashes(digest, reference) else 'нет') if reference else ''
+                self.progress['value'] = 1.0
+                self._set_row(job_id, 'готово', digest, match)
+            elif kind == 'error':
+                self._set_row(job_id, f'ошибка: {event[2]}')
+            elif kind == 'cancelled':
+                self._set_row(job_id, 'отменено')
+        self.results.refresh()
+        self.root.after(POLL_INTERVAL_MS, self.poll)
+
+    def close(self):
+        self.worker.cancel_all()
+        self.root.destroy()
+
+
+def main():
+    import tkinter as tk
+
+    root = tk.Tk()
+    HasherApp(root)
+    root.mainloop()
+
 
-# Здесь будет реализация tkinter-интерфейса 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Индекс известных хешей на диске: отсортированные сырые хеши и таблица
+разветвления по первому байту (как в .idx git).
+
+Формат файла:
+  заголовок   — магия ``GOSTIDX1``, размер хеша (uint32), резерв (uint32), число хешей (uint64)
+  fan-out     — 256 × uint64: fanout[b] — число хешей с первым байтом <= b
+  хеши        — count × digest_size байт по возрастанию, без повторов
+
+Индекс открывается через mmap, поэтому запуск мгновенный, а в памяти остаются
+только страницы, которых коснулся двоичный поиск.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+
+import hashing
+import utils
+
+MAGIC = b'GOSTIDX1'
+_HEADER = struct.Struct('<8sIIQ')
+_FANOUT = struct.Struct('<256Q')
+DATA_OFFSET = _HEADER.size + _FANOUT.size
+
+# Сколько хешей сортируется в памяти перед сбросом во временный файл при сборке
+RUN_SIZE = 1 << 20
+
+
+class KnownHashIndex:
+    """Индекс известных хешей только для чтения: contains(digest), contains_many(digests)."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < DATA_OFFSET:
+            self._map.close()
+            raise ValueError(f'{path}: not a hash index')
+        magic, self.digest_size, _, self.count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != DATA_OFFSET + self.count * self.digest_size:
+            self._map.close()
+            raise ValueError(f'{path}: not a hash index')
+        self._fanout = (0,) + _FANOUT.unpack_from(self._map, _HEADER.size)
+        if hasattr(self._map, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            self._map.madvise(mmap.MADV_RANDOM)
+
+    def __len__(self):
+        return self.count
+
+    def _digest_at(self, i):
+        start = DATA_OFFSET + i * self.digest_size
+        return self._map[start:start + self.digest_size]
+
+    def _search(self, digest, lo=0):
+        """Позиция digest в индексе или None; поиск только внутри корзины первого байта."""
+        lo = max(lo, self._fanout[digest[0]])
+        hi = self._fanout[digest[0] + 1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._digest_at(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _normalize(self, digest):
+        """Хеш в виде bytes нужной длины; hex-строки разбираются как в compare_hashes."""
+        if isinstance(digest, str):
+            digest = utils.parse_reference_hash(digest)
+            if not utils.is_valid_hash(digest, (self.digest_size * 2,)):
+                return None
+            return bytes.fromhex(digest)
+        if isinstance(digest, (bytes, bytearray, memoryview)) and len(digest) == self.digest_size:
+            return bytes(digest)
+        return None
+
+    def contains(self, digest):
+        """Есть ли хеш (bytes или hex-строка) в индексе."""
+        digest = self._normalize(digest)
+        if digest is None:
+            return False
+        i = self._search(digest)
+        return i < self.count and self._digest_at(i) == digest
+
+    __contains__ = contains
+
+    def contains_many(self, digests):
+        """Пакетная проверка: список bool в порядке входа.
+
+        Запросы сортируются, и поиск каждого следующего начинается с позиции
+        предыдущего, так что страницы индекса читаются по возрастанию.
+        """
+        digests = [self._normalize(d) for d in digests]
+        result = [False] * len(digests)
+        order = sorted((i for i, d in enumerate(digests) if d is not None), key=digests.__getitem__)
+        lo = 0
+        for i in order:
+            digest = digests[i]
+            lo = self._search(digest, lo)
+            result[i] = lo < self.count and self._digest_at(lo) == digest
+        return result
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._digest_at(i)
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_run(path, digest_size):
+    with open(path, 'rb') as f:
+        while True:
+            digest = f.read(digest_size)
+            if len(digest) < digest_size:
+                return
+            yield digest
+
+
+def _write_index(path, digests, digest_size):
+    """Пишет отсортированные хеши в индекс (через временный файл и os.replace), убирая повторы."""
+    fanout = [0] * 256
+    count = 0
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as out:
+        out.write(bytes(DATA_OFFSET))
+        previous = None
+        for digest in digests:
+            if digest == previous:
+                continue
+            out.write(digest)
+            fanout[digest[0]] += 1
+            count += 1
+            previous = digest
+        total = 0
+        for b in range(256):
+            total += fanout[b]
+            fanout[b] = total
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, digest_size, 0, count))
+        out.write(_FANOUT.pack(*fanout))
+    os.replace(tmp_path, path)
+    return count
+
+
+def build_index(path, digests, digest_size=hashing.HASH_SIZE_512, run_size=RUN_SIZE):
+    """Создаёт индекс из хешей (bytes или hex) или дополняет существующий. Возвращает число хешей.
+
+    Хеши сортируются порциями по run_size во временные файлы и сливаются
+    вместе с уже существующим индексом, поэтому память не зависит от объёма.
+    """
+    existing = None
+    if os.path.exists(path):
+        existing = KnownHashIndex(path)
+        if existing.digest_size != digest_size:
+            existing.close()
+            raise ValueError(f'{path}: index holds {existing.digest_size}-byte digests')
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as tmpdir:
+        runs = []
+        run = []
+
+        def flush():
+            run.sort()
+            run_path = os.path.join(tmpdir, f'run{len(runs)}')
+            with open(run_path, 'wb') as f:
+                f.write(b''.join(run))
+            runs.append(run_path)
+            run.clear()
+
+        for digest in digests:
+            if isinstance(digest, str):
+                digest = bytes.fromhex(utils.parse_reference_hash(digest))
+            if len(digest) != digest_size:
+                raise ValueError(f'Expected {digest_size}-byte digest, got {len(digest)}')
+            run.append(bytes(digest))
+            if len(run) >= run_size:
+                flush()
+        run.sort()
+        sources = [iter(run)] + [_iter_run(run_path, digest_size) for run_path in runs]
+        if existing is not None:
+            sources.append(iter(existing))
+        try:
+            return _write_index(path, heapq.merge(*sources), digest_size)
+        finally:
+            if existing is not None:
+                existing.close()
+
+
+def manifest_digests(manifest_path, digest_size=hashing.HASH_SIZE_512):
+    """Выдаёт сырые хеши нужной длины из манифеста; прочие и некорректные строки пропускаются."""
+    import manifest
+
+    with open(manifest_path, encoding='utf-8', newline='\n') as lines:
+        for line in lines:
+            try:
+                _, _, hexdigest = manifest.parse_entry(line)
+            except ValueError:
+                continue
+            hexdigest = utils.parse_reference_hash(hexdigest)
+            if utils.is_valid_hash(hexdigest, (digest_size * 2,)):
+                yield bytes.fromhex(hexdigest)
+
+
+def add_manifests(index_path, manifest_paths, digest_size=hashing.HASH_SIZE_512):
+    """Добавляет в индекс хеши из манифестов (manifest.write_manifest), возвращает размер индекса."""
+    def digests():
+        for manifest_path in manifest_paths:
+            yield from manifest_digests(manifest_path, digest_size)
+    return build_index(index_path, digests(), digest_size)
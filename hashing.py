@@ -1,11 +1,1074 @@
 """
 Модуль для вычисления хеша по ГОСТ 34.11-2012 и сравнения хешей.
+
+Реализация побитно совпадает с ``StribogHash`` из ``ConsoleApplication2.cpp``,
+но преобразования S, P и L объединены в 8 таблиц по 256 64-битных слов,
+поэтому одно LPS-преобразование — это 64 выборки из таблиц и XOR.
 """
 
-def gost_hash(file_like_or_path):
-    """Вычисляет хеш файла по ГОСТ 34.11-2012. Принимает путь к файлу или file-like объект."""
-    raise NotImplementedError
+import itertools
+import mmap
+import os
+import stat
+import struct
+import sys
+import time
+
+BLOCK_SIZE = 64
+HASH_SIZE_256 = 32
+HASH_SIZE_512 = 64
+
+# Размер порции чтения файла
+CHUNK_SIZE = 64 * 1024
+
+# Таблица замен
+PI = bytes((
+    0xFC, 0xEE, 0xDD, 0x11, 0xCF, 0x6E, 0x31, 0x16, 0xFB, 0xC4, 0xFA, 0xDA, 0x23, 0xC5, 0x04, 0x4D,
+    0xE9, 0x77, 0xF0, 0xDB, 0x93, 0x2E, 0x99, 0xBA, 0x17, 0x36, 0xF1, 0xBB, 0x14, 0xCD, 0x5F, 0xC1,
+    0xF9, 0x18, 0x65, 0x5A, 0xE2, 0x5C, 0xEF, 0x21, 0x81, 0x1C, 0x3C, 0x42, 0x8B, 0x01, 0x8E, 0x4F,
+    0x05, 0x84, 0x02, 0xAE, 0xE3, 0x6A, 0x8F, 0xA0, 0x06, 0x0B, 0xED, 0x98, 0x7F, 0xD4, 0xD3, 0x1F,
+    0xEB, 0x34, 0x2C, 0x51, 0xEA, 0xC8, 0x48, 0xAB, 0xF2, 0x2A, 0x68, 0xA2, 0xFD, 0x3A, 0xCE, 0xCC,
+    0xB5, 0x70, 0x0E, 0x56, 0x08, 0x0C, 0x76, 0x12, 0xBF, 0x72, 0x13, 0x47, 0x9C, 0xB7, 0x5D, 0x87,
+    0x15, 0xA1, 0x96, 0x29, 0x10, 0x7B, 0x9A, 0xC7, 0xF3, 0x91, 0x78, 0x6F, 0x9D, 0x9E, 0xB2, 0xB1,
+    0x32, 0x75, 0x19, 0x3D, 0xFF, 0x35, 0x8A, 0x7E, 0x6D, 0x54, 0xC6, 0x80, 0xC3, 0xBD, 0x0D, 0x57,
+    0xDF, 0xF5, 0x24, 0xA9, 0x3E, 0xA8, 0x43, 0xC9, 0xD7, 0x79, 0xD6, 0xF6, 0x7C, 0x22, 0xB9, 0x03,
+    0xE0, 0x0F, 0xEC, 0xDE, 0x7A, 0x94, 0xB0, 0xBC, 0xDC, 0xE8, 0x28, 0x50, 0x4E, 0x33, 0x0A, 0x4A,
+    0xA7, 0x97, 0x60, 0x73, 0x1E, 0x00, 0x62, 0x44, 0x1A, 0xB8, 0x38, 0x82, 0x64, 0x9F, 0x26, 0x41,
+    0xAD, 0x45, 0x46, 0x92, 0x27, 0x5E, 0x55, 0x2F, 0x8C, 0xA3, 0xA5, 0x7D, 0x69, 0xD5, 0x95, 0x3B,
+    0x07, 0x58, 0xB3, 0x40, 0x86, 0xAC, 0x1D, 0xF7, 0x30, 0x37, 0x6B, 0xE4, 0x88, 0xD9, 0xE7, 0x89,
+    0xE1, 0x1B, 0x83, 0x49, 0x4C, 0x3F, 0xF8, 0xFE, 0x8D, 0x53, 0xAA, 0x90, 0xCA, 0xD8, 0x85, 0x61,
+    0x20, 0x71, 0x67, 0xA4, 0x2D, 0x2B, 0x09, 0x5B, 0xCB, 0x9B, 0x25, 0xD0, 0xBE, 0xE5, 0x6C, 0x52,
+    0x59, 0xA6, 0x74, 0xD2, 0xE6, 0xF4, 0xB4, 0xC0, 0xD1, 0x66, 0xAF, 0xC2, 0x39, 0x4B, 0x63, 0xB6,
+))
+
+# Байты, из которых L_transform в C++ берёт строки матрицы: C[0][63 - j + k]
+# при j = 0 выходит за C[0] и читает первые 7 байт C[1].
+L_WINDOW = bytes((
+    0xb1, 0x08, 0x5b, 0xda, 0x1e, 0xca, 0xda, 0xe9, 0xeb, 0xcb, 0x2f, 0x81, 0xc0, 0x65, 0x7c, 0x1f,
+    0x2f, 0x6a, 0x76, 0x43, 0x2e, 0x45, 0xd0, 0x16, 0x71, 0x4e, 0xb8, 0x8d, 0x75, 0x85, 0xc4, 0xfc,
+    0x4b, 0x7c, 0xe0, 0x91, 0x92, 0x67, 0x69, 0x01, 0xa2, 0x42, 0x2a, 0x08, 0xa4, 0x60, 0xd3, 0x15,
+    0x05, 0x76, 0x74, 0x36, 0xcc, 0x74, 0x4d, 0x23, 0xdd, 0x80, 0x65, 0x59, 0xf2, 0xa6, 0x45, 0x07,
+    0x93, 0xd9, 0x14, 0x45, 0x42, 0xcf, 0x4b,
+))
+
+_MASK_512 = (1 << 512) - 1
+# processBlock прибавляет 512 к каждому байту N с переносом, т.е. прибавляет
+# к N как к 512-битному числу (little-endian) константу 0x0202...0200.
+_N_INCREMENT = int.from_bytes(b'\x00' + b'\x02' * 63, 'little')
+_ROWS = struct.Struct('<8Q')
+
+# Сериализованное состояние (контрольная точка), формат общий с ConsoleApplication2 --state:
+# магия, размер хеша, длина буфера, резерв (в контрольной точке — отпечаток файла, см.
+# _file_fingerprint), число байт, затем h, N, Sigma и буфер по 64 байта
+STATE_MAGIC = b'STRBST01'
+_STATE_HEADER = struct.Struct('<8sBB6xQ')
+STATE_SIZE = _STATE_HEADER.size + 4 * BLOCK_SIZE
+# Отпечаток файла контрольной точки: 6 байт резерва после длины буфера
+_FINGERPRINT_SIZE = 6
+_FINGERPRINT = slice(10, 10 + _FINGERPRINT_SIZE)
+
+
+def _build_lps_tables():
+    """Строит таблицы LPS[j][b]: вклад байта b из строки j в результат S, P и L."""
+    rows = []
+    for bit in range(64):
+        # Строка матрицы L для бита bit (нумерация как в L_transform)
+        rows.append(int.from_bytes(L_WINDOW[63 - bit:71 - bit], 'little'))
+    tables = []
+    for j in range(8):
+        # combos[v] — XOR строк для установленных битов v (старший бит v — строка 8 * j)
+        combos = [0] * 256
+        for v in range(1, 256):
+            low = v & -v
+            combos[v] = combos[v ^ low] ^ rows[8 * j + 7 - low.bit_length() + 1]
+        tables.append(tuple(combos[v] for v in PI))
+    return tuple(tables)
+
+
+LPS_TABLES = _build_lps_tables()
+
+
+def _lps(a0, a1, a2, a3, a4, a5, a6, a7, _t=LPS_TABLES):
+    """Объединённое преобразование LPS над состоянием из 8 строк по 64 бита."""
+    t0, t1, t2, t3, t4, t5, t6, t7 = _t
+    return (
+        t0[a0 & 255] ^ t1[a1 & 255] ^ t2[a2 & 255] ^ t3[a3 & 255]
+        ^ t4[a4 & 255] ^ t5[a5 & 255] ^ t6[a6 & 255] ^ t7[a7 & 255],
+        t0[(a0 >> 8) & 255] ^ t1[(a1 >> 8) & 255] ^ t2[(a2 >> 8) & 255] ^ t3[(a3 >> 8) & 255]
+        ^ t4[(a4 >> 8) & 255] ^ t5[(a5 >> 8) & 255] ^ t6[(a6 >> 8) & 255] ^ t7[(a7 >> 8) & 255],
+        t0[(a0 >> 16) & 255] ^ t1[(a1 >> 16) & 255] ^ t2[(a2 >> 16) & 255] ^ t3[(a3 >> 16) & 255]
+        ^ t4[(a4 >> 16) & 255] ^ t5[(a5 >> 16) & 255] ^ t6[(a6 >> 16) & 255] ^ t7[(a7 >> 16) & 255],
+        t0[(a0 >> 24) & 255] ^ t1[(a1 >> 24) & 255] ^ t2[(a2 >> 24) & 255] ^ t3[(a3 >> 24) & 255]
+        ^ t4[(a4 >> 24) & 255] ^ t5[(a5 >> 24) & 255] ^ t6[(a6 >> 24) & 255] ^ t7[(a7 >> 24) & 255],
+        t0[(a0 >> 32) & 255] ^ t1[(a1 >> 32) & 255] ^ t2[(a2 >> 32) & 255] ^ t3[(a3 >> 32) & 255]
+        ^ t4[(a4 >> 32) & 255] ^ t5[(a5 >> 32) & 255] ^ t6[(a6 >> 32) & 255] ^ t7[(a7 >> 32) & 255],
+        t0[(a0 >> 40) & 255] ^ t1[(a1 >> 40) & 255] ^ t2[(a2 >> 40) & 255] ^ t3[(a3 >> 40) & 255]
+        ^ t4[(a4 >> 40) & 255] ^ t5[(a5 >> 40) & 255] ^ t6[(a6 >> 40) & 255] ^ t7[(a7 >> 40) & 255],
+        t0[(a0 >> 48) & 255] ^ t1[(a1 >> 48) & 255] ^ t2[(a2 >> 48) & 255] ^ t3[(a3 >> 48) & 255]
+        ^ t4[(a4 >> 48) & 255] ^ t5[(a5 >> 48) & 255] ^ t6[(a6 >> 48) & 255] ^ t7[(a7 >> 48) & 255],
+        t0[a0 >> 56] ^ t1[a1 >> 56] ^ t2[a2 >> 56] ^ t3[a3 >> 56]
+        ^ t4[a4 >> 56] ^ t5[a5 >> 56] ^ t6[a6 >> 56] ^ t7[a7 >> 56],
+    )
+
+
+def _split(value):
+    """Разбивает 512-битное число на 8 строк по 64 бита (младшая строка первой)."""
+    return tuple((value >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(8))
+
+
+def _g(h, n, m):
+    """Функция сжатия g_function: h, n, m — кортежи из 8 строк, возвращает новое h."""
+    lps = _lps
+    s = h
+    for _ in range(12):
+        s = lps(*s)
+    s = lps(
+        s[0] ^ h[0] ^ n[0], s[1] ^ h[1] ^ n[1], s[2] ^ h[2] ^ n[2], s[3] ^ h[3] ^ n[3],
+        s[4] ^ h[4] ^ n[4], s[5] ^ h[5] ^ n[5], s[6] ^ h[6] ^ n[6], s[7] ^ h[7] ^ n[7],
+    )
+    return (
+        s[0] ^ m[0], s[1] ^ m[1], s[2] ^ m[2], s[3] ^ m[3],
+        s[4] ^ m[4], s[5] ^ m[5], s[6] ^ m[6], s[7] ^ m[7],
+    )
+
+
+class StribogHash:
+    """Потоковый хешер Стрибог с интерфейсом в стиле hashlib."""
+
+    block_size = BLOCK_SIZE
+
+    def __init__(self, data=b'', digest_size=HASH_SIZE_512):
+        if digest_size not in (HASH_SIZE_256, HASH_SIZE_512):
+            raise ValueError('digest_size must be 32 or 64')
+        self.digest_size = digest_size
+        self._h = _split(0 if digest_size == HASH_SIZE_512 else int.from_bytes(b'\x01' * 64, 'little'))
+        self._n = 0
+        self._sigma = 0
+        self._buffer = bytearray()
+        self._total_size = 0
+        self._tail = 0
+        if data:
+            self.update(data)
+
+    @property
+    def name(self):
+        return 'streebog512' if self.digest_size == HASH_SIZE_512 else 'streebog256'
+
+    def _compress(self, block):
+        """Обрабатывает один полный 64-байтовый блок (аналог processBlock)."""
+        self._n = (self._n + _N_INCREMENT) & _MASK_512
+        self._sigma = (self._sigma + int.from_bytes(block, 'little')) & _MASK_512
+        self._h = _g(self._h, _split(self._n), _ROWS.unpack(block))
+        self._tail = block[-1]
+
+    def update(self, data):
+        """Добавляет данные (bytes, bytearray, memoryview) к хешируемому сообщению."""
+        view = memoryview(data).cast('B')
+        length = len(view)
+        self._total_size += length
+        offset = 0
+        buffer = self._buffer
+        if buffer:
+            take = min(BLOCK_SIZE - len(buffer), length)
+            buffer += view[:take]
+            offset = take
+            if len(buffer) < BLOCK_SIZE:
+                return
+            self._compress(bytes(buffer))
+            del buffer[:]
+        h, n, sigma = self._h, self._n, self._sigma
+        unpack_from = _ROWS.unpack_from
+        end = offset + (length - offset) // BLOCK_SIZE * BLOCK_SIZE
+        while offset < end:
+            block = view[offset:offset + BLOCK_SIZE]
+            n = (n + _N_INCREMENT) & _MASK_512
+            sigma = (sigma + int.from_bytes(block, 'little')) & _MASK_512
+            h = _g(h, _split(n), unpack_from(view, offset))
+            offset += BLOCK_SIZE
+        if offset:
+            self._tail = view[offset - 1]
+        self._h, self._n, self._sigma = h, n, sigma
+        if offset < length:
+            buffer += view[offset:]
+
+    def copy(self):
+        """Возвращает независимую копию текущего состояния хешера."""
+        clone = StribogHash.__new__(StribogHash)
+        clone.digest_size = self.digest_size
+        clone._h = self._h
+        clone._n = self._n
+        clone._sigma = self._sigma
+        clone._buffer = bytearray(self._buffer)
+        clone._total_size = self._total_size
+        clone._tail = self._tail
+        return clone
+
+    def export_state(self):
+        """Возвращает состояние хешера (STATE_SIZE байт) для последующего from_state.
+
+        Кроме данных буфера сохраняется только его последний байт, который
+        участвует в дополнении (см. digest).
+        """
+        buffer = bytearray(self._buffer)
+        buffer += bytes(BLOCK_SIZE - len(buffer))
+        if len(self._buffer) < BLOCK_SIZE - 1:
+            buffer[-1] = self._tail
+        return b''.join((
+            _STATE_HEADER.pack(STATE_MAGIC, self.digest_size, len(self._buffer), self._total_size),
+            _ROWS.pack(*self._h),
+            self._n.to_bytes(BLOCK_SIZE, 'little'),
+            self._sigma.to_bytes(BLOCK_SIZE, 'little'),
+            bytes(buffer),
+        ))
+
+    @classmethod
+    def from_state(cls, state):
+        """Восстанавливает хешер из export_state (или файла состояния ConsoleApplication2 --state)."""
+        state = bytes(state)
+        if len(state) != STATE_SIZE:
+            raise ValueError('Invalid state size')
+        magic, digest_size, buffer_len, total_size = _STATE_HEADER.unpack_from(state)
+        if magic != STATE_MAGIC:
+            raise ValueError('Invalid state')
+        if digest_size not in (HASH_SIZE_256, HASH_SIZE_512):
+            raise ValueError('Invalid state digest size')
+        if buffer_len >= BLOCK_SIZE or total_size % BLOCK_SIZE != buffer_len:
+            raise ValueError('Invalid state buffer length')
+        offset = _STATE_HEADER.size
+        hasher = cls.__new__(cls)
+        hasher.digest_size = digest_size
+        hasher._h = _ROWS.unpack_from(state, offset)
+        hasher._n = int.from_bytes(state[offset + BLOCK_SIZE:offset + 2 * BLOCK_SIZE], 'little')
+        hasher._sigma = int.from_bytes(state[offset + 2 * BLOCK_SIZE:offset + 3 * BLOCK_SIZE], 'little')
+        buffer = state[offset + 3 * BLOCK_SIZE:]
+        hasher._buffer = bytearray(buffer[:buffer_len])
+        hasher._total_size = total_size
+        hasher._tail = buffer[-1]
+        return hasher
+
+    @property
+    def processed_bytes(self):
+        """Сколько байт сообщения уже подано в update."""
+        return self._total_size
+
+    def digest(self):
+        """Возвращает хеш как bytes, не изменяя состояние хешера."""
+        state = self.copy()
+        buffer = state._buffer
+        # final() в C++ не затирает последний байт буфера: если сообщение
+        # короче 63 байт в последнем блоке, там остаётся байт прошлого блока.
+        if len(buffer) < BLOCK_SIZE - 1:
+            buffer += b'\x01' + b'\x00' * (BLOCK_SIZE - len(buffer) - 2) + bytes((state._tail,))
+        else:
+            buffer += b'\x01'
+        state._compress(bytes(buffer))
+        zero = (0,) * 8
+        h = _g(state._h, _split(state._n), zero)
+        h = _g(h, zero, _split(state._sigma))
+        out = _ROWS.pack(*h)
+        if self.digest_size == HASH_SIZE_512:
+            return out
+        return out[HASH_SIZE_512 - HASH_SIZE_256:]
+
+    def hexdigest(self):
+        """Возвращает хеш в виде шестнадцатеричной строки."""
+        return self.digest().hex()
+
+
+def new(data=b'', digest_size=HASH_SIZE_512):
+    """Создаёт новый хешер Стрибог (аналог hashlib.new)."""
+    return StribogHash(data, digest_size)
+
+
+# Конвейер чтения: размер порции и число буферов, которые по кругу заполняет поток-читатель
+READ_AHEAD_CHUNK_SIZE = 1024 * 1024
+READ_AHEAD_BUFFERS = 3
+
+
+def _uses_descriptor(stream):
+    """Читает ли поток из файлового дескриптора (тогда readinto отпускает GIL)."""
+    try:
+        stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return False
+    return True
+
+
+def _remaining(stream):
+    """Сколько байт осталось до конца обычного файла; None для пайпов, сокетов и прочих потоков."""
+    try:
+        st = os.fstat(stream.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return max(0, st.st_size - stream.tell())
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _read_ahead(readinto, chunk_size, buffers, remaining=None):
+    """Порции из потока-читателя, который заполняет buffers заранее выделенных буферов.
+
+    Пока вызывающий код сжимает одну порцию, читатель уже читает следующие;
+    буфер возвращается читателю, когда запрошена следующая порция. Первая
+    порция читается синхронно, и поток запускается, только если данные остались:
+    файл короче порции (remaining — остаток обычного файла) читается одним
+    вызовом в буфер по его размеру.
+    """
+    import queue
+    import threading
+
+    first = bytearray(chunk_size if remaining is None else min(chunk_size, remaining + 1))
+    n = readinto(first)
+    if n is None:
+        raise ValueError('non-blocking streams are not supported')
+    if not n:
+        return
+    yield memoryview(first)[:n]
+    # Короткое чтение обычного файла — конец данных
+    if remaining is not None and n < len(first):
+        return
+    del first
+
+    free = queue.SimpleQueue()
+    filled = queue.SimpleQueue()
+    for _ in range(buffers):
+        free.put(bytearray(chunk_size))
+    stop = threading.Event()
+
+    def reader():
+        try:
+            while True:
+                buffer = free.get()
+                if buffer is None or stop.is_set():
+                    return
+                n = readinto(buffer)
+                if n is None:
+                    raise ValueError('non-blocking streams are not supported')
+                filled.put((buffer, n))
+                if not n:
+                    return
+        except BaseException as e:
+            filled.put((None, e))
+
+    thread = threading.Thread(target=reader, name='hashing-read-ahead', daemon=True)
+    thread.start()
+    finished = False
+    try:
+        while True:
+            buffer, n = filled.get()
+            if buffer is None:
+                raise n
+            if not n:
+                finished = True
+                break
+            yield memoryview(buffer)[:n]
+            free.put(buffer)
+    finally:
+        if not finished:
+            stop.set()
+            free.put(None)
+        # Обычный файл читается за конечное время: читатель дожидается, чтобы вызывающий код
+        # не закрыл дескриптор посреди его readinto. Читатель пайпа или сокета может ждать
+        # данных бесконечно — его только останавливаем, и уже начатый readinto он может
+        # завершить после выхода из генератора.
+        if finished or remaining is not None:
+            thread.join()
+
+
+def _iter_chunks(stream, read_ahead=None, chunk_size=None):
+    """Порции потока до конца; порция действительна до запроса следующей.
+
+    Файлы, пайпы и BytesIO читаются через readinto, сокеты — через recv_into
+    в переиспользуемые буферы, прочие объекты — через read(); память не зависит
+    от длины потока. read_ahead=None включает конвейер чтения (_read_ahead) для
+    потоков с файловым дескриптором.
+    """
+    readinto = getattr(stream, 'readinto', None) or getattr(stream, 'recv_into', None)
+    if readinto is None:
+        read = stream.read
+        while True:
+            chunk = read(chunk_size or CHUNK_SIZE)
+            if isinstance(chunk, str):
+                raise TypeError('stream must be opened in binary mode')
+            if chunk is None:
+                raise ValueError('non-blocking streams are not supported')
+            if not chunk:
+                return
+            yield chunk
+    if read_ahead is None:
+        read_ahead = _uses_descriptor(stream)
+    if read_ahead:
+        yield from _read_ahead(readinto, chunk_size or READ_AHEAD_CHUNK_SIZE, READ_AHEAD_BUFFERS, _remaining(stream))
+        return
+    view = memoryview(bytearray(chunk_size or CHUNK_SIZE))
+    while True:
+        n = readinto(view)
+        if n is None:
+            raise ValueError('non-blocking streams are not supported')
+        if not n:
+            return
+        yield view[:n]
+
+
+def _hash_stream(stream, hasher, read_ahead=None, chunk_size=None):
+    chunks = _iter_chunks(stream, read_ahead, chunk_size)
+    try:
+        for chunk in chunks:
+            hasher.update(chunk)
+    finally:
+        chunks.close()
+    return hasher
+
+
+# Файлы, изменённые меньше MMAP_MIN_AGE секунд назад, считаются дописываемыми и читаются
+# через read(): усечение отображённого файла во время чтения завершает процесс сигналом SIGBUS
+MMAP_MIN_AGE = 2.0
+# Отображение хешируется окнами; перед каждым окном проверяется, что файл не стал короче.
+# Усечение внутри окна по-прежнему приводит к SIGBUS — проверка только сужает это окно
+MMAP_WINDOW = 64 * 1024 * 1024
+
+
+def _hash_mapped(f, hasher):
+    """Хеширует обычный файл через mmap без промежуточных копий.
+
+    Возвращает False, если файл отобразить нельзя (пустой, не обычный файл)
+    или он недавно изменялся (см. MMAP_MIN_AGE). Если файл стал короче во
+    время хеширования, выбрасывает OSError.
+    """
+    fd = f.fileno()
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode) or st.st_size == 0 or time.time() - st.st_mtime < MMAP_MIN_AGE:
+        return False
+    try:
+        mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    size = len(mapped)
+    with mapped:
+        if hasattr(mapped, 'madvise'):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            for pos in range(0, size, MMAP_WINDOW):
+                if os.fstat(fd).st_size < size:
+                    raise OSError(f'{f.name}: file was truncated while hashing')
+                with view[pos:pos + MMAP_WINDOW] as window:
+                    hasher.update(window)
+    return True
+
+
+class HashStats:
+    """Статистика хеширования: время по стадиям (секунды), байты и сжатые блоки."""
+
+    def __init__(self):
+        self.read_time = 0.0
+        self.compress_time = 0.0
+        self.finalize_time = 0.0
+        self.bytes = 0
+        self.blocks = 0
+
+    @property
+    def total_time(self):
+        return self.read_time + self.compress_time + self.finalize_time
+
+    def as_dict(self):
+        return {
+            'read_time': self.read_time,
+            'compress_time': self.compress_time,
+            'finalize_time': self.finalize_time,
+            'bytes': self.bytes,
+            'blocks': self.blocks,
+        }
+
+    def __repr__(self):
+        return (f'HashStats(read={self.read_time:.6f}s, compress={self.compress_time:.6f}s, '
+                f'finalize={self.finalize_time:.6f}s, bytes={self.bytes}, blocks={self.blocks})')
+
+
+# Интервал вызова progress-колбэка по умолчанию
+PROGRESS_EVERY = 1024 * 1024
+
+
+def _hash_stream_instrumented(stream, hasher, stats, progress, progress_every, read_ahead=None, chunk_size=None):
+    """Цикл чтения с замером времени чтения и сжатия и вызовом progress(bytes, stats).
+
+    С конвейером чтения read_time — время ожидания очередной порции от читателя.
+    Порции по умолчанию CHUNK_SIZE, чтобы progress (и отмена из него) срабатывали часто.
+    """
+    clock = time.perf_counter
+    chunks = _iter_chunks(stream, read_ahead, chunk_size or CHUNK_SIZE)
+    next_report = progress_every
+    try:
+        while True:
+            t0 = clock()
+            chunk = next(chunks, None)
+            t1 = clock()
+            stats.read_time += t1 - t0
+            if chunk is None:
+                break
+            hasher.update(chunk)
+            stats.compress_time += clock() - t1
+            stats.bytes += len(chunk)
+            if progress is not None and stats.bytes >= next_report:
+                progress(stats.bytes, stats)
+                next_report = (stats.bytes // progress_every + 1) * progress_every
+    finally:
+        chunks.close()
+    return hasher
+
+
+# Каждые сколько байт gost_hash_resumable сохраняет контрольную точку
+CHECKPOINT_EVERY = 256 * 1024 * 1024
+
+
+def _file_fingerprint(f, st, aligned):
+    """Отпечаток файла для контрольной точки (6 байт резерва заголовка).
+
+    Первые байты Стрибог-256 от st_dev, st_ino и последнего полного блока перед
+    смещением aligned: замена файла видна, даже если у точки нет незавершённого блока.
+    """
+    f.seek(aligned - min(aligned, BLOCK_SIZE))
+    block = f.read(aligned - f.tell())
+    data = struct.pack('<QQ', st.st_dev, st.st_ino) + block
+    return StribogHash(data, HASH_SIZE_256).digest()[:_FINGERPRINT_SIZE]
+
+
+def save_state(state_path, hasher, fingerprint=None):
+    """Атомарно записывает состояние хешера в файл (через временный файл и os.replace).
+
+    Временный файл сбрасывается на диск до замены, поэтому после сбоя на месте
+    точки остаётся старая или новая, но не недописанная. fingerprint
+    (см. _file_fingerprint) записывается в резерв заголовка.
+    """
+    state = bytearray(hasher.export_state())
+    if fingerprint is not None:
+        state[_FINGERPRINT] = fingerprint
+    tmp_path = f'{os.fsdecode(state_path)}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _load_checkpoint(state_path, f, st, digest_size):
+    """Хешер из контрольной точки, если она подходит к файлу f, иначе None.
+
+    Подходит точка, смещение которой не больше размера файла, отпечаток
+    (_file_fingerprint) и байты незавершённого блока совпадают с файлом;
+    иначе файл считается заменённым. Повреждённая точка (не тот размер,
+    неверный заголовок) тоже не подходит.
+    """
+    try:
+        with open(state_path, 'rb') as saved:
+            state = saved.read(STATE_SIZE + 1)
+    except FileNotFoundError:
+        return None
+    try:
+        hasher = StribogHash.from_state(state)
+    except ValueError:
+        return None
+    if hasher.digest_size != digest_size:
+        raise ValueError('State digest size mismatch')
+    offset = hasher.processed_bytes
+    pending = len(hasher._buffer)
+    if offset > st.st_size:
+        return None
+    if _file_fingerprint(f, st, offset - pending) != state[_FINGERPRINT]:
+        return None
+    if f.read(pending) != hasher._buffer:
+        return None
+    return hasher
+
+
+def gost_hash_resumable(path, state_path, digest_size=HASH_SIZE_512, checkpoint_every=CHECKPOINT_EVERY):
+    """Хеширует файл с контрольной точкой в state_path.
+
+    Если точка есть и подходит к файлу, хеширование продолжается с сохранённого
+    смещения. Состояние сохраняется каждые checkpoint_every байт и в конце, поэтому
+    прерванное хеширование не начинается заново, а для дописываемого файла
+    (журнала) следующий вызов хеширует только новые байты. Формат точки общий
+    с ConsoleApplication2 --state.
+    """
+    # Отпечаток читается через отдельный объект файла: f в это время читает поток-читатель
+    with open(path, 'rb') as f, open(path, 'rb') as probe:
+        st = os.fstat(f.fileno())
+        hasher = _load_checkpoint(state_path, f, st, digest_size)
+        if hasher is None:
+            hasher = StribogHash(digest_size=digest_size)
+        f.seek(hasher.processed_bytes)
+
+        def checkpoint():
+            offset = hasher.processed_bytes
+            save_state(state_path, hasher, _file_fingerprint(probe, st, offset - offset % BLOCK_SIZE))
+
+        since_checkpoint = 0
+        chunks = _iter_chunks(f)
+        try:
+            for chunk in chunks:
+                hasher.update(chunk)
+                since_checkpoint += len(chunk)
+                if since_checkpoint >= checkpoint_every:
+                    checkpoint()
+                    since_checkpoint = 0
+        finally:
+            chunks.close()
+        checkpoint()
+    return hasher.hexdigest()
+
+
+class MultiStribogHash:
+    """Несколько состояний Стрибог разной длины, получающих одни и те же данные.
+
+    Позволяет получить Стрибог-256 и Стрибог-512 за одно чтение входа; данные
+    подаются окнами по CHUNK_SIZE, чтобы второе состояние читало их из кеша.
+    """
+
+    def __init__(self, data=b'', digest_sizes=(HASH_SIZE_256, HASH_SIZE_512)):
+        if not digest_sizes:
+            raise ValueError('digest_sizes must not be empty')
+        self.hashers = [StribogHash(digest_size=size) for size in digest_sizes]
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        view = memoryview(data).cast('B')
+        hashers = self.hashers
+        for start in range(0, len(view), CHUNK_SIZE):
+            window = view[start:start + CHUNK_SIZE]
+            for hasher in hashers:
+                hasher.update(window)
+
+    def copy(self):
+        clone = MultiStribogHash.__new__(MultiStribogHash)
+        clone.hashers = [hasher.copy() for hasher in self.hashers]
+        return clone
+
+    def digests(self):
+        """Возвращает {имя алгоритма: хеш bytes}, например {'streebog256': ..., 'streebog512': ...}."""
+        return {hasher.name: hasher.digest() for hasher in self.hashers}
+
+    def hexdigests(self):
+        return {hasher.name: hasher.hexdigest() for hasher in self.hashers}
+
+
+def _feed(file_like_or_path, hasher, stats, progress, progress_every, read_ahead=None, chunk_size=None):
+    """Подаёт в hasher содержимое файла по пути или file-like объекта.
+
+    Путь по умолчанию хешируется через mmap; read_ahead=True читает его конвейером
+    (полезно на сетевых ФС, где отображение страниц не перекрывается со сжатием).
+    """
+    instrumented = stats is not None
+    if isinstance(file_like_or_path, (str, bytes, os.PathLike)):
+        with open(file_like_or_path, 'rb', buffering=0) as f:
+            if instrumented:
+                _hash_stream_instrumented(f, hasher, stats, progress, progress_every, read_ahead, chunk_size)
+            elif read_ahead or not _hash_mapped(f, hasher):
+                _hash_stream(f, hasher, read_ahead, chunk_size)
+    elif hasattr(file_like_or_path, 'read') or hasattr(file_like_or_path, 'recv_into'):
+        if instrumented:
+            _hash_stream_instrumented(file_like_or_path, hasher, stats, progress, progress_every,
+                                      read_ahead, chunk_size)
+        else:
+            _hash_stream(file_like_or_path, hasher, read_ahead, chunk_size)
+    else:
+        raise TypeError('Unsupported file_like type')
+
+
+def _finalize(finalize, stats, states):
+    if stats is None:
+        return finalize()
+    t0 = time.perf_counter()
+    result = finalize()
+    stats.finalize_time += time.perf_counter() - t0
+    # Полные блоки, блок дополнения и два финальных вызова g на каждое состояние
+    stats.blocks += states * (stats.bytes // BLOCK_SIZE + 3)
+    return result
+
+
+def gost_hash(file_like_or_path, stats=None, progress=None, progress_every=PROGRESS_EVERY,
+              digest_size=HASH_SIZE_512, read_ahead=None, chunk_size=None):
+    """Вычисляет хеш файла по ГОСТ 34.11-2012. Принимает путь к файлу или file-like объект.
+
+    Поток (файл, пайп, BytesIO, сокет) читается порциями до конца, целиком в память не загружается.
+    Потоки с файловым дескриптором читаются в отдельном потоке, пока сжимается предыдущая
+    порция; read_ahead=False отключает это, read_ahead=True включает и для путей (вместо mmap).
+    chunk_size — размер порции чтения.
+
+    Если передан stats (HashStats) или progress, файл читается через read(),
+    а не mmap, чтобы время чтения и сжатия измерялось раздельно; progress(bytes, stats)
+    вызывается примерно каждые progress_every байт.
+    """
+    if progress is not None and stats is None:
+        stats = HashStats()
+    hasher = StribogHash(digest_size=digest_size)
+    _feed(file_like_or_path, hasher, stats, progress, progress_every, read_ahead, chunk_size)
+    return _finalize(hasher.hexdigest, stats, 1)
+
+
+def gost_hash_multi(file_like_or_path, digest_sizes=(HASH_SIZE_256, HASH_SIZE_512), stats=None,
+                    progress=None, progress_every=PROGRESS_EVERY, read_ahead=None, chunk_size=None):
+    """Вычисляет несколько хешей (по умолчанию Стрибог-256 и -512) за одно чтение входа.
+
+    Возвращает {'streebog256': hex, 'streebog512': hex}.
+    """
+    if progress is not None and stats is None:
+        stats = HashStats()
+    hasher = MultiStribogHash(digest_sizes=digest_sizes)
+    _feed(file_like_or_path, hasher, stats, progress, progress_every, read_ahead, chunk_size)
+    return _finalize(hasher.hexdigests, stats, len(hasher.hashers))
+
+
+_np_tables = None
+
+
+def _np_lps(np, state):
+    """LPS над массивом состояний (m, 8) uint64: выборки из таблиц и XOR по строкам."""
+    t = _np_tables
+    b = state.astype('<u8', copy=False).view(np.uint8).reshape(-1, 8, 8)
+    return np.bitwise_xor.reduce(t[np.arange(8)[:, None], b], axis=1)
+
+
+def _np_g(np, h, n, m):
+    s = h
+    for _ in range(12):
+        s = _np_lps(np, s)
+    return _np_lps(np, s ^ h ^ n) ^ m
+
+
+def _np_add512(np, a, b):
+    """Сложение 512-битных чисел (строки uint64 little-endian) по модулю 2^512."""
+    out = np.empty_like(a)
+    carry = np.zeros(len(a), dtype=np.uint64)
+    for i in range(8):
+        t = a[:, i] + b[:, i]
+        c1 = t < a[:, i]
+        s = t + carry
+        c2 = s < t
+        out[:, i] = s
+        carry = (c1 | c2).astype(np.uint64)
+    return out
+
+
+def gost_hash_batch(messages, digest_size=HASH_SIZE_512, prefix=None):
+    """Хеширует много коротких сообщений сразу, возвращает список hex-хешей в том же порядке.
+
+    Сжатие выполняется для всех сообщений синхронно операциями NumPy: сообщения
+    сортируются по числу блоков, так что на шаге j активен префикс массива
+    состояний, а дополнение и финализация делаются для всех разом. Требует numpy.
+    prefix — StribogHash с целым числом обработанных блоков: каждое сообщение
+    хешируется так, будто подано в prefix.copy() (общий префикс сжимается один раз).
+    """
+    import numpy as np
+
+    global _np_tables
+    if digest_size not in (HASH_SIZE_256, HASH_SIZE_512):
+        raise ValueError('digest_size must be 32 or 64')
+    if prefix is not None and (prefix.digest_size != digest_size or prefix._buffer):
+        raise ValueError('prefix must have the same digest_size and no buffered bytes')
+    messages = [bytes(memoryview(m).cast('B')) for m in messages]
+    if not messages:
+        return []
+    if _np_tables is None:
+        _np_tables = np.array(LPS_TABLES, dtype=np.uint64)
+
+    # Число блоков с учётом блока дополнения; сортировка по убыванию
+    blocks = [len(m) // BLOCK_SIZE + 1 for m in messages]
+    order = sorted(range(len(messages)), key=blocks.__getitem__, reverse=True)
+    counts = np.array([blocks[i] for i in order], dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    padded = bytearray()
+    prefix_tail = prefix._tail if prefix is not None else 0
+    for i in order:
+        m = messages[i]
+        full = len(m) - len(m) % BLOCK_SIZE
+        tail = m[full:]
+        stale = m[full - 1] if full else prefix_tail
+        padded += m[:full]
+        if len(tail) < BLOCK_SIZE - 1:
+            padded += tail + b'\x01' + b'\x00' * (BLOCK_SIZE - len(tail) - 2) + bytes((stale,))
+        else:
+            padded += tail + b'\x01'
+    data = np.frombuffer(bytes(padded), dtype='<u8').astype(np.uint64).reshape(-1, 8)
+
+    max_blocks = int(counts[0])
+    skip = prefix.processed_bytes // BLOCK_SIZE if prefix is not None else 0
+    n_rows = np.array([_split(((skip + j + 1) * _N_INCREMENT) & _MASK_512) for j in range(max_blocks)],
+                      dtype=np.uint64)
+
+    total = len(messages)
+    if prefix is None:
+        init = 0 if digest_size == HASH_SIZE_512 else 0x0101010101010101
+        h = np.full((total, 8), init, dtype=np.uint64)
+        sigma = np.zeros((total, 8), dtype=np.uint64)
+    else:
+        h = np.tile(np.array(prefix._h, dtype=np.uint64), (total, 1))
+        sigma = np.tile(np.array(_split(prefix._sigma), dtype=np.uint64), (total, 1))
+    # Активные сообщения на шаге j — префикс длины active[j]
+    active = np.searchsorted(-counts, -np.arange(1, max_blocks + 1), side='right')
+    for j in range(max_blocks):
+        k = int(active[j])
+        m = data[starts[:k] + j]
+        sigma[:k] = _np_add512(np, sigma[:k], m)
+        h[:k] = _np_g(np, h[:k], n_rows[j], m)
+
+    zero = np.zeros((total, 8), dtype=np.uint64)
+    h = _np_g(np, h, n_rows[counts - 1], zero)
+    h = _np_g(np, h, zero, sigma)
+
+    raw = h.astype('<u8').tobytes()
+    result = [None] * total
+    for pos, i in enumerate(order):
+        digest = raw[pos * BLOCK_SIZE:(pos + 1) * BLOCK_SIZE]
+        result[i] = (digest if digest_size == HASH_SIZE_512 else digest[HASH_SIZE_512 - HASH_SIZE_256:]).hex()
+    return result
+
+
+async def gost_hash_async(path_or_stream, binary_path=None, executor=None):
+    """Асинхронный вариант gost_hash, не блокирующий цикл событий.
+
+    Если задан binary_path, путь хешируется бинарником ConsoleApplication2 через
+    asyncio.create_subprocess_exec; иначе сжатие выполняется в executor
+    (по умолчанию — пул потоков цикла; для путей можно передать ProcessPoolExecutor).
+    """
+    import asyncio
+
+    is_path = isinstance(path_or_stream, (str, bytes, os.PathLike))
+    if binary_path is not None and is_path:
+        from external_gost import parse_hash_output
+
+        proc = await asyncio.create_subprocess_exec(
+            binary_path, os.path.abspath(os.fsdecode(path_or_stream)),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+        if proc.returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8', 'replace'))
+        return parse_hash_output(stdout.decode('utf-8', 'replace'))
+    if not is_path and not hasattr(path_or_stream, 'read') and not hasattr(path_or_stream, 'recv_into'):
+        raise TypeError('Unsupported file_like type')
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, gost_hash, path_or_stream)
+
+
+async def gost_hash_many_async(inputs, concurrency=4, binary_path=None, executor=None):
+    """Асинхронный итератор: хеширует inputs не более чем по concurrency одновременно.
+
+    Выдаёт пары (вход, хеш) по мере готовности.
+    """
+    import asyncio
+
+    if concurrency < 1:
+        raise ValueError('concurrency must be positive')
+    items = iter(inputs)
+    pending = {}
+
+    def fill():
+        for item in items:
+            task = asyncio.ensure_future(gost_hash_async(item, binary_path, executor))
+            pending[task] = item
+            if len(pending) >= concurrency:
+                return
+
+    try:
+        fill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = pending.pop(task)
+                yield item, task.result()
+            fill()
+    finally:
+        for task in pending:
+            task.cancel()
+
 
 def compare_hashes(hash1, hash2):
-    """Сравнивает два хеша, возвращает True/False."""
-    raise NotImplementedError 
\ No newline at end of file
+    """Сравнивает два хеша, возвращает True/False.
+
+    Вместо второго хеша можно передать индекс известных хешей (hashdb.KnownHashIndex):
+    тогда проверяется, есть ли hash1 в индексе.
+    """
+    if hasattr(hash2, 'contains'):
+        return isinstance(hash1, str) and hash2.contains(hash1)
+    if not isinstance(hash1, str) or not isinstance(hash2, str):
+        return False
+    import hmac
+    return hmac.compare_digest(hash1.strip().lower().encode('utf-8'), hash2.strip().lower().encode('utf-8'))
+
+
+# Командная строка: python -m hashing [опции] [ПУТЬ|- ...]
+
+_USAGE = """usage: python -m hashing [-z] [--256] [--backend auto|python|native] [--files-from FILE] [PATH|- ...]
+
+Печатает '<hex>  <путь>' на каждый вход; '-' (или отсутствие путей) — данные из stdin.
+  -z, --zero          завершать записи NUL вместо перевода строки (пути без экранирования)
+  --256               Стрибог-256 вместо Стрибог-512
+  --backend NAME      auto (по умолчанию): крупные файлы через libstribog, если она собрана
+  --files-from FILE   список путей через NUL ('-' — из stdin)
+"""
+
+# С какого размера файла в режиме auto используется libstribog (импорт ctypes окупается)
+NATIVE_MIN_SIZE = 256 * 1024
+
+
+class _CliError(Exception):
+    pass
+
+
+def _parse_cli(argv):
+    options = {'zero': False, 'digest_size': HASH_SIZE_512, 'backend': 'auto', 'files_from': None}
+    paths = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--':
+            paths.extend(args)
+        elif arg in ('-h', '--help'):
+            raise _CliError(None)
+        elif arg in ('-z', '--zero'):
+            options['zero'] = True
+        elif arg == '--256':
+            options['digest_size'] = HASH_SIZE_256
+        elif arg.startswith('--backend') or arg.startswith('--files-from'):
+            name, sep, value = arg.partition('=')
+            if not sep:
+                value = next(args, None)
+                if value is None:
+                    raise _CliError(f'{name} requires a value')
+            if name == '--backend':
+                if value not in ('auto', 'python', 'native'):
+                    raise _CliError(f'unknown backend: {value}')
+                options['backend'] = value
+            elif name == '--files-from':
+                options['files_from'] = value
+            else:
+                raise _CliError(f'unknown option: {arg}')
+        elif arg.startswith('-') and arg != '-':
+            raise _CliError(f'unknown option: {arg}')
+        else:
+            paths.append(arg)
+    return options, paths
+
+
+def _iter_files_from(source):
+    """Пути (bytes) из списка через NUL; последний NUL необязателен."""
+    tail = b''
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = (tail + chunk).split(b'\0')
+        tail = parts.pop()
+        for part in parts:
+            if part:
+                yield part
+    if tail:
+        yield tail
+
+
+class _CliHasher:
+    """Выбирает движок для каждого входа; external_gost импортируется только при необходимости."""
+
+    def __init__(self, digest_size, backend):
+        self.digest_size = digest_size
+        self.backend = backend
+        self._native = None
+
+    def native(self):
+        if self._native is None:
+            import external_gost
+            available = os.path.exists(external_gost.default_library_path())
+            if not available and self.backend == 'native':
+                raise _CliError('libstribog is not built')
+            self._native = external_gost if available else False
+        return self._native
+
+    def hash_stdin(self, stream):
+        native = self.backend != 'python' and self.native()
+        hasher = native.NativeStribogHash(digest_size=self.digest_size) if native else new(b'', self.digest_size)
+        _hash_stream(stream, hasher)
+        return hasher.hexdigest()
+
+    def hash_path(self, path):
+        if self.backend != 'python':
+            size = os.stat(path).st_size
+            if self.backend == 'native' or size >= NATIVE_MIN_SIZE:
+                native = self.native()
+                if native:
+                    return native.gost_hash_by_library(path, digest_size=self.digest_size)
+        return gost_hash(path, digest_size=self.digest_size)
+
+
+def main(argv=None):
+    """Точка входа python -m hashing; возвращает код выхода (1 — была хотя бы одна ошибка)."""
+    try:
+        options, paths = _parse_cli(sys.argv[1:] if argv is None else argv)
+    except _CliError as e:
+        if e.args[0] is None:
+            sys.stdout.write(_USAGE)
+            return 0
+        sys.stderr.write(f'hashing: {e.args[0]}\n{_USAGE}')
+        return 2
+    stdin = sys.stdin.buffer
+    listing = None
+    if options['files_from'] is None:
+        inputs = paths or ['-']
+    elif options['files_from'] == '-':
+        if '-' in paths:
+            sys.stderr.write("hashing: '-' cannot be used with --files-from -\n")
+            return 2
+        inputs = itertools.chain(paths, _iter_files_from(stdin))
+    else:
+        try:
+            listing = open(options['files_from'], 'rb')
+        except OSError as e:
+            sys.stderr.write(f'hashing: {e}\n')
+            return 2
+        inputs = itertools.chain(paths, _iter_files_from(listing))
+    try:
+        return _run_cli(inputs, options, stdin)
+    finally:
+        if listing is not None:
+            listing.close()
+
+
+def _run_cli(inputs, options, stdin):
+    hasher = _CliHasher(options['digest_size'], options['backend'])
+    out = sys.stdout.buffer
+    end = b'\0' if options['zero'] else b'\n'
+    status = 0
+    try:
+        for path in inputs:
+            name = os.fsencode(path)
+            try:
+                hexdigest = hasher.hash_stdin(stdin) if path == '-' else hasher.hash_path(path)
+            except _CliError as e:
+                sys.stderr.write(f'hashing: {e.args[0]}\n')
+                return 2
+            except (OSError, RuntimeError, ValueError) as e:
+                sys.stderr.write(f'hashing: {os.fsdecode(name)}: {e}\n')
+                status = 1
+                continue
+            if not options['zero']:
+                name = name.replace(b'\\', b'\\\\').replace(b'\n', b'\\n')
+            out.write(hexdigest.encode('ascii') + b'  ' + name + end)
+    finally:
+        out.flush()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+HMAC на Стрибоге (HMAC_GOSTR3411_2012_256/512, Р 50.1.113-2016).
+
+HMAC(K, m) = H((K' ^ opad) || H((K' ^ ipad) || m)), где K' — ключ, дополненный
+нулями до 64 байт (ключ длиннее 64 байт сначала хешируется). Блоки K' ^ ipad
+и K' ^ opad занимают ровно по одному блоку, поэтому HmacKey сжимает их один раз,
+а каждое сообщение начинает с копии готовых состояний (copy()) — на сообщение
+приходится на два сжатия меньше. Подготовленные ключи кешируются (prepare_key).
+
+Хеш — вариант Стрибога этого репозитория (как ConsoleApplication2), поэтому
+MAC совпадает с эталонами Р 50.1.113 только вместе с хешем.
+"""
+
+import functools
+
+import hashing
+
+# Сколько подготовленных ключей держит prepare_key
+KEY_CACHE_SIZE = 128
+
+_TRANS_36 = bytes(x ^ 0x36 for x in range(256))
+_TRANS_5C = bytes(x ^ 0x5C for x in range(256))
+
+
+def _new_hasher(digest_size, native, data=b''):
+    if native:
+        from external_gost import NativeStribogHash
+        return NativeStribogHash(data, digest_size)
+    return hashing.StribogHash(data, digest_size)
+
+
+class HMAC:
+    """Вычисление HMAC с интерфейсом hmac.HMAC: update, copy, digest, hexdigest."""
+
+    block_size = hashing.BLOCK_SIZE
+
+    def __init__(self, inner, outer):
+        self._inner = inner
+        self._outer = outer
+        self.digest_size = inner.digest_size
+
+    @property
+    def name(self):
+        return f'hmac-{self._inner.name}'
+
+    def update(self, data):
+        self._inner.update(data)
+
+    def copy(self):
+        return HMAC(self._inner.copy(), self._outer)
+
+    def digest(self):
+        outer = self._outer.copy()
+        outer.update(self._inner.digest())
+        return outer.digest()
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+
+class HmacKey:
+    """Ключ HMAC с заранее сжатыми блоками K' ^ ipad и K' ^ opad.
+
+    native=True — хешер из libstribog (external_gost.NativeStribogHash).
+    """
+
+    def __init__(self, key, digest_size=hashing.HASH_SIZE_512, native=False):
+        if digest_size not in (hashing.HASH_SIZE_256, hashing.HASH_SIZE_512):
+            raise ValueError('digest_size must be 32 or 64')
+        key = bytes(key)
+        if len(key) > hashing.BLOCK_SIZE:
+            key = _new_hasher(digest_size, native, key).digest()
+        key = key.ljust(hashing.BLOCK_SIZE, b'\0')
+        self.digest_size = digest_size
+        self.native = native
+        self._inner = _new_hasher(digest_size, native, key.translate(_TRANS_36))
+        self._outer = _new_hasher(digest_size, native, key.translate(_TRANS_5C))
+
+    def new(self, msg=None):
+        """Новый HMAC этого ключа; начинается с копии подготовленных состояний."""
+        mac = HMAC(self._inner.copy(), self._outer)
+        if msg is not None:
+            mac.update(msg)
+        return mac
+
+    def digest(self, msg):
+        """HMAC одного сообщения (bytes)."""
+        return self.new(msg).digest()
+
+    def batch(self, messages):
+        """HMAC для каждого сообщения, список bytes в том же порядке.
+
+        С numpy и хешером Python сжатие идёт через hashing.gost_hash_batch с
+        подготовленными состояниями в качестве общего префикса; иначе — по одному сообщению.
+        """
+        messages = list(messages)
+        if not self.native:
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                pass
+            else:
+                inner = hashing.gost_hash_batch(messages, self.digest_size, prefix=self._inner)
+                outer = hashing.gost_hash_batch([bytes.fromhex(d) for d in inner], self.digest_size,
+                                                prefix=self._outer)
+                return [bytes.fromhex(d) for d in outer]
+        return [self.digest(m) for m in messages]
+
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key(key, digest_size, native):
+    return HmacKey(key, digest_size, native)
+
+
+def prepare_key(key, digest_size=hashing.HASH_SIZE_512, native=False):
+    """HmacKey для ключа из кеша последних KEY_CACHE_SIZE ключей."""
+    return _cached_key(bytes(key), digest_size, native)
+
+
+def new(key, msg=None, digest_size=hashing.HASH_SIZE_512, native=False):
+    """Создаёт HMAC (аналог hmac.new); состояния ключа берутся из кеша prepare_key."""
+    return prepare_key(key, digest_size, native).new(msg)
+
+
+def hmac_digest(key, msg, digest_size=hashing.HASH_SIZE_512, native=False):
+    """HMAC одного сообщения (аналог hmac.digest)."""
+    return prepare_key(key, digest_size, native).digest(msg)
+
+
+def hmac_batch(key, messages, digest_size=hashing.HASH_SIZE_512, native=False):
+    """HMAC многих сообщений одним ключом, список bytes в том же порядке."""
+    return prepare_key(key, digest_size, native).batch(messages)
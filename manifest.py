@@ -0,0 +1,257 @@
+"""
+Многопроцессное хеширование дерева каталогов и манифест контрольных сумм ГОСТ.
+
+Строка манифеста: ``<хеш Стрибог-512> <размер> <путь>``, путь относительно
+корня с разделителем ``/``; ``\\``, перевод строки и CR в пути экранируются
+(``\\\\``, ``\\n``, ``\\r``), а пробельные символы в его конце записываются как
+``\\s`` (пробел), ``\\t`` или ``\\uXXXX``, чтобы строка не кончалась пробелом и его
+не съело удаление пробелов в конце строк.
+verify_manifest проверяет дерево по такому манифесту (принимаются и хеши Стрибог-256).
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, wait
+
+import hashing
+import utils
+
+
+# Пробельные символы в конце пути заменяются видимыми escape-последовательностями
+_TRAILING_ESCAPES = {' ': '\\s', '\t': '\\t'}
+_UNESCAPES = {'n': '\n', 'r': '\r', 's': ' ', 't': '\t'}
+
+
+def escape_path(path):
+    escaped = path.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r')
+    stripped = escaped.rstrip()
+    return stripped + ''.join(_TRAILING_ESCAPES.get(c) or f'\\u{ord(c):04x}'
+                              for c in escaped[len(stripped):])
+
+
+def unescape_path(path):
+    if '\\' not in path:
+        return path
+    out = []
+    i = 0
+    while i < len(path):
+        c = path[i]
+        if c == '\\' and i + 1 < len(path):
+            nxt = path[i + 1]
+            if nxt == 'u' and i + 6 <= len(path):
+                out.append(chr(int(path[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            out.append(_UNESCAPES.get(nxt, nxt))
+            i += 2
+        else:
+            out.append(c)
+            i += 1
+    return ''.join(out)
+
+
+def format_entry(path, size, hexdigest):
+    """Форматирует строку манифеста (с переводом строки в конце)."""
+    return f'{hexdigest} {size} {escape_path(path)}\n'
+
+
+def parse_entry(line):
+    """Разбирает строку манифеста, возвращает (путь, размер, хеш).
+
+    Снимается только перевод строки (``\\n`` или ``\\r\\n``): пробелы в конце
+    принадлежат пути.
+    """
+    if line.endswith('\n'):
+        line = line[:-2] if line.endswith('\r\n') else line[:-1]
+    hexdigest, size, path = line.split(' ', 2)
+    return unescape_path(path), int(size), hexdigest
+
+
+def iter_files(root, onerror=None):
+    """Рекурсивно обходит каталог через os.scandir, выдаёт (относительный путь, размер).
+
+    Символические ссылки не разыменовываются, учитываются только обычные файлы.
+    Если задан onerror, ошибка чтения каталога (OSError) передаётся ему, а
+    обход продолжается без этого каталога; иначе исключение пробрасывается.
+    """
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                entries = []
+                for entry in it:
+                    rel = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(rel)
+                    elif entry.is_file(follow_symlinks=False):
+                        entries.append((rel, entry.stat(follow_symlinks=False).st_size))
+        except OSError as e:
+            if onerror is None:
+                raise
+            onerror(e)
+            continue
+        yield from entries
+
+
+# Ошибки хеширования одного файла: OSError в Python, RuntimeError у бинарника и libstribog
+_FILE_ERRORS = (OSError, RuntimeError)
+
+
+def hash_tree(root, max_workers=None, errors=None, hash_func=None):
+    """Хеширует все файлы дерева в пуле процессов, выдаёт (путь, размер, хеш) по мере готовности.
+
+    Файлы ставятся в очередь от больших к меньшим, чтобы один большой файл
+    не остался последним и не держал остальные ядра без работы. Файлы, которые
+    не удалось прочитать (исчезли, нет прав), пропускаются; если передан список
+    errors, в него добавляется (путь, исключение). hash_func (по умолчанию
+    hashing.gost_hash) должен быть функцией уровня модуля; при max_workers=1
+    хеширование идёт в текущем процессе.
+    """
+    hash_func = hash_func or hashing.gost_hash
+    files = sorted(iter_files(root), key=lambda item: item[1], reverse=True)
+    if not files:
+        return
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for rel, size in files:
+            try:
+                hexdigest = hash_func(os.path.join(root, rel))
+            except _FILE_ERRORS as e:
+                if errors is not None:
+                    errors.append((rel, e))
+                continue
+            yield rel, size, hexdigest
+        return
+    window = max_workers * 4
+    pending = {}
+    queue = iter(files)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        def submit_next():
+            for rel, size in queue:
+                future = executor.submit(hash_func, os.path.join(root, rel))
+                pending[future] = (rel, size)
+                if len(pending) >= window:
+                    return
+
+        submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel, size = pending.pop(future)
+                try:
+                    hexdigest = future.result()
+                except BrokenExecutor:
+                    raise
+                except _FILE_ERRORS as e:
+                    if errors is not None:
+                        errors.append((rel, e))
+                    continue
+                yield rel, size, hexdigest
+            submit_next()
+
+
+def write_manifest(root, out, max_workers=None, errors=None):
+    """Пишет манифест дерева root в текстовый поток out по мере хеширования, возвращает число файлов.
+
+    Непрочитанные файлы в манифест не попадают (см. errors в hash_tree).
+    """
+    count = 0
+    for rel, size, hexdigest in hash_tree(root, max_workers, errors):
+        out.write(format_entry(rel, size, hexdigest))
+        count += 1
+    return count
+
+
+# Результаты проверки записи манифеста
+OK = 'ok'
+MISMATCH = 'mismatch'
+SIZE_MISMATCH = 'size'
+MISSING = 'missing'
+MALFORMED = 'malformed'
+UNREADABLE = 'unreadable'
+
+
+def _hash_entry(path, digest_size):
+    return hashing.gost_hash(path, digest_size=digest_size)
+
+
+def _precheck(root, line):
+    """Разбирает и проверяет строку без хеширования.
+
+    Возвращает (путь, статус, хеш, размер хеша); статус None — файл нужно хешировать.
+    """
+    try:
+        path, size, hexdigest = parse_entry(line)
+    except ValueError:
+        return None, MALFORMED, None, None
+    hexdigest = utils.parse_reference_hash(hexdigest)
+    if not utils.is_valid_hash(hexdigest):
+        return path, MALFORMED, None, None
+    try:
+        st = os.stat(os.path.join(root, *path.split('/')))
+    except OSError:
+        return path, MISSING, None, None
+    if st.st_size != size:
+        return path, SIZE_MISMATCH, None, None
+    return path, None, hexdigest, len(hexdigest) // 2
+
+
+def verify_manifest(manifest_path, root=None, max_workers=None, fail_fast=False):
+    """Проверяет файлы по манифесту, выдаёт (номер строки, путь, статус) по мере готовности.
+
+    Манифест читается построчно; отсутствующие файлы, несовпадение размера и
+    некорректные строки отбрасываются до хеширования. Остальные файлы хешируются
+    в пуле процессов (в очереди не более 4×max_workers). При fail_fast проверка
+    прекращается на первой записи со статусом, отличным от OK.
+    Пустые строки пропускаются; root по умолчанию — каталог манифеста.
+    """
+    if root is None:
+        root = os.path.dirname(os.path.abspath(manifest_path))
+    max_workers = max_workers or os.cpu_count() or 1
+    window = max_workers * 4
+    pending = {}
+    with open(manifest_path, encoding='utf-8', newline='\n') as lines, \
+            ProcessPoolExecutor(max_workers=max_workers) as executor:
+        def drain():
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                lineno, path, expected = pending.pop(future)
+                try:
+                    status = OK if hashing.compare_hashes(future.result(), expected) else MISMATCH
+                except OSError:
+                    status = UNREADABLE
+                yield lineno, path, status
+
+        try:
+            for lineno, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                path, status, expected, digest_size = _precheck(root, line)
+                if status is not None:
+                    yield lineno, path, status
+                    if fail_fast:
+                        return
+                    continue
+                future = executor.submit(_hash_entry, os.path.join(root, *path.split('/')), digest_size)
+                pending[future] = (lineno, path, expected)
+                if len(pending) >= window:
+                    for result in drain():
+                        yield result
+                        if fail_fast and result[2] != OK:
+                            return
+            while pending:
+                for result in drain():
+                    yield result
+                    if fail_fast and result[2] != OK:
+                        return
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def summarize(results):
+    """Считает результаты verify_manifest по статусам: {статус: количество}."""
+    counts = {}
+    for _, _, status in results:
+        counts[status] = counts.get(status, 0) + 1
+    return counts
@@ -0,0 +1,164 @@
+"""
+Древовидный (Merkle) режим хеширования одного большого файла.
+
+Файл делится на куски по chunk_size байт, куски хешируются параллельно в пуле
+процессов, хеши кусков попарно объединяются до корня:
+
+  лист  = Стрибог-512(0x00 || кусок)
+  узел  = Стрибог-512(0x01 || левый || правый); непарный узел переходит на уровень выше
+
+Корень дерева — не то же самое, что обычный хеш файла (gost_hash), и зависит от
+chunk_size; режим предназначен для внутренних проверок целостности. Сохранённое
+дерево (save/load) позволяет проверить диапазон байт, перехешировав только
+покрывающие его куски.
+"""
+
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import hashing
+
+# Размер куска по умолчанию, кратен BLOCK_SIZE
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+MAGIC = b'GOSTMRK1'
+_HEADER = struct.Struct('<8sQQQ64s')
+
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+
+def _new_hasher(native):
+    if native:
+        from external_gost import NativeStribogHash
+        return NativeStribogHash()
+    return hashing.StribogHash()
+
+
+def hash_chunk(path, offset, length, native=False):
+    """Хеш листа для куска файла [offset, offset + length)."""
+    hasher = _new_hasher(native)
+    hasher.update(_LEAF_PREFIX)
+    buffer = bytearray(min(length, 16 * hashing.CHUNK_SIZE))
+    view = memoryview(buffer)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while length > 0:
+            n = f.readinto(view[:min(length, len(buffer))])
+            if not n:
+                raise ValueError(f'{path}: file is shorter than expected')
+            hasher.update(view[:n])
+            length -= n
+    return hasher.digest()
+
+
+def combine(left, right, native=False):
+    """Хеш внутреннего узла из хешей двух потомков."""
+    hasher = _new_hasher(native)
+    hasher.update(_NODE_PREFIX + left + right)
+    return hasher.digest()
+
+
+def build_levels(leaves, native=False):
+    """Уровни дерева от листьев (levels[0]) до корня (levels[-1] == [корень])."""
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([combine(level[i], level[i + 1], native) if i + 1 < len(level) else level[i]
+                       for i in range(0, len(level), 2)])
+    return levels
+
+
+class MerkleTree:
+    """Дерево хешей файла: размер куска, размер файла, хеши листьев и корень."""
+
+    def __init__(self, chunk_size, size, leaves, native=False):
+        self.chunk_size = chunk_size
+        self.size = size
+        self.levels = build_levels(leaves, native)
+
+    @property
+    def leaves(self):
+        return self.levels[0]
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    def hexroot(self):
+        return self.root.hex()
+
+    def chunk_range(self, index):
+        """(смещение, длина) куска с номером index."""
+        offset = index * self.chunk_size
+        return offset, min(self.chunk_size, self.size - offset)
+
+    def save(self, path):
+        """Сохраняет дерево: заголовок с корнем и хеши листьев."""
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, self.chunk_size, self.size, len(self.leaves), self.root))
+            f.write(b''.join(self.leaves))
+
+    @classmethod
+    def load(cls, path):
+        """Загружает дерево; ValueError, если листья не сходятся к сохранённому корню."""
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError(f'{path}: not a Merkle tree')
+            magic, chunk_size, size, count, root = _HEADER.unpack(header)
+            data = f.read()
+        if magic != MAGIC or len(data) != count * hashing.HASH_SIZE_512:
+            raise ValueError(f'{path}: not a Merkle tree')
+        if chunk_size <= 0 or chunk_size % hashing.BLOCK_SIZE or count != _chunk_count(size, chunk_size):
+            raise ValueError(f'{path}: inconsistent chunk size, file size or leaf count')
+        step = hashing.HASH_SIZE_512
+        tree = cls(chunk_size, size, [data[i:i + step] for i in range(0, len(data), step)])
+        if tree.root != root:
+            raise ValueError(f'{path}: leaves do not match the stored root')
+        return tree
+
+
+def _chunk_count(size, chunk_size):
+    return max(1, -(-size // chunk_size))
+
+
+def hash_file_tree(path, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None, native=False):
+    """Строит MerkleTree файла, хешируя куски в пуле из max_workers процессов.
+
+    native=True — листья считаются libstribog (external_gost.NativeStribogHash).
+    """
+    if chunk_size <= 0 or chunk_size % hashing.BLOCK_SIZE:
+        raise ValueError(f'chunk_size must be a positive multiple of {hashing.BLOCK_SIZE}')
+    size = os.path.getsize(path)
+    count = _chunk_count(size, chunk_size)
+    offsets = [i * chunk_size for i in range(count)]
+    lengths = [min(chunk_size, size - offset) for offset in offsets]
+    max_workers = min(max_workers or os.cpu_count() or 1, count)
+    if max_workers == 1:
+        leaves = [hash_chunk(path, offset, length, native) for offset, length in zip(offsets, lengths)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            leaves = list(executor.map(hash_chunk, repeat(path), offsets, lengths, repeat(native)))
+    return MerkleTree(chunk_size, size, leaves, native)
+
+
+def verify_range(path, tree, offset, length, native=False):
+    """Проверяет диапазон байт [offset, offset + length) файла по сохранённому дереву.
+
+    Перехешируются только куски, покрывающие диапазон. Возвращает False, если
+    размер файла изменился или хеш любого из этих кусков не совпал с листом дерева.
+    """
+    if offset < 0 or length < 0 or offset + length > tree.size:
+        raise ValueError('Range is outside of the hashed file')
+    if os.path.getsize(path) != tree.size:
+        return False
+    first = offset // tree.chunk_size
+    last = max(first, (offset + length - 1) // tree.chunk_size)
+    for index in range(first, min(last, len(tree.leaves) - 1) + 1):
+        chunk_offset, chunk_length = tree.chunk_range(index)
+        if hash_chunk(path, chunk_offset, chunk_length, native) != tree.leaves[index]:
+            return False
+    return True
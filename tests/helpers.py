@@ -0,0 +1,32 @@
+"""Общие заготовки тестов: временный каталог и собранные ConsoleApplication2/libstribog."""
+
+import os
+import tempfile
+import unittest
+
+from external_gost import build_native, default_binary_path, default_library_path
+
+build_native()
+
+requires_binary = unittest.skipUnless(os.path.exists(default_binary_path()), "ConsoleApplication2 not built")
+requires_library = unittest.skipUnless(os.path.exists(default_library_path()), "libstribog not built")
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Тест с временным каталогом self.tmp.name, удаляемым после теста."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def tmp_path(self, rel):
+        """Путь внутри временного каталога; rel с разделителем ``/``."""
+        return os.path.join(self.tmp.name, *rel.split("/"))
+
+    def make_file(self, rel, data):
+        """Создаёт файл (и недостающие каталоги) с содержимым data, возвращает путь."""
+        path = self.tmp_path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
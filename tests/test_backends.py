@@ -0,0 +1,84 @@
+import io
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+import backends
+import hashing
+from helpers import TempDirTestCase
+
+
+class TestSelfTest(unittest.TestCase):
+    def test_known_answers_match_engine(self):
+        for data, expected in backends.KNOWN_ANSWERS:
+            self.assertEqual(hashing.new(data).hexdigest(), expected)
+
+    def test_self_test(self):
+        self.assertIsNone(backends.self_test(hashing.gost_hash))
+        self.assertIn("vector 0", backends.self_test(lambda path: "0" * 128))
+
+        def broken(path):
+            raise RuntimeError("crashed")
+        self.assertIn("crashed", backends.self_test(broken))
+
+    def test_available_backends(self):
+        self.assertIn("python", backends.available_backends())
+        with self.assertRaises(ValueError):
+            backends.available_backends(["nope"])
+
+
+class TestBackendRegistry(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_path = self.tmp_path("cache/backends.json")
+
+    def test_calibration_is_cached(self):
+        registry = backends.BackendRegistry(self.cache_path, names=["python"], sizes=[0, 4096])
+        calibration = registry.calibrate()
+        self.assertEqual([size for size, _ in calibration["python"]], [0, 4096])
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        again = backends.BackendRegistry(self.cache_path, names=["python"], sizes=[0, 4096])
+        with patch("benchmark.measure", side_effect=AssertionError("recalibrated")):
+            self.assertEqual(again.calibrate(), calibration)
+
+        other_sizes = backends.BackendRegistry(self.cache_path, names=["python"], sizes=[0, 64])
+        self.assertEqual([size for size, _ in other_sizes.calibrate()["python"]], [0, 64])
+
+    def test_failing_backend_is_rejected(self):
+        with patch.dict(backends.BACKENDS, {"fake": lambda: (lambda path: "1" * 128)}):
+            registry = backends.BackendRegistry(self.cache_path, names=["python", "fake"], sizes=[0])
+            self.assertEqual(list(registry.calibrate()), ["python"])
+            self.assertIn("fake", registry.rejected)
+            with open(self.cache_path) as f:
+                self.assertIn("fake", json.load(f)["rejected"])
+
+    def test_slow_backend_is_extrapolated(self):
+        registry = backends.BackendRegistry(self.cache_path, names=["python"], sizes=[0, 4096, 65536],
+                                            max_call_seconds=0)
+        self.assertEqual(len(registry.calibrate()["python"]), 1)
+
+    def test_choose_by_size(self):
+        registry = backends.BackendRegistry(self.cache_path, names=["python"])
+        registry.calibration = {
+            "inprocess": [[0, 0.0001], [1000, 0.001]],
+            "bulk": [[0, 0.005], [1000, 0.0051], [100000, 0.006]],
+        }
+        self.assertEqual(registry.choose(10), "inprocess")
+        self.assertEqual(registry.choose(10 ** 6), "bulk")
+        self.assertAlmostEqual(registry.estimate("inprocess", 2000), 0.0019)
+        registry.calibration = {}
+        with self.assertRaises(RuntimeError):
+            registry.choose(1)
+
+    def test_gost_hash_routes_paths_and_streams(self):
+        registry = backends.BackendRegistry(self.cache_path, names=["python"], sizes=[0])
+        path = self.make_file("data.bin", b"test data for gost hash")
+        expected = backends.KNOWN_ANSWERS[1][1]
+        self.assertEqual(registry.gost_hash(path), expected)
+        self.assertEqual(registry.gost_hash(io.BytesIO(b"test data for gost hash")), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
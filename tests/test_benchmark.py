@@ -0,0 +1,56 @@
+import time
+import unittest
+
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([5], 90), 5)
+        self.assertIsNone(benchmark.percentile([], 50))
+
+    def test_run_python_backend(self):
+        report = benchmark.run_benchmark(sizes=[0, 65], backends=["python"], min_calls=2, budget=0)
+        self.assertEqual([(e["backend"], e["size"]) for e in report["results"]], [("python", 0), ("python", 65)])
+        self.assertIsNone(report["results"][0]["mb_per_s"])
+        self.assertGreater(report["results"][1]["mb_per_s"], 0)
+        self.assertEqual(report["results"][1]["calls"], 2)
+
+    def test_slow_call_is_measured_once(self):
+        calls = []
+
+        def slow(path):
+            calls.append(path)
+            time.sleep(0.05)
+
+        entry = benchmark.measure(slow, "x", 1, min_calls=5, budget=0.01)
+        self.assertEqual((entry["calls"], len(calls)), (1, 1))
+        self.assertEqual(benchmark.measure(slow, "x", 1, min_calls=2, budget=0)["calls"], 2)
+
+    def test_too_slow_sizes_are_skipped(self):
+        lines = []
+        report = benchmark.run_benchmark(sizes=[10 * 1024 * 1024, 64], backends=["python"], min_calls=1,
+                                         budget=0, log=lines.append, max_call_seconds=0.5)
+        self.assertEqual([e["size"] for e in report["results"]], [64])
+        self.assertIn("skipped", lines[-1])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            benchmark.available_backends(["nope"])
+
+    def test_compare_flags_regression(self):
+        baseline = {"results": [{"backend": "python", "size": 64, "p50_ms": 1.0},
+                                {"backend": "binary", "size": 64, "p50_ms": 1.0}]}
+        current = {"results": [{"backend": "python", "size": 64, "p50_ms": 1.5},
+                               {"backend": "binary", "size": 64, "p50_ms": 1.05},
+                               {"backend": "pygost", "size": 64, "p50_ms": 9.0}]}
+        regressions = benchmark.compare(current, baseline, threshold=0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("python", regressions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
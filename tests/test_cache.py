@@ -0,0 +1,145 @@
+import functools
+import os
+import sqlite3
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import hashing
+from cache import DigestCache, algorithm_name
+from helpers import TempDirTestCase
+
+
+class TestDigestCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db_path = self.tmp_path("cache.sqlite")
+
+    def test_hit_after_miss(self):
+        path = self.make_file("a.bin", b"test data for gost hash")
+        hash_func = MagicMock(side_effect=hashing.gost_hash)
+        with DigestCache(self.db_path, hash_func=hash_func) as cache:
+            first = cache.gost_hash(path)
+            second = cache.gost_hash(path)
+        self.assertEqual(first, second)
+        self.assertEqual(first, hashing.gost_hash(path))
+        self.assertEqual(hash_func.call_count, 1)
+
+    def test_persists_between_instances(self):
+        path = self.make_file("a.bin", b"persist")
+        with DigestCache(self.db_path) as cache:
+            cache.gost_hash(path)
+        with DigestCache(self.db_path) as cache:
+            cache.gost_hash(path)
+            stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 0, 1))
+
+    def test_changed_file_is_rehashed(self):
+        path = self.make_file("a.bin", b"old")
+        with DigestCache(self.db_path) as cache:
+            old = cache.gost_hash(path)
+            st = os.stat(path)
+            with open(path, "wb") as f:
+                f.write(b"new")
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            new = cache.gost_hash(path)
+            self.assertNotEqual(old, new)
+            self.assertEqual(new, hashing.new(b"new").hexdigest())
+            self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_lru_eviction_by_entries(self):
+        paths = [self.make_file(f"f{i}.bin", bytes([i])) for i in range(4)]
+        with DigestCache(self.db_path, max_entries=2) as cache:
+            cache.gost_hash(paths[0])
+            cache.gost_hash(paths[1])
+            cache.gost_hash(paths[0])  # paths[0] становится самым свежим
+            cache.gost_hash(paths[2])
+            self.assertIsNotNone(cache.lookup(paths[0]))
+            self.assertIsNone(cache.lookup(paths[1]))
+            self.assertEqual(cache.stats()["entries"], 2)
+            self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_eviction_by_bytes(self):
+        paths = [self.make_file(f"f{i}.bin", bytes([i])) for i in range(5)]
+        with DigestCache(self.db_path, max_bytes=1) as cache:
+            for path in paths:
+                cache.gost_hash(path)
+            self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_hits_do_not_write_until_flush(self):
+        paths = [self.make_file(f"f{i}.bin", bytes([i])) for i in range(3)]
+        cache = DigestCache(self.db_path)
+        for path in paths:
+            cache.gost_hash(path)
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+        for _ in range(5):
+            for path in paths:
+                cache.gost_hash(path)
+        self.assertEqual([s for s in statements if not s.startswith("SELECT")], [])
+        cache.close()
+        conn = sqlite3.connect(self.db_path)
+        last_used = [row[0] for row in conn.execute("SELECT last_used FROM digests ORDER BY last_used")]
+        conn.close()
+        # Последние попадания записаны при close
+        self.assertEqual(last_used, [16, 17, 18])
+
+    def test_eviction_counts_entries_of_other_instances(self):
+        paths = [self.make_file(f"f{i}.bin", bytes([i])) for i in range(4)]
+        with DigestCache(self.db_path, max_entries=2) as first, DigestCache(self.db_path, max_entries=2) as second:
+            first.gost_hash(paths[0])
+            first.gost_hash(paths[1])
+            second.gost_hash(paths[2])
+            second.gost_hash(paths[3])
+            self.assertEqual(second.stats()["entries"], 2)
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0], 2)
+        conn.close()
+
+    def test_default_and_explicit_gost_hash_share_entries(self):
+        self.assertEqual(algorithm_name(hashing.gost_hash), algorithm_name(None))
+        self.assertEqual(algorithm_name(functools.partial(hashing.gost_hash)), "streebog512")
+        path = self.make_file("a.bin", b"shared")
+        with DigestCache(self.db_path) as cache:
+            cache.gost_hash(path)
+        with DigestCache(self.db_path, hash_func=hashing.gost_hash) as cache:
+            cache.gost_hash(path)
+            self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_algorithms_are_cached_separately(self):
+        path = self.make_file("a.bin", b"two digests")
+        streebog256 = functools.partial(hashing.gost_hash, digest_size=32)
+        self.assertNotEqual(algorithm_name(streebog256), algorithm_name(None))
+        with DigestCache(self.db_path) as cache512, DigestCache(self.db_path, hash_func=streebog256) as cache256:
+            self.assertEqual(cache512.gost_hash(path), hashing.gost_hash(path))
+            self.assertEqual(cache256.gost_hash(path), hashing.gost_hash(path, digest_size=32))
+            self.assertEqual(cache512.gost_hash(path), hashing.gost_hash(path))
+            self.assertEqual((cache512.stats()["hits"], cache256.stats()["hits"]), (1, 0))
+
+    def test_ctime_change_invalidates(self):
+        path = self.make_file("a.bin", b"ctime")
+        with DigestCache(self.db_path) as cache:
+            cache.gost_hash(path)
+            self.assertIsNotNone(cache.lookup(path))
+            st = os.stat(path)
+            time.sleep(0.02)
+            os.chmod(path, 0o600)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))  # размер и mtime те же, меняется только ctime
+            self.assertNotEqual(os.stat(path).st_ctime_ns, st.st_ctime_ns)
+            self.assertIsNone(cache.lookup(path))
+
+    def test_old_schema_is_replaced(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE digests (dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, "
+                     "digest BLOB, path TEXT, entry_bytes INTEGER, last_used INTEGER, PRIMARY KEY (dev, ino))")
+        conn.execute("INSERT INTO digests VALUES (1, 2, 3, 4, x'00', 'p', 10, 1)")
+        conn.commit()
+        conn.close()
+        path = self.make_file("a.bin", b"upgrade")
+        with DigestCache(self.db_path) as cache:
+            self.assertEqual(cache.stats()["entries"], 0)
+            self.assertEqual(cache.gost_hash(path), hashing.gost_hash(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,10 @@ import sys
 import threading
 import time
 import pytest
+
+import hashing
+from external_gost import default_binary_path
+import helpers  # noqa: F401  (при импорте собирает ConsoleApplication2)
 try:
     from gostcrypto.gosthash.gost_34_11_2012 import GOST34112012
     HAS_GOSTCRYPTO = True
@@ -19,8 +23,7 @@ if sys.platform == 'win32':
 else:
     BINARY_NAME = 'ConsoleApplication2'
 
-# Используем актуальный путь к бинарнику
-CONSOLE_EXE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+CONSOLE_EXE_PATH = default_binary_path()
 SISIY_PDF = 'sisiy.pdf'
 
 class TestConsoleApplication2(unittest.TestCase):
@@ -346,7 +349,7 @@ def test_long_path():
     path = os.path.join(base, long_name)
     with open(path, 'wb') as f:
         f.write(b'longpath')
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     result = subprocess.run([exe, path], capture_output=True, text=True, timeout=20)
     shutil.rmtree(base)
     assert result.returncode == 0
@@ -356,7 +359,7 @@ def test_unicode_filename():
         fname = os.path.join(d, 'тест_файл_😀.bin')
         with open(fname, 'wb') as f:
             f.write(b'unicode')
-        exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+        exe = CONSOLE_EXE_PATH
         result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
         assert result.returncode == 0
 
@@ -365,7 +368,7 @@ def test_special_chars_filename():
         fname = os.path.join(d, 'file !@#$%^&()[]{}.bin')
         with open(fname, 'wb') as f:
             f.write(b'special')
-        exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+        exe = CONSOLE_EXE_PATH
         result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
         assert result.returncode == 0
 
@@ -376,7 +379,7 @@ def test_symlink_to_file():
         with open(target, 'wb') as f:
             f.write(b'symlink')
         os.symlink(target, link)
-        exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+        exe = CONSOLE_EXE_PATH
         result = subprocess.run([exe, link], capture_output=True, text=True, timeout=20)
         assert result.returncode == 0
 
@@ -385,7 +388,7 @@ def test_write_only_file():
         f.write(b'writeonly')
         fname = f.name
     os.chmod(fname, 0o222)
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     try:
         result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
         assert result.returncode != 0
@@ -397,7 +400,7 @@ def test_file_with_bom():
     with tempfile.NamedTemporaryFile(delete=False) as f:
         f.write(b'\xef\xbb\xbfBOMtest')
         fname = f.name
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
     os.unlink(fname)
     assert result.returncode == 0
@@ -406,7 +409,7 @@ def test_file_changing_during_hash():
     with tempfile.NamedTemporaryFile(delete=False) as f:
         f.write(b'A' * 1024 * 1024)
         fname = f.name
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     def writer():
         with open(fname, 'ab') as wf:
             for _ in range(10):
@@ -420,11 +423,24 @@ def test_file_changing_during_hash():
     os.unlink(fname)
     assert result.returncode == 0 or result.returncode == 1  # допускаем ошибку
 
+def test_old_file_is_hashed_through_mmap():
+    data = os.urandom(200_000)
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(data)
+        fname = f.name
+    # Давно изменённый файл отображается в память, свежий читается через read()
+    os.utime(fname, (0, 0))
+    exe = CONSOLE_EXE_PATH
+    result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
+    os.unlink(fname)
+    assert result.returncode == 0
+    assert hashing.new(data).hexdigest() in result.stdout
+
 def test_large_nonblock_size():
     with tempfile.NamedTemporaryFile(delete=False) as f:
         f.write(os.urandom(10_000_001))
         fname = f.name
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=60)
     os.unlink(fname)
     assert result.returncode == 0
@@ -436,7 +452,7 @@ def test_immutable_file():
         f.write(b'immutable')
         fname = f.name
     sp.run(['sudo', 'chattr', '+i', fname])
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     try:
         result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
         assert result.returncode == 0
@@ -451,7 +467,7 @@ def test_append_only_file():
         f.write(b'appendonly')
         fname = f.name
     sp.run(['sudo', 'chattr', '+a', fname])
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     try:
         result = subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
         assert result.returncode == 0
@@ -463,7 +479,7 @@ def test_parallel_hashing():
     with tempfile.NamedTemporaryFile(delete=False) as f:
         f.write(os.urandom(1024 * 1024))
         fname = f.name
-    exe = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ConsoleApplication2', BINARY_NAME))
+    exe = CONSOLE_EXE_PATH
     def run():
         return subprocess.run([exe, fname], capture_output=True, text=True, timeout=20)
     threads = [threading.Thread(target=run) for _ in range(4)]
@@ -473,6 +489,90 @@ def test_parallel_hashing():
         t.join()
     os.unlink(fname)
 
+def test_self_test_implementations():
+    exe = CONSOLE_EXE_PATH
+    result = subprocess.run([exe, '--self-test'], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert 'Self-test OK' in result.stdout
+
+@pytest.mark.parametrize('impl', ['reference', 'table', 'avx2'])
+def test_forced_implementation_matches_default(impl):
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(os.urandom(10_000))
+        fname = f.name
+    exe = CONSOLE_EXE_PATH
+    try:
+        default = subprocess.run([exe, fname], capture_output=True, text=True, timeout=60)
+        forced = subprocess.run([exe, '--stats', fname], capture_output=True, text=True, timeout=60,
+                                env=dict(os.environ, STRIBOG_IMPL=impl))
+    finally:
+        os.unlink(fname)
+    if f'impl={impl}' not in forced.stderr:
+        assert 'Warning: STRIBOG_IMPL' in forced.stderr
+        pytest.skip(f'{impl} is not available on this CPU or build')
+    assert default.returncode == 0 and forced.returncode == 0
+    assert default.stdout.splitlines()[-1] == forced.stdout.splitlines()[-1]
+
+def test_unknown_implementation_warns_and_uses_fastest():
+    exe = CONSOLE_EXE_PATH
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(b'test data for gost hash')
+        fname = f.name
+    try:
+        default = subprocess.run([exe, '--stats', fname], capture_output=True, text=True, timeout=60)
+        bogus = subprocess.run([exe, '--stats', fname], capture_output=True, text=True, timeout=60,
+                               env=dict(os.environ, STRIBOG_IMPL='bogus'))
+    finally:
+        os.unlink(fname)
+    assert bogus.returncode == 0
+    assert 'Warning: STRIBOG_IMPL=bogus' in bogus.stderr
+    assert default.stderr.split('impl=')[-1] == bogus.stderr.split('impl=')[-1]
+    assert bogus.stdout.splitlines()[-1] == default.stdout.splitlines()[-1]
+
+@pytest.mark.parametrize('args', [
+    ['--state'],
+    ['--chunk-size'],
+    ['--chunk-size', '10abc'],
+    ['--chunk-size', '-5'],
+    ['--chunk-size', ' 10'],
+    ['--chunk-size', '0'],
+    ['--chunk-size', '99999999999999999999999'],
+    ['--state', ''],
+])
+def test_invalid_option_values_are_usage_errors(args):
+    # Опция без значения не должна становиться именем файла
+    result = subprocess.run([CONSOLE_EXE_PATH] + args, capture_output=True, text=True, timeout=20,
+                            stdin=subprocess.DEVNULL)
+    assert result.returncode == 2
+    assert 'Usage:' in result.stderr
+    assert 'hash of' not in result.stdout
+
+def test_chunk_size_value_is_accepted():
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(b'test data for gost hash')
+        fname = f.name
+    try:
+        result = subprocess.run([CONSOLE_EXE_PATH, '--chunk-size', '4096', fname], capture_output=True, text=True,
+                                timeout=20)
+    finally:
+        os.unlink(fname)
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[-1].startswith('d4743a69')
+
+def test_stdin_matches_file():
+    data = os.urandom(200_000)
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(data)
+        fname = f.name
+    exe = CONSOLE_EXE_PATH
+    try:
+        from_file = subprocess.run([exe, fname], capture_output=True, text=True, timeout=60)
+        from_stdin = subprocess.run([exe, '-'], input=data, capture_output=True, timeout=60)
+    finally:
+        os.unlink(fname)
+    assert from_stdin.returncode == 0, from_stdin.stderr
+    assert from_stdin.stdout.decode().splitlines()[-1] == from_file.stdout.splitlines()[-1]
+
 if __name__ == '__main__':
     print('Запуск тестов ConsoleApplication2...')
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,112 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest.mock import patch
+
+import dedup
+import hashing
+from helpers import TempDirTestCase
+
+
+class TestFindDuplicates(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        self.big = os.urandom(20000)
+        self.files = {
+            "a/big1.bin": self.big,
+            "b/big2.bin": self.big,
+            # Тот же размер, те же начало и конец, другая середина — отсеивается только полным хешем
+            "b/big_mid.bin": self.big[:10000] + bytes(1) + self.big[10001:],
+            # Тот же размер, другое начало — отсеивается выборкой
+            "c/big_head.bin": b"X" + self.big[1:],
+            "small1.txt": b"hello",
+            "a/small2.txt": b"hello",
+            "c/small3.txt": b"world",
+            "unique.bin": b"z" * 7,
+            "empty1": b"",
+            "empty2": b"",
+        }
+        for rel, data in self.files.items():
+            self.make_file(rel, data)
+
+    def path(self, rel):
+        return self.tmp_path(rel)
+
+    def test_duplicate_sets_and_stats(self):
+        stats = {}
+        sets = dedup.find_duplicates([self.root], max_workers=1, stats=stats)
+        self.assertEqual(sets, [
+            (20000, hashing.new(self.big).hexdigest(), [self.path("a/big1.bin"), self.path("b/big2.bin")]),
+            (5, hashing.new(b"hello").hexdigest(), [self.path("a/small2.txt"), self.path("small1.txt")]),
+        ])
+        self.assertEqual(stats, {"files": 8, "same_size": 7, "sampled": 4, "full_hashed": 6})
+        self.assertEqual(dedup.summarize(sets), (2, 2, 20005))
+
+    def test_sample_hash_covers_head_and_tail(self):
+        path = self.path("a/big1.bin")
+        expected = hashing.new(self.big[:4096] + self.big[-4096:], hashing.HASH_SIZE_256).digest()
+        self.assertEqual(dedup.sample_hash(path, 20000), expected)
+
+    def test_min_size_and_empty_files(self):
+        sets = dedup.find_duplicates([self.root], min_size=0, max_workers=1)
+        self.assertIn([self.path("empty1"), self.path("empty2")], [paths for _, _, paths in sets])
+        sets = dedup.find_duplicates([self.root], min_size=100, max_workers=1)
+        self.assertEqual([size for size, _, _ in sets], [20000])
+
+    def test_hard_links_and_overlapping_roots(self):
+        os.link(self.path("unique.bin"), self.path("unique_link.bin"))
+        sets = dedup.find_duplicates([self.root, self.path("a")], max_workers=1)
+        self.assertEqual(len(sets), 2)
+
+    def test_parallel_matches_serial(self):
+        serial = dedup.find_duplicates([self.root], max_workers=1)
+        self.assertEqual(dedup.find_duplicates([self.root], max_workers=2), serial)
+
+    def test_unreadable_file_is_reported(self):
+        errors = []
+        real = dedup.sample_hash
+
+        def failing(path, size, sample_size):
+            if path.endswith("big2.bin"):
+                raise PermissionError(13, "denied", path)
+            return real(path, size, sample_size)
+
+        with patch("dedup.sample_hash", failing):
+            sets = dedup.find_duplicates([self.root], max_workers=1, errors=errors)
+        self.assertEqual([size for size, _, _ in sets], [5])
+        self.assertEqual([path for path, _ in errors], [self.path("b/big2.bin")])
+
+    def test_missing_root_and_unreadable_directory(self):
+        errors = []
+        real = os.scandir
+
+        def scandir(path):
+            if path.endswith("c"):
+                raise PermissionError(13, "denied", path)
+            return real(path)
+
+        missing = os.path.join(self.root, "nonexistent")
+        with patch("os.scandir", scandir):
+            sets = dedup.find_duplicates([missing, self.root], max_workers=1, errors=errors)
+        self.assertEqual(len(sets), 2)
+        self.assertEqual([path for path, _ in errors], [missing, self.path("c")])
+
+        err = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err):
+            self.assertEqual(dedup.main([missing, "--workers", "1"]), 1)
+        self.assertIn("nonexistent", err.getvalue())
+
+    def test_main(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(dedup.main([self.root, "--workers", "1"]), 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], f"{hashing.new(self.big).hexdigest()} 20000")
+        self.assertEqual(lines[1], f"  {self.path('a/big1.bin')}")
+        self.assertEqual(lines[-1], "2 duplicate sets, 2 extra copies, 20005 bytes wasted")
+
+
+if __name__ == "__main__":
+    unittest.main()
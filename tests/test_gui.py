@@ -1,6 +1,13 @@
+import os
 import unittest
 from unittest.mock import patch, MagicMock
 
+import gui
+import hashing
+import manifest
+from gui import HashWorker
+from helpers import TempDirTestCase
+
 def process_file_and_compare(file_path, reference_hash):
     from gui import gost_hash, compare_hashes
     file_hash = gost_hash(file_path)
@@ -34,5 +41,101 @@ class TestGuiLogic(unittest.TestCase):
         with self.assertRaises(TypeError):
             process_file_and_compare(12345, "abc123")
 
+class TestHashWorker(TempDirTestCase):
+    def collect(self, worker, job_ids, timeout=60):
+        finished = {}
+        while len(finished) < len(job_ids):
+            event = worker.events.get(timeout=timeout)
+            if event[0] in ("done", "error", "cancelled"):
+                finished[event[1]] = event
+        return finished
+
+    def test_hashes_queue_in_background(self):
+        worker = HashWorker()
+        try:
+            paths = [self.make_file(f"f{i}.bin", bytes([i]) * (i * 100)) for i in range(5)]
+            jobs = [worker.submit(p) for p in paths]
+            jobs.append(worker.submit(paths[0] + ".missing"))
+            finished = self.collect(worker, jobs)
+        finally:
+            worker.stop()
+        for job, path in zip(jobs, paths):
+            self.assertEqual(finished[job], ("done", job, hashing.gost_hash(path)))
+        self.assertEqual(finished[jobs[-1]][0], "error")
+
+    def test_cancel_all(self):
+        worker = HashWorker(progress_every=1024)
+        try:
+            big = self.make_file("big.bin", b"\0" * 2_000_000)
+            jobs = [worker.submit(big) for _ in range(3)]
+            while worker.events.get(timeout=30)[0] != "progress":
+                pass
+            worker.cancel_all()
+            finished = self.collect(worker, jobs)
+        finally:
+            worker.stop()
+        self.assertEqual([finished[j][0] for j in jobs], ["cancelled"] * 3)
+
+    def test_submit_folder_streams_jobs(self):
+        paths = [self.make_file("a.bin", b"alpha"), self.make_file("sub/b.bin", b"beta")]
+        self.make_file("sub/locked/c.bin", b"gamma")
+        real = os.scandir
+
+        def scandir(path):
+            if path.endswith("locked"):
+                raise PermissionError(13, "denied", path)
+            return real(path)
+
+        worker = HashWorker()
+        try:
+            with patch("os.scandir", scandir):
+                worker.submit_folder(self.tmp.name).join()
+            # Хеширование идёт параллельно обходу: ждём и конца обхода, и всех заданий
+            events = []
+            while not any(e[0] == "scan_done" for e in events) or \
+                    sum(e[0] == "done" for e in events) < sum(e[0] == "queued" for e in events):
+                events.append(worker.events.get(timeout=30))
+        finally:
+            worker.stop()
+        queued = {e[2]: e[1] for e in events if e[0] == "queued"}
+        finished = {e[1]: e for e in events if e[0] == "done"}
+        self.assertEqual(sorted(queued), sorted(paths))
+        for path, job in queued.items():
+            self.assertEqual(finished[job], ("done", job, hashing.gost_hash(path)))
+            kinds = [e[0] for e in events if e[1] == job]
+            self.assertEqual(kinds[0], "queued")
+        self.assertIn(("scan_error", os.path.join(self.tmp.name, "sub", "locked")),
+                      [e[:2] for e in events])
+        self.assertIn(("scan_done", self.tmp.name, 2), events)
+
+    def test_cancel_all_stops_folder_scan(self):
+        for i in range(5):
+            self.make_file(f"f{i}.bin", b"x")
+        worker = HashWorker()
+        real = manifest.iter_files
+
+        def iter_files(root, onerror=None):
+            for i, item in enumerate(real(root, onerror)):
+                if i == 2:
+                    worker.cancel_all()
+                yield item
+
+        try:
+            with patch("manifest.iter_files", iter_files):
+                worker.submit_folder(self.tmp.name).join()
+        finally:
+            worker.stop()
+        events = []
+        while not worker.events.empty():
+            events.append(worker.events.get())
+        self.assertEqual(sum(e[0] == "queued" for e in events), 2)
+        self.assertIn(("scan_done", self.tmp.name, 2), events)
+
+    def test_process_file_and_compare_real_hash(self):
+        path = self.make_file("data.bin", b"test data for gost hash")
+        expected = hashing.gost_hash(path)
+        self.assertEqual(gui.process_file_and_compare(path, expected.upper()), (expected, True))
+        self.assertEqual(gui.process_file_and_compare(path, "0" * 128), (expected, False))
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,78 @@
+import io
+import os
+import unittest
+
+import hashdb
+import hashing
+import manifest
+from helpers import TempDirTestCase
+
+
+def digest_of(i):
+    return hashing.new(i.to_bytes(4, "little")).digest()
+
+
+class TestKnownHashIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.tmp_path("known.idx")
+
+    def test_contains(self):
+        known = [digest_of(i) for i in range(300)]
+        self.assertEqual(hashdb.build_index(self.path, known + known[:10], run_size=64), 300)
+        with hashdb.KnownHashIndex(self.path) as index:
+            self.assertEqual(len(index), 300)
+            self.assertEqual(list(index), sorted(known))
+            for digest in known:
+                self.assertIn(digest, index)
+            self.assertTrue(index.contains("  " + known[5].hex().upper() + "\n"))
+            self.assertFalse(index.contains(digest_of(1000)))
+            self.assertFalse(index.contains("zz"))
+            self.assertFalse(index.contains(known[0][:32]))
+
+    def test_contains_many(self):
+        hashdb.build_index(self.path, (digest_of(i) for i in range(0, 200, 2)))
+        queries = [digest_of(i) for i in (7, 4, 198, 199, 0)] + ["bad"]
+        with hashdb.KnownHashIndex(self.path) as index:
+            self.assertEqual(index.contains_many(queries), [False, True, True, False, True, False])
+
+    def test_empty_index(self):
+        self.assertEqual(hashdb.build_index(self.path, []), 0)
+        with hashdb.KnownHashIndex(self.path) as index:
+            self.assertFalse(index.contains(digest_of(1)))
+            self.assertEqual(index.contains_many([digest_of(1)]), [False])
+
+    def test_incremental_build(self):
+        hashdb.build_index(self.path, [digest_of(i) for i in range(50)])
+        self.assertEqual(hashdb.build_index(self.path, [digest_of(i) for i in range(25, 100)]), 100)
+        with hashdb.KnownHashIndex(self.path) as index:
+            self.assertTrue(all(index.contains_many([digest_of(i) for i in range(100)])))
+
+    def test_wrong_digest_size(self):
+        hashdb.build_index(self.path, [digest_of(1)])
+        with self.assertRaises(ValueError):
+            hashdb.build_index(self.path, [b"\x00" * 32], digest_size=32)
+
+    def test_not_an_index(self):
+        with open(self.path, "wb") as f:
+            f.write(b"x" * 4096)
+        with self.assertRaises(ValueError):
+            hashdb.KnownHashIndex(self.path)
+
+    def test_add_manifests_and_compare_hashes(self):
+        root = self.tmp_path("tree")
+        for name in ("a", "b"):
+            self.make_file(f"tree/{name}", name.encode() * 10)
+        manifest_path = self.tmp_path("SUMS")
+        with open(manifest_path, "w") as out:
+            manifest.write_manifest(root, out, max_workers=1)
+            out.write("garbage\n")
+        self.assertEqual(hashdb.add_manifests(self.path, [manifest_path]), 2)
+        with hashdb.KnownHashIndex(self.path) as index:
+            self.assertTrue(hashing.compare_hashes(hashing.gost_hash(os.path.join(root, "a")), index))
+            self.assertFalse(hashing.compare_hashes(hashing.gost_hash(io.BytesIO(b"c")), index))
+            self.assertFalse(hashing.compare_hashes(None, index))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,30 @@
+import array
+import asyncio
+import mmap
+import socket
+import subprocess
+import sys
+import threading
+import time
 import unittest
 import io
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
-from external_gost import gost_hash_by_binary
+from external_gost import (GostWorker, NativeStribogHash, WorkerPool, default_binary_path,
+                           gost_hash_both_by_binary, gost_hash_both_by_library, gost_hash_by_binary,
+                           gost_hash_by_library, gost_hash_stream_by_binary, hash_many)
 import tempfile
 import os
 
+import hashing
+from helpers import requires_binary, requires_library
+
 # from hashing import gost_hash, compare_hashes  # Предполагаемые функции
 
 def gost_hash(file_like):
-    # Сохраняем file_like во временный файл и считаем хэш через бинарник
+    # file_like передаётся бинарнику через stdin порциями, без временного файла
     if hasattr(file_like, 'read'):
-        data = file_like.read()
-        with tempfile.TemporaryDirectory() as tmpdir:
-            file_path = os.path.join(tmpdir, "sisiy.pdf")
-            with open(file_path, "wb") as f:
-                f.write(data)
-            return gost_hash_by_binary(file_path)
+        return gost_hash_stream_by_binary(file_like)
     elif isinstance(file_like, str):
         # file_like - путь к файлу
         return gost_hash_by_binary(file_like)
@@ -75,5 +84,582 @@ class TestGostHashing(unittest.TestCase):
             hash_py = gost_hash(open(file_path, "rb"))
             self.assertEqual(hash_cpp, hash_py)
 
+class TestStribogEngine(unittest.TestCase):
+    # Эталоны получены из ConsoleApplication2 (StribogHash)
+    VECTORS = {
+        (b"", 64): "317dd1d2b3447094f9c51f51dd05267f88a2ae046323365412e72c7ec5508c1972f7dd8423423c450edde5e2287b62fcb50ad86f002f957c169d0d040056ef77",
+        (b"", 32): "36000929f56e600bae233aad9f6b18c88d12565c36aaf547709f250cf52fed7e",
+        (b"test data for gost hash", 64): "d4743a69cb73e7ed25dea17258c355eac94b361231c2b2fc61c45b7390fc3aa92c4bb9e5382174e200f8649ea0e63309ba78e3d8a6083c0eb9233406502dcb61",
+        (b"test data for gost hash", 32): "c6b3bc296b0073a4d91196a8420e3edd2e0925d86d00681b7ababc40772e9a23",
+        (b"abc", 32): "e8f79f1a5975c9e854b868c497bd168dcd6c0feefc2384076e261d32563a085e",
+        (b"\x00" * 65, 64): "085e75c79899fb8ec07a15b3f2a45dbd3f02e865132cc3f18432b17a6c82db552bf71089101d530e25ad663fb82f5f0010d5f81a4d87a4a12563e1f1370ac269",
+    }
+
+    def test_known_vectors(self):
+        for (data, size), expected in self.VECTORS.items():
+            self.assertEqual(hashing.new(data, size).hexdigest(), expected)
+
+    def test_chunked_update(self):
+        data = os.urandom(1000)
+        h = hashing.new()
+        for i in range(0, len(data), 7):
+            h.update(memoryview(data)[i:i + 7])
+        self.assertEqual(h.hexdigest(), hashing.new(data).hexdigest())
+
+    def test_copy_is_independent(self):
+        h = hashing.new(b"prefix")
+        clone = h.copy()
+        clone.update(b" suffix")
+        self.assertEqual(h.hexdigest(), hashing.new(b"prefix").hexdigest())
+        self.assertEqual(clone.hexdigest(), hashing.new(b"prefix suffix").hexdigest())
+
+    def test_gost_hash_path_and_stream(self):
+        data = b"test data for gost hash"
+        expected = self.VECTORS[(data, 64)]
+        self.assertEqual(hashing.gost_hash(io.BytesIO(data)), expected)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self.assertEqual(hashing.gost_hash(file_path), expected)
+
+    def test_gost_hash_mapped_file_sizes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            for size in (0, 1, 63, 64, 65, 4096, 70000):
+                data = os.urandom(size)
+                with open(file_path, "wb") as f:
+                    f.write(data)
+                self.assertEqual(hashing.gost_hash(file_path), hashing.new(data).hexdigest())
+                # Давно изменённый файл хешируется через mmap
+                os.utime(file_path, (0, 0))
+                with patch.object(hashing, "MMAP_WINDOW", 4096):
+                    self.assertEqual(hashing.gost_hash(file_path), hashing.new(data).hexdigest())
+
+    def test_gost_hash_mmap_skips_files_being_written(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            data = os.urandom(10_000)
+            with open(file_path, "wb") as f:
+                f.write(data)
+            with patch.object(mmap, "mmap", side_effect=AssertionError("mapped")):
+                self.assertEqual(hashing.gost_hash(file_path), hashing.new(data).hexdigest())
+
+            class Truncating:
+                """Хешер, который усекает файл после первого окна."""
+                def __init__(self):
+                    self.inner = hashing.new()
+
+                def update(self, chunk):
+                    self.inner.update(chunk)
+                    os.truncate(file_path, 100)
+
+            os.utime(file_path, (0, 0))
+            with patch.object(hashing, "MMAP_WINDOW", 4096), open(file_path, "rb") as f:
+                with self.assertRaises(OSError):
+                    hashing._hash_mapped(f, Truncating())
+
+    def test_gost_hash_invalid_type(self):
+        with self.assertRaises(TypeError):
+            hashing.gost_hash(12345)
+
+    def test_gost_hash_batch(self):
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            self.skipTest("numpy not installed")
+        messages = [os.urandom(size) for size in (0, 1, 5, 63, 64, 65, 127, 128, 129, 300)]
+        messages.append(bytearray(b"test data for gost hash"))
+        for size in (64, 32):
+            self.assertEqual(hashing.gost_hash_batch(messages, size),
+                             [hashing.new(m, size).hexdigest() for m in messages])
+        self.assertEqual(hashing.gost_hash_batch([]), [])
+
+    def test_stats_and_progress(self):
+        data = b"x" * 300_000
+        stats = hashing.HashStats()
+        reports = []
+        result = hashing.gost_hash(io.BytesIO(data), stats=stats,
+                                   progress=lambda done, s: reports.append(done), progress_every=100_000)
+        self.assertEqual(result, hashing.new(data).hexdigest())
+        self.assertEqual(stats.bytes, len(data))
+        self.assertEqual(stats.blocks, len(data) // 64 + 3)
+        self.assertGreater(stats.compress_time, 0)
+        self.assertEqual(len(reports), 3)
+        self.assertEqual(reports, sorted(reports))
+
+    def test_state_roundtrip(self):
+        data = os.urandom(300)
+        for size in (32, 64):
+            for split in (0, 1, 62, 63, 64, 65, 130, 300):
+                h = hashing.StribogHash(data[:split], digest_size=size)
+                state = h.export_state()
+                self.assertEqual(len(state), hashing.STATE_SIZE)
+                resumed = hashing.StribogHash.from_state(state)
+                resumed.update(data[split:])
+                self.assertEqual(resumed.hexdigest(), hashing.new(data, size).hexdigest())
+        with self.assertRaises(ValueError):
+            hashing.StribogHash.from_state(b"x" * hashing.STATE_SIZE)
+        with self.assertRaises(ValueError):
+            hashing.StribogHash.from_state(hashing.new(b"abc").export_state()[:-1])
+
+    def test_gost_hash_resumable(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "log.bin")
+            state_path = os.path.join(tmpdir, "log.state")
+            data = os.urandom(5000)
+            with open(path, "wb") as f:
+                f.write(data[:3000])
+            self.assertEqual(hashing.gost_hash_resumable(path, state_path, checkpoint_every=1000),
+                             hashing.new(data[:3000]).hexdigest())
+            with open(path, "ab") as f:
+                f.write(data[3000:])
+            self.assertEqual(hashing.gost_hash_resumable(path, state_path), hashing.new(data).hexdigest())
+            with open(state_path, "rb") as f:
+                self.assertEqual(hashing.StribogHash.from_state(f.read()).processed_bytes, 5000)
+            # Файл заменён другим: контрольная точка не подходит, хеширование начинается заново
+            with open(path, "wb") as f:
+                f.write(data[:4999] + b"\x00")
+            self.assertEqual(hashing.gost_hash_resumable(path, state_path),
+                             hashing.new(data[:4999] + b"\x00").hexdigest())
+            with open(path, "wb") as f:
+                f.write(data[:10])
+            self.assertEqual(hashing.gost_hash_resumable(path, state_path), hashing.new(data[:10]).hexdigest())
+            with self.assertRaises(ValueError):
+                hashing.gost_hash_resumable(path, state_path, digest_size=32)
+
+    def test_gost_hash_resumable_discards_corrupted_state(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "log.bin")
+            state_path = os.path.join(tmpdir, "log.state")
+            data = os.urandom(3000)
+            with open(path, "wb") as f:
+                f.write(data)
+            hashing.gost_hash_resumable(path, state_path)
+            with open(state_path, "rb") as f:
+                good = f.read()
+            for corrupted in (b"", good[:100], good + b"x", b"BADMAGIC" + good[8:]):
+                with open(state_path, "wb") as f:
+                    f.write(corrupted)
+                self.assertEqual(hashing.gost_hash_resumable(path, state_path), hashing.new(data).hexdigest())
+                with open(state_path, "rb") as f:
+                    self.assertEqual(f.read(), good)
+            self.assertFalse(os.path.exists(state_path + ".tmp"))
+
+    def test_gost_hash_resumable_replaced_at_block_boundary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "log.bin")
+            state_path = os.path.join(tmpdir, "log.state")
+            expected = hashing.new(b"B" * 2048).hexdigest()
+            # Смещение точки выровнено по блоку: незавершённого блока для сравнения нет
+            with open(path, "wb") as f:
+                f.write(b"A" * 1024)
+            hashing.gost_hash_resumable(path, state_path)
+            with open(path, "wb") as f:
+                f.write(b"B" * 2048)
+            self.assertEqual(hashing.gost_hash_resumable(path, state_path), expected)
+            # Другой файл с теми же байтами до смещения (новый inode)
+            other = os.path.join(tmpdir, "other.bin")
+            with open(other, "wb") as f:
+                f.write(b"B" * 4096)
+            os.replace(other, path)
+            self.assertEqual(hashing.gost_hash_resumable(path, state_path), hashing.new(b"B" * 4096).hexdigest())
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                self.assertEqual(hashing._load_checkpoint(state_path, f, st, 64).processed_bytes, 4096)
+                # Точка без отпечатка (старый формат) не подходит
+                hashing.save_state(state_path, hashing.new(b"B" * 4096))
+                self.assertIsNone(hashing._load_checkpoint(state_path, f, st, 64))
+
+    def test_pipe_and_socket_streams(self):
+        data = os.urandom(300_000)
+        expected = hashing.new(data).hexdigest()
+
+        read_fd, write_fd = os.pipe()
+
+        def feed_pipe():
+            with open(write_fd, "wb") as w:
+                w.write(data)
+        writer = threading.Thread(target=feed_pipe)
+        writer.start()
+        with open(read_fd, "rb", buffering=0) as r:
+            self.assertEqual(hashing.gost_hash(r), expected)
+        writer.join()
+
+        left, right = socket.socketpair()
+
+        def feed_socket():
+            with left:
+                left.sendall(data)
+        writer = threading.Thread(target=feed_socket)
+        writer.start()
+        with right:
+            self.assertEqual(hashing.gost_hash(right), expected)
+        writer.join()
+
+        class ReadOnly:
+            def __init__(self, raw):
+                self.read = io.BytesIO(raw).read
+        self.assertEqual(hashing.gost_hash(ReadOnly(data)), expected)
+        with self.assertRaises(TypeError):
+            hashing.gost_hash(io.StringIO("text"))
+
+    def test_read_ahead_pipeline(self):
+        data = os.urandom(70_000)
+        expected = hashing.new(data).hexdigest()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            for chunk_size in (63, 1000, 64 * 1024, 10 ** 6):
+                self.assertEqual(hashing.gost_hash(path, read_ahead=True, chunk_size=chunk_size), expected)
+            stats = hashing.HashStats()
+            self.assertEqual(hashing.gost_hash(path, stats=stats, chunk_size=4096), expected)
+            self.assertEqual(stats.bytes, len(data))
+            with open(path, "rb") as f:
+                self.assertEqual(hashing.gost_hash(f, read_ahead=False, chunk_size=777), expected)
+        self.assertEqual(hashing.gost_hash(io.BytesIO(data), read_ahead=True, chunk_size=5000), expected)
+
+    def test_read_ahead_small_files_skip_thread(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.bin")
+            with patch.object(threading, "Thread", side_effect=AssertionError("thread started")):
+                for data in (b"", b"test data for gost hash", b"x" * 5000):
+                    with open(path, "wb") as f:
+                        f.write(data)
+                    self.assertEqual(hashing.gost_hash(path, read_ahead=True), hashing.new(data).hexdigest())
+                    with open(path, "rb") as f:
+                        self.assertEqual([len(c) for c in hashing._iter_chunks(f, read_ahead=True)],
+                                         [len(data)] if data else [])
+            # Файл длиннее порции идёт через конвейер
+            data = os.urandom(10_000)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(hashing.gost_hash(path, read_ahead=True, chunk_size=4096), hashing.new(data).hexdigest())
+
+    def test_read_ahead_errors_and_cancel(self):
+
+        class Failing(io.RawIOBase):
+            def readable(self):
+                return True
+
+            def readinto(self, buffer):
+                raise OSError("disk error")
+        with self.assertRaises(OSError):
+            hashing.gost_hash(Failing(), read_ahead=True)
+
+        class Cancelled(Exception):
+            pass
+
+        def progress(done, stats):
+            raise Cancelled()
+        before = threading.active_count()
+        with self.assertRaises(Cancelled):
+            hashing.gost_hash(io.BytesIO(b"x" * 100_000), progress=progress, progress_every=1000,
+                              read_ahead=True, chunk_size=1000)
+        for _ in range(100):
+            if threading.active_count() <= before:
+                break
+            time.sleep(0.01)
+        self.assertLessEqual(threading.active_count(), before)
+
+    def test_read_ahead_cancel_mid_file_joins_reader(self):
+
+        class Cancelled(Exception):
+            pass
+
+        def progress(done, stats):
+            raise Cancelled()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(200_000))
+            with self.assertRaises(Cancelled):
+                hashing.gost_hash(path, progress=progress, progress_every=1000, read_ahead=True, chunk_size=4096)
+
+            class SlowFile(io.FileIO):
+                """Файл, чтение которого занимает заметное время."""
+                def readinto(self, buffer):
+                    time.sleep(0.05)
+                    return super().readinto(buffer)
+            # Генератор брошен посреди файла, пока читатель внутри readinto
+            with SlowFile(path, "rb") as f:
+                chunks = hashing._iter_chunks(f, read_ahead=True, chunk_size=4096)
+                next(chunks)
+                next(chunks)
+                chunks.close()
+        # Без ожидания: поток должен быть завершён к моменту выхода из генератора
+        self.assertEqual([t for t in threading.enumerate() if t.name == "hashing-read-ahead"], [])
+
+    def test_gost_hash_multi_single_read(self):
+        data = b"test data for gost hash"
+        stream = io.BytesIO(data)
+        stats = hashing.HashStats()
+        result = hashing.gost_hash_multi(stream, stats=stats)
+        self.assertEqual(result, {"streebog256": self.VECTORS[(data, 32)], "streebog512": self.VECTORS[(data, 64)]})
+        self.assertEqual(stats.bytes, len(data))
+        self.assertEqual(hashing.gost_hash(io.BytesIO(data), digest_size=32), self.VECTORS[(data, 32)])
+
+    def test_module_compare_hashes(self):
+        self.assertTrue(hashing.compare_hashes("ABC123", " abc123\n"))
+        self.assertFalse(hashing.compare_hashes("abc123", "def456"))
+        self.assertFalse(hashing.compare_hashes("abc123", None))
+
+    def test_invalid_digest_size(self):
+        with self.assertRaises(ValueError):
+            hashing.new(digest_size=48)
+
+@requires_binary
+class TestWorkerPool(unittest.TestCase):
+    EXPECTED = TestStribogEngine.VECTORS[(b"test data for gost hash", 64)]
+
+    def test_worker_file_and_bytes(self):
+        with tempfile.TemporaryDirectory() as tmpdir, GostWorker() as worker:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(b"test data for gost hash")
+            self.assertEqual(worker.hash_file(file_path), self.EXPECTED)
+            self.assertEqual(worker.hash_bytes(b"test data for gost hash"), self.EXPECTED)
+            with self.assertRaises(RuntimeError):
+                worker.hash_file(os.path.join(tmpdir, "missing.bin"))
+            # После ошибки воркер продолжает обслуживать запросы
+            self.assertEqual(worker.hash_bytes(b""), TestStribogEngine.VECTORS[(b"", 64)])
+
+    def test_pool_reuses_workers(self):
+        with WorkerPool(size=2) as pool:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(pool.hash_bytes, [b"test data for gost hash"] * 32))
+            self.assertEqual(results, [self.EXPECTED] * 32)
+            self.assertLessEqual(len(pool._idle), 2)
+
+@requires_binary
+class TestConcurrentBinary(unittest.TestCase):
+    def test_parallel_calls_do_not_touch_cwd(self):
+        orig_cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(8):
+                path = os.path.join(tmpdir, f"file{i}.bin")
+                with open(path, "wb") as f:
+                    f.write(os.urandom(100 + i))
+                paths.append(path)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(gost_hash_by_binary, paths))
+            self.assertEqual(results, [hashing.gost_hash(p) for p in paths])
+            self.assertEqual(sorted(os.listdir(tmpdir)), sorted(os.path.basename(p) for p in paths))
+        self.assertEqual(os.getcwd(), orig_cwd)
+
+    def test_binary_stats(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(b"a" * 1000)
+            stats = hashing.HashStats()
+            self.assertEqual(gost_hash_by_binary(file_path, stats=stats), hashing.gost_hash(file_path))
+            self.assertEqual(stats.bytes, 1000)
+            self.assertEqual(stats.blocks, 1000 // 64 + 3)
+
+    def test_both_by_binary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(os.urandom(3000))
+            self.assertEqual(gost_hash_both_by_binary(file_path), hashing.gost_hash_multi(file_path))
+
+    def test_stream_by_binary(self):
+        data = os.urandom(200_000)
+        self.assertEqual(gost_hash_stream_by_binary(io.BytesIO(data)), hashing.new(data).hexdigest())
+        self.assertEqual(gost_hash_stream_by_binary(io.BytesIO(b"")), hashing.new(b"").hexdigest())
+
+    def test_binary_resumes_python_state(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "log.bin")
+            state_path = os.path.join(tmpdir, "log.state")
+            data = os.urandom(2000)
+            with open(file_path, "wb") as f:
+                f.write(data[:1234])
+            hashing.gost_hash_resumable(file_path, state_path)
+            with open(file_path, "ab") as f:
+                f.write(data[1234:])
+            self.assertEqual(gost_hash_by_binary(file_path, state_path=state_path), hashing.new(data).hexdigest())
+            # Отпечаток файла в резерве заголовка совпадает с тем, что записывает Python
+            python_state = os.path.join(tmpdir, "python.state")
+            hashing.gost_hash_resumable(file_path, python_state)
+            with open(state_path, "rb") as f, open(python_state, "rb") as g:
+                state = f.read()
+                self.assertEqual(state, g.read())
+            self.assertEqual(state[:10] + bytes(6) + state[16:], hashing.new(data).export_state())
+
+    def test_binary_discards_corrupted_state(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "log.bin")
+            state_path = os.path.join(tmpdir, "log.state")
+            data = os.urandom(3000)
+            with open(file_path, "wb") as f:
+                f.write(data)
+            hashing.gost_hash_resumable(file_path, state_path)
+            with open(state_path, "rb") as f:
+                good = f.read()
+            for corrupted in (b"", good[:100], good + b"x", b"BADMAGIC" + good[8:]):
+                with open(state_path, "wb") as f:
+                    f.write(corrupted)
+                self.assertEqual(gost_hash_by_binary(file_path, state_path=state_path), hashing.new(data).hexdigest())
+                with open(state_path, "rb") as f:
+                    self.assertEqual(f.read(), good)
+
+    def test_binary_restarts_on_replaced_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "log.bin")
+            state_path = os.path.join(tmpdir, "log.state")
+            with open(file_path, "wb") as f:
+                f.write(b"A" * 1024)
+            gost_hash_by_binary(file_path, state_path=state_path)
+            with open(file_path, "wb") as f:
+                f.write(b"B" * 2048)
+            self.assertEqual(gost_hash_by_binary(file_path, state_path=state_path),
+                             hashing.new(b"B" * 2048).hexdigest())
+
+    def test_hash_many(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(10):
+                path = os.path.join(tmpdir, f"file{i}.bin")
+                with open(path, "wb") as f:
+                    f.write(bytes([i]) * (i * 30))
+                paths.append(path)
+            self.assertEqual(hash_many(paths, max_workers=3), [hashing.gost_hash(p) for p in paths])
+        self.assertEqual(hash_many([]), [])
+
+class TestAsyncHashing(unittest.TestCase):
+    def test_gost_hash_async_executor(self):
+        data = b"test data for gost hash"
+        expected = TestStribogEngine.VECTORS[(data, 64)]
+        self.assertEqual(asyncio.run(hashing.gost_hash_async(io.BytesIO(data))), expected)
+        with self.assertRaises(TypeError):
+            asyncio.run(hashing.gost_hash_async(12345))
+
+    @requires_binary
+    def test_gost_hash_async_binary(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(b"test data for gost hash")
+            result = asyncio.run(hashing.gost_hash_async(file_path, binary_path=default_binary_path()))
+            self.assertEqual(result, TestStribogEngine.VECTORS[(b"test data for gost hash", 64)])
+            with self.assertRaises(RuntimeError):
+                asyncio.run(hashing.gost_hash_async(os.path.join(tmpdir, "missing.bin"),
+                                                    binary_path=default_binary_path()))
+
+    def test_gost_hash_many_async(self):
+
+        async def collect(inputs):
+            return [pair async for pair in hashing.gost_hash_many_async(inputs, concurrency=3)]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(7):
+                path = os.path.join(tmpdir, f"file{i}.bin")
+                with open(path, "wb") as f:
+                    f.write(bytes([i]) * i)
+                paths.append(path)
+            results = dict(asyncio.run(collect(paths)))
+        self.assertEqual(results, {p: hashing.new(bytes([i]) * i).hexdigest() for i, p in enumerate(paths)})
+
+class TestCommandLine(unittest.TestCase):
+    ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run_cli(self, *args, input=b""):
+        return subprocess.run([sys.executable, "-m", "hashing", *args], input=input, capture_output=True,
+                              cwd=self.ROOT)
+
+    def test_paths_stdin_and_errors(self):
+        data = b"test data for gost hash"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a\nb.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            result = self.run_cli(path, "-", os.path.join(tmpdir, "missing"), input=b"")
+            self.assertEqual(result.returncode, 1)
+            lines = result.stdout.decode().splitlines()
+            self.assertEqual(lines[0], TestStribogEngine.VECTORS[(data, 64)] + "  " + path.replace("\n", "\\n"))
+            self.assertEqual(lines[1], TestStribogEngine.VECTORS[(b"", 64)] + "  -")
+            self.assertIn(b"missing", result.stderr)
+
+        result = self.run_cli("--256", input=data)
+        self.assertEqual(result.stdout, (TestStribogEngine.VECTORS[(data, 32)] + "  -\n").encode())
+
+    def test_files_from_nul_separated(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(tmpdir, f"f {i}"))
+                with open(paths[-1], "wb") as f:
+                    f.write(bytes([i]) * 100 * i)
+            listing = "\0".join(paths).encode() + b"\0"
+            result = self.run_cli("-z", "--backend", "python", "--files-from", "-", input=listing)
+            self.assertEqual(result.returncode, 0)
+            records = result.stdout.split(b"\0")
+            self.assertEqual(records[-1], b"")
+            self.assertEqual([r.decode() for r in records[:-1]],
+                             [hashing.gost_hash(p) + "  " + p for p in paths])
+
+    def test_usage_errors(self):
+        self.assertEqual(self.run_cli("--bogus").returncode, 2)
+        self.assertEqual(self.run_cli("--files-from", "-", "-").returncode, 2)
+        self.assertEqual(self.run_cli("--help").returncode, 0)
+
+
+@requires_library
+class TestNativeLibrary(unittest.TestCase):
+    def test_known_vectors(self):
+        for (data, size), expected in TestStribogEngine.VECTORS.items():
+            self.assertEqual(NativeStribogHash(data, size).hexdigest(), expected)
+
+    def test_buffer_types_and_copy(self):
+        data = os.urandom(1000)
+        h = NativeStribogHash()
+        h.update(memoryview(data)[:100])
+        h.update(bytearray(data[100:500]))
+        clone = h.copy()
+        h.update(array.array("B", data[500:]))
+        self.assertEqual(h.hexdigest(), hashing.new(data).hexdigest())
+        self.assertEqual(h.hexdigest(), h.hexdigest())
+        self.assertEqual(clone.hexdigest(), hashing.new(data[:500]).hexdigest())
+        with self.assertRaises(TypeError):
+            h.update("text")
+
+    def test_state_matches_python(self):
+        data = os.urandom(700)
+        for size in (32, 64):
+            for split in (0, 5, 63, 64, 100):
+                native = NativeStribogHash(data[:split], size)
+                self.assertEqual(native.export_state(), hashing.new(data[:split], size).export_state())
+                resumed = NativeStribogHash.from_state(hashing.new(data[:split], size).export_state())
+                resumed.update(data[split:])
+                self.assertEqual(resumed.hexdigest(), hashing.new(data, size).hexdigest())
+        with self.assertRaises(ValueError):
+            NativeStribogHash.from_state(b"x" * hashing.STATE_SIZE)
+
+    def test_hash_file_both(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(os.urandom(200_000))
+            self.assertEqual(gost_hash_both_by_library(file_path), hashing.gost_hash_multi(file_path))
+
+    def test_hash_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "data.bin")
+            with open(file_path, "wb") as f:
+                f.write(os.urandom(5000))
+            self.assertEqual(gost_hash_by_library(file_path), hashing.gost_hash(file_path))
+            self.assertEqual(gost_hash_by_library(file_path, digest_size=32),
+                             hashing.gost_hash(file_path, digest_size=32))
+            with self.assertRaises(RuntimeError):
+                gost_hash_by_library(os.path.join(tmpdir, "missing.bin"))
+            for digest_size in (16, 48, 128):
+                with self.assertRaises(ValueError):
+                    gost_hash_by_library(file_path, digest_size=digest_size)
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,80 @@
+import hmac
+import os
+import unittest
+from unittest.mock import patch
+
+import hashing
+import hmac_gost
+from helpers import requires_library
+
+
+def reference(key, msg, digest_size):
+    """HMAC по RFC 2104 через стандартный модуль hmac поверх StribogHash."""
+    return hmac.new(key, msg, lambda data=b"": hashing.new(data, digest_size)).digest()
+
+
+KEYS = [bytes(range(32)), b"k", bytes(64), os.urandom(100)]
+MESSAGES = [b"", b"\x01\x26\xbd\xb8\x78\x00\xaf\x21\x43\x41\x45\x65\x63\x78\x01\x00",
+            b"m" * 63, b"m" * 64, os.urandom(200)]
+
+
+class TestHmac(unittest.TestCase):
+    def test_matches_rfc2104_construction(self):
+        for digest_size in (32, 64):
+            for key in KEYS:
+                for msg in MESSAGES:
+                    self.assertEqual(hmac_gost.hmac_digest(key, msg, digest_size), reference(key, msg, digest_size))
+
+    def test_incremental_and_copy(self):
+        mac = hmac_gost.new(b"key", b"head ", digest_size=32)
+        clone = mac.copy()
+        mac.update(b"tail")
+        self.assertEqual(mac.hexdigest(), reference(b"key", b"head tail", 32).hex())
+        self.assertEqual(clone.digest(), reference(b"key", b"head ", 32))
+        self.assertEqual((mac.name, mac.digest_size, mac.block_size), ("hmac-streebog256", 32, 64))
+
+    def test_prepared_key_is_reused(self):
+        key = hmac_gost.prepare_key(b"cached key")
+        self.assertIs(hmac_gost.prepare_key(bytearray(b"cached key")), key)
+        self.assertIsNot(hmac_gost.prepare_key(b"cached key", 32), key)
+        # Сообщения начинаются с копии состояний ключа, блоки ключа повторно не сжимаются
+        with patch.object(hashing.StribogHash, "_compress", autospec=True,
+                          side_effect=hashing.StribogHash._compress) as compress:
+            key.digest(b"short")
+        self.assertEqual(compress.call_count, 2)
+
+    def test_batch(self):
+        messages = MESSAGES + [b"x" * n for n in range(0, 300, 37)]
+        for digest_size in (32, 64):
+            expected = [reference(KEYS[0], m, digest_size) for m in messages]
+            self.assertEqual(hmac_gost.hmac_batch(KEYS[0], messages, digest_size), expected)
+            with patch.dict("sys.modules", {"numpy": None}):
+                self.assertEqual(hmac_gost.hmac_batch(KEYS[0], messages, digest_size), expected)
+        self.assertEqual(hmac_gost.hmac_batch(b"k", []), [])
+
+    def test_batch_prefix(self):
+        prefix = hashing.new(b"p" * 128)
+        messages = [b"", b"a", b"b" * 64, b"c" * 130]
+        expected = []
+        for m in messages:
+            h = prefix.copy()
+            h.update(m)
+            expected.append(h.hexdigest())
+        self.assertEqual(hashing.gost_hash_batch(messages, prefix=prefix), expected)
+        with self.assertRaises(ValueError):
+            hashing.gost_hash_batch(messages, prefix=hashing.new(b"p" * 10))
+
+    def test_invalid_digest_size(self):
+        with self.assertRaises(ValueError):
+            hmac_gost.HmacKey(b"k", 48)
+
+    @requires_library
+    def test_native(self):
+        for key in KEYS:
+            self.assertEqual(hmac_gost.hmac_digest(key, MESSAGES[4], native=True), reference(key, MESSAGES[4], 64))
+        self.assertEqual(hmac_gost.hmac_batch(KEYS[1], MESSAGES, 32, native=True),
+                         [reference(KEYS[1], m, 32) for m in MESSAGES])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import hashing
+import manifest
+
+
+class TestTreeHasher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.files = {
+            "a.bin": b"a" * 10,
+            "sub/b.bin": b"b" * 300,
+            "sub/deeper/c d.bin": b"",
+            "sub/deeper/new\nline.bin": b"x",
+        }
+        for rel, data in self.files.items():
+            path = os.path.join(self.root, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_files(self):
+        found = dict(manifest.iter_files(self.root))
+        self.assertEqual(found, {rel: len(data) for rel, data in self.files.items()})
+
+    def test_iter_files_onerror(self):
+        errors = []
+        self.assertEqual(list(manifest.iter_files(os.path.join(self.root, "missing"), onerror=errors.append)), [])
+        self.assertIsInstance(errors[0], FileNotFoundError)
+        with self.assertRaises(FileNotFoundError):
+            list(manifest.iter_files(os.path.join(self.root, "missing")))
+
+    def test_hash_tree(self):
+        results = {rel: (size, digest) for rel, size, digest in manifest.hash_tree(self.root, max_workers=2)}
+        expected = {rel: (len(data), hashing.new(data).hexdigest()) for rel, data in self.files.items()}
+        self.assertEqual(results, expected)
+        results = {rel: (size, digest) for rel, size, digest in manifest.hash_tree(self.root, max_workers=1)}
+        self.assertEqual(results, expected)
+
+    def test_hash_tree_hash_func(self):
+        results = dict((rel, digest) for rel, _, digest in
+                       manifest.hash_tree(self.root, max_workers=2, hash_func=hashing.gost_hash_multi))
+        self.assertEqual(results["a.bin"]["streebog256"], hashing.new(b"a" * 10, 32).hexdigest())
+
+    def test_write_manifest_roundtrip(self):
+        out = io.StringIO()
+        self.assertEqual(manifest.write_manifest(self.root, out, max_workers=2), len(self.files))
+        entries = [manifest.parse_entry(line) for line in out.getvalue().splitlines()]
+        self.assertEqual({path: size for path, size, _ in entries},
+                         {rel: len(data) for rel, data in self.files.items()})
+
+    def test_unreadable_file_is_reported(self):
+        real = manifest.iter_files
+
+        def with_vanished(root):
+            yield from real(root)
+            yield "vanished.bin", 5
+
+        errors = []
+        with patch("manifest.iter_files", with_vanished):
+            out = io.StringIO()
+            self.assertEqual(manifest.write_manifest(self.root, out, max_workers=2, errors=errors), len(self.files))
+        self.assertEqual([rel for rel, _ in errors], ["vanished.bin"])
+        self.assertIsInstance(errors[0][1], FileNotFoundError)
+
+    def test_entry_keeps_trailing_whitespace(self):
+        for path in ("a ", "b\r", "c\t \n", "d\xa0", "e\\ ", "f\r\n"):
+            line = manifest.format_entry(path, 3, "00" * 64)
+            self.assertEqual(line.rstrip("\n"), line.rstrip())
+            self.assertEqual(manifest.parse_entry(line), (path, 3, "00" * 64))
+            self.assertEqual(manifest.parse_entry(line[:-1] + "\r\n"), (path, 3, "00" * 64))
+        self.assertEqual(manifest.parse_entry("00 1 a  \n"), ("a  ", 1, "00"))
+
+    def test_empty_tree(self):
+        with tempfile.TemporaryDirectory() as empty:
+            self.assertEqual(list(manifest.hash_tree(empty)), [])
+
+
+class TestVerifyManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for name in ("a.bin", "b.bin", "c.bin"):
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(name.encode() * 100)
+        buffer = io.StringIO()
+        manifest.write_manifest(self.root, buffer, max_workers=2)
+        self.manifest_path = os.path.join(self.root, "SUMS")
+        with open(self.manifest_path, "w") as out:
+            out.write(buffer.getvalue())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def verify(self, **kwargs):
+        return {path: status for _, path, status in
+                manifest.verify_manifest(self.manifest_path, max_workers=2, **kwargs)}
+
+    def test_all_ok(self):
+        self.assertEqual(self.verify(), {"a.bin": manifest.OK, "b.bin": manifest.OK, "c.bin": manifest.OK})
+
+    def test_detects_problems(self):
+        with open(os.path.join(self.root, "a.bin"), "r+b") as f:
+            f.write(b"X")
+        with open(os.path.join(self.root, "b.bin"), "ab") as f:
+            f.write(b"more")
+        os.unlink(os.path.join(self.root, "c.bin"))
+        with open(self.manifest_path, "a") as out:
+            out.write("not-a-hash 1 d.bin\n")
+            out.write("garbage\n\n")
+        results = list(manifest.verify_manifest(self.manifest_path, max_workers=2))
+        statuses = {path: status for _, path, status in results}
+        self.assertEqual(statuses["a.bin"], manifest.MISMATCH)
+        self.assertEqual(statuses["b.bin"], manifest.SIZE_MISMATCH)
+        self.assertEqual(statuses["c.bin"], manifest.MISSING)
+        self.assertEqual(statuses["d.bin"], manifest.MALFORMED)
+        self.assertEqual(manifest.summarize(results)[manifest.MALFORMED], 2)
+
+    def test_streebog256_entries(self):
+        path = os.path.join(self.root, "a.bin")
+        with open(self.manifest_path, "w") as out:
+            out.write(manifest.format_entry("a.bin", os.path.getsize(path), hashing.gost_hash(path, digest_size=32)))
+        self.assertEqual(self.verify(), {"a.bin": manifest.OK})
+
+    def test_trailing_whitespace_in_names(self):
+        names = ["trail ", "tab\t"] + (["cr\r"] if os.name != "nt" else [])
+        for name in names:
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(b"x")
+        with open(self.manifest_path, "w", newline="\n") as out:
+            for name in names:
+                out.write(manifest.format_entry(name, 1, hashing.new(b"x").hexdigest()))
+        self.assertEqual(self.verify(), {name: manifest.OK for name in names})
+
+    def test_fail_fast(self):
+        os.unlink(os.path.join(self.root, "a.bin"))
+        os.unlink(os.path.join(self.root, "b.bin"))
+        results = list(manifest.verify_manifest(self.manifest_path, max_workers=2, fail_fast=True))
+        self.assertEqual(results[-1][2], manifest.MISSING)
+        self.assertEqual(sum(status != manifest.OK for _, _, status in results), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import unittest
+
+import hashing
+import merkle
+from helpers import TempDirTestCase, requires_library
+
+
+def leaf(data):
+    return hashing.new(b"\x00" + data).digest()
+
+
+def node(left, right):
+    return hashing.new(b"\x01" + left + right).digest()
+
+
+class TestMerkleTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = os.urandom(1000)
+        self.path = self.make_file("image.bin", self.data)
+
+    def test_root(self):
+        tree = merkle.hash_file_tree(self.path, chunk_size=256, max_workers=2)
+        chunks = [self.data[i:i + 256] for i in range(0, 1000, 256)]
+        expected = node(node(leaf(chunks[0]), leaf(chunks[1])), node(leaf(chunks[2]), leaf(chunks[3])))
+        self.assertEqual(tree.root, expected)
+        self.assertEqual(merkle.hash_file_tree(self.path, chunk_size=256, max_workers=1).root, expected)
+
+    def test_odd_leaf_count_and_empty_file(self):
+        tree = merkle.hash_file_tree(self.path, chunk_size=384, max_workers=2)
+        a, b, c = (leaf(self.data[i:i + 384]) for i in (0, 384, 768))
+        self.assertEqual(tree.root, node(node(a, b), c))
+        empty = self.make_file("empty.bin", b"")
+        self.assertEqual(merkle.hash_file_tree(empty, chunk_size=64).root, leaf(b""))
+
+    def test_chunk_size_validation(self):
+        with self.assertRaises(ValueError):
+            merkle.hash_file_tree(self.path, chunk_size=100)
+
+    def test_save_load_and_verify_range(self):
+        tree = merkle.hash_file_tree(self.path, chunk_size=256, max_workers=2)
+        tree_path = self.tmp_path("image.merkle")
+        tree.save(tree_path)
+        loaded = merkle.MerkleTree.load(tree_path)
+        self.assertEqual((loaded.root, loaded.size, loaded.chunk_size), (tree.root, 1000, 256))
+        self.assertTrue(merkle.verify_range(self.path, loaded, 0, 1000))
+        with open(self.path, "r+b") as f:
+            f.seek(600)
+            f.write(b"X" if self.data[600:601] != b"X" else b"Y")
+        self.assertFalse(merkle.verify_range(self.path, loaded, 590, 20))
+        self.assertTrue(merkle.verify_range(self.path, loaded, 0, 512))
+        self.assertTrue(merkle.verify_range(self.path, loaded, 768, 232))
+        with self.assertRaises(ValueError):
+            merkle.verify_range(self.path, loaded, 900, 200)
+
+    def test_load_rejects_tampered_leaves(self):
+        tree_path = self.tmp_path("image.merkle")
+        merkle.hash_file_tree(self.path, chunk_size=256).save(tree_path)
+        with open(tree_path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)[0]
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes((last ^ 0xFF,)))
+        with self.assertRaises(ValueError):
+            merkle.MerkleTree.load(tree_path)
+
+    def test_load_rejects_inconsistent_header(self):
+        tree = merkle.hash_file_tree(self.path, chunk_size=256)
+        tree_path = self.tmp_path("image.merkle")
+        for chunk_size, size in ((0, 1000), (100, 1000), (256, 2000), (256, 700)):
+            with open(tree_path, "wb") as f:
+                f.write(merkle._HEADER.pack(merkle.MAGIC, chunk_size, size, len(tree.leaves), tree.root))
+                f.write(b"".join(tree.leaves))
+            with self.assertRaises(ValueError):
+                merkle.MerkleTree.load(tree_path)
+
+    @requires_library
+    def test_native_leaves(self):
+        python_tree = merkle.hash_file_tree(self.path, chunk_size=256, max_workers=1)
+        native_tree = merkle.hash_file_tree(self.path, chunk_size=256, max_workers=2, native=True)
+        self.assertEqual(native_tree.root, python_tree.root)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import io
+import os
+import shutil
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import hashing
+import manifest
+from helpers import TempDirTestCase
+
+if sys.platform.startswith('linux'):
+    import watch
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux-only")
+class TestTreeWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp_path("tree")
+        os.makedirs(os.path.join(self.root, "sub"))
+        self.write("a.txt", b"alpha")
+        self.write("sub/b.txt", b"beta")
+        self.hashed = []
+        self.watcher = watch.TreeWatcher(self.root, debounce=0.05, max_workers=1, hash_func=self.hash_func)
+        self.addCleanup(self.watcher.close)
+        self.initial = sorted(self.hashed)
+        self.hashed.clear()
+
+    def hash_func(self, path):
+        self.hashed.append(os.path.relpath(path, self.root).replace(os.sep, "/"))
+        return hashing.gost_hash(path)
+
+    def write(self, rel, data, mode="wb"):
+        with open(os.path.join(self.root, *rel.split("/")), mode) as f:
+            f.write(data)
+
+    def settle(self):
+        """Обрабатывает события, пока не останется ожидающих файлов."""
+        changed = set()
+        while True:
+            step = self.watcher.poll(timeout=0.3)
+            changed.update(step)
+            if not step and not self.watcher.pending():
+                return changed
+
+    def test_initial_manifest_and_dump(self):
+        snapshot = self.watcher.snapshot()
+        self.assertEqual(snapshot, {rel: (size, digest) for rel, size, digest in manifest.hash_tree(self.root, 1)})
+        self.assertEqual(self.initial, ["a.txt", "sub/b.txt"])
+        manifest_path = self.tmp_path("SUMS")
+        with open(manifest_path, "w", encoding="utf-8", newline="\n") as out:
+            self.assertEqual(self.watcher.dump(out), 2)
+        results = list(manifest.verify_manifest(manifest_path, self.root, max_workers=1))
+        self.assertEqual(manifest.summarize(results), {manifest.OK: 2})
+
+    def test_only_changed_file_is_rehashed_once(self):
+        for _ in range(5):
+            self.write("a.txt", b"more", "ab")
+        self.assertEqual(self.settle(), {"a.txt"})
+        self.assertEqual(self.hashed, ["a.txt"])
+        expected = hashing.gost_hash(os.path.join(self.root, "a.txt"))
+        self.assertEqual(self.watcher.get("a.txt"), (len(b"alpha") + 20, expected))
+
+    def test_new_files_and_directories(self):
+        os.makedirs(os.path.join(self.root, "new", "deep"))
+        self.write("new/deep/c.txt", b"gamma")
+        self.write("sub/d.txt", b"delta")
+        self.assertEqual(self.settle(), {"new/deep/c.txt", "sub/d.txt"})
+        self.assertEqual(self.watcher.get("new/deep/c.txt")[1], hashing.new(b"gamma").hexdigest())
+        self.write("new/deep/c.txt", b"changed")
+        self.settle()
+        self.assertEqual(self.watcher.get("new/deep/c.txt")[1], hashing.new(b"changed").hexdigest())
+
+    def test_rename_inside_tree_does_not_rehash(self):
+        os.rename(os.path.join(self.root, "a.txt"), os.path.join(self.root, "sub", "a2.txt"))
+        os.rename(os.path.join(self.root, "sub"), os.path.join(self.root, "moved"))
+        self.settle()
+        self.assertEqual(self.hashed, [])
+        self.assertEqual(sorted(self.watcher.snapshot()), ["moved/a2.txt", "moved/b.txt"])
+        self.write("moved/b.txt", b"after move")
+        self.assertEqual(self.settle(), {"moved/b.txt"})
+
+    def test_moved_in_and_out(self):
+        outside = self.tmp_path("outside.txt")
+        with open(outside, "wb") as f:
+            f.write(b"from outside")
+        os.rename(outside, os.path.join(self.root, "in.txt"))
+        shutil.move(os.path.join(self.root, "sub"), self.tmp_path("gone"))
+        self.settle()
+        self.assertEqual(self.hashed, ["in.txt"])
+        self.assertEqual(sorted(self.watcher.snapshot()), ["a.txt", "in.txt"])
+        # Каталог вне дерева больше не наблюдается
+        with open(self.tmp_path("gone/b.txt"), "ab") as f:
+            f.write(b"x")
+        self.assertEqual(self.watcher.poll(timeout=0.2), [])
+
+    def test_delete(self):
+        os.unlink(os.path.join(self.root, "a.txt"))
+        shutil.rmtree(os.path.join(self.root, "sub"))
+        self.assertEqual(self.settle(), {"a.txt", "sub/b.txt"})
+        self.assertEqual(self.watcher.snapshot(), {})
+
+    def test_overflow_rescan(self):
+        self.write("a.txt", b"rewritten")
+        self.watcher._inotify.read_events()
+        self.watcher._handle(-1, watch.IN_Q_OVERFLOW, 0, "", 0)
+        self.assertEqual(self.settle(), {"a.txt"})
+        self.assertEqual(self.hashed, ["a.txt"])
+
+    def test_overflow_rescan_survives_vanishing_directory(self):
+        real = os.scandir
+
+        def scandir(path):
+            if path.endswith("sub"):
+                raise FileNotFoundError(2, "vanished", path)
+            return real(path)
+
+        self.write("a.txt", b"rewritten")
+        self.watcher._inotify.read_events()
+        with patch("os.scandir", scandir):
+            self.watcher._handle(-1, watch.IN_Q_OVERFLOW, 0, "", 0)
+        self.assertEqual(self.settle(), {"a.txt"})
+        self.assertEqual(sorted(self.watcher.snapshot()), ["a.txt", "sub/b.txt"])
+
+    def test_failing_hash_func_does_not_stop_watching(self):
+        def flaky(path):
+            if os.path.basename(path).startswith("bad"):
+                raise RuntimeError("backend failed")
+            return hashing.gost_hash(path)
+
+        self.write("bad0.txt", b"initial")
+        seen = threading.Event()
+        with watch.TreeWatcher(self.root, debounce=0.05, max_workers=1, hash_func=flaky,
+                               on_change=lambda rel, value: rel == "good.txt" and seen.set()) as watcher:
+            self.assertIsNone(watcher.get("bad0.txt"))
+            self.assertIsInstance(watcher.errors["bad0.txt"], RuntimeError)
+            watcher.start()
+            self.write("bad1.txt", b"x")
+            self.write("good.txt", b"y")
+            self.assertTrue(seen.wait(5))
+            self.assertTrue(watcher._thread.is_alive())
+            self.assertEqual(watcher.get("good.txt"), (1, hashing.new(b"y").hexdigest()))
+            self.assertIn("bad1.txt", watcher.errors)
+            os.unlink(os.path.join(self.root, "bad1.txt"))
+            for _ in range(50):
+                if "bad1.txt" not in watcher.errors:
+                    break
+                time.sleep(0.05)
+            self.assertNotIn("bad1.txt", watcher.errors)
+
+    def test_background_thread(self):
+        seen = threading.Event()
+        changes = []
+
+        def on_change(rel, value):
+            changes.append((rel, value))
+            seen.set()
+
+        self.watcher.on_change = on_change
+        self.watcher.start()
+        self.write("sub/b.txt", b"updated")
+        self.assertTrue(seen.wait(5))
+        self.watcher.stop()
+        self.assertEqual(changes, [("sub/b.txt", (7, hashing.new(b"updated").hexdigest()))])
+        out = io.StringIO()
+        self.watcher.dump(out)
+        self.assertIn(" 7 sub/b.txt\n", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
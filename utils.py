@@ -2,10 +2,20 @@
 Вспомогательные функции: валидация и парсинг хеша.
 """
 
-def is_valid_hash(hash_str):
-    """Проверяет, что строка — корректный хеш (64 hex-символа)."""
-    raise NotImplementedError
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+# Длины hex-записи хешей Стрибог-256 и Стрибог-512
+HASH_HEX_LENGTHS = (64, 128)
+
+
+def is_valid_hash(hash_str, lengths=HASH_HEX_LENGTHS):
+    """Проверяет, что строка — корректный хеш (64 или 128 hex-символов)."""
+    if not isinstance(hash_str, str) or len(hash_str) not in lengths:
+        return False
+    return _HEX_DIGITS.issuperset(hash_str)
 
 def parse_reference_hash(input_str):
-    """Парсит эталонный хеш из пользовательского ввода (обрезает пробелы, \n и т.д.)."""
-    raise NotImplementedError 
\ No newline at end of file
+    """Парсит эталонный хеш из пользовательского ввода (обрезает пробелы, \\n и т.д.)."""
+    if not isinstance(input_str, str):
+        return ''
+    return input_str.strip()
@@ -0,0 +1,436 @@
+"""
+Режим наблюдения: живой манифест дерева каталогов на inotify (только Linux).
+
+Дерево хешируется один раз (manifest.hash_tree), дальше TreeWatcher получает
+события inotify и перехеширует только файлы, закрытые после записи
+(IN_CLOSE_WRITE) или перемещённые в дерево (IN_MOVED_TO). Серия записей в один
+файл сводится к одному хешированию: файл хешируется, когда по нему debounce
+секунд не было событий. Переименование внутри дерева переносит запись без
+перехеширования; при переполнении очереди событий (IN_Q_OVERFLOW) дерево
+сверяется по размеру и mtime.
+
+Манифест в памяти можно запросить (get, snapshot) или записать (dump) в любой
+момент, формат тот же, что у manifest.write_manifest.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+
+import hashing
+import manifest
+
+# Константы inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW
+
+# Пауза без событий по файлу (секунды), после которой он хешируется
+DEBOUNCE = 0.2
+
+_EVENT = struct.Struct('iIII')
+# Буфер чтения событий; вмещает событие с именем длины NAME_MAX
+_READ_SIZE = 64 * 1024
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def _errno_error(path=None):
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), path)
+
+
+class Inotify:
+    """Неблокирующий дескриптор inotify: add_watch, rm_watch, read_events."""
+
+    def __init__(self):
+        self._libc = _load_libc()
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise _errno_error()
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        """Наблюдение за каталогом; для уже наблюдаемого inode возвращается тот же дескриптор."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise _errno_error(path)
+        return wd
+
+    def rm_watch(self, wd):
+        # Ошибка не важна: ядро снимает наблюдение само, когда каталог удалён
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """Доступные события [(wd, mask, cookie, имя), ...]; пустой список, если событий нет."""
+        try:
+            data = os.read(self.fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            events.append((wd, mask, cookie, os.fsdecode(data[offset:offset + length].rstrip(b'\0'))))
+            offset += length
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _join(rel_dir, name):
+    return f'{rel_dir}/{name}' if rel_dir else name
+
+
+def _under(rel, prefix):
+    return rel == prefix or rel.startswith(prefix + '/')
+
+
+class TreeWatcher:
+    """Манифест дерева root, обновляемый по событиям inotify.
+
+    hash_func (по умолчанию hashing.gost_hash) хеширует и начальный манифест
+    (manifest.hash_tree в пуле из max_workers процессов), и изменившиеся файлы.
+    on_change(путь, (размер, хеш) или None) вызывается из потока наблюдения при
+    каждом изменении записи. События обрабатывает poll() или фоновый поток start().
+    Файлы, которые не удалось захешировать, в манифест не попадают, последняя
+    ошибка по каждому из них хранится в errors ({путь: исключение}).
+    """
+
+    def __init__(self, root, debounce=DEBOUNCE, max_workers=None, hash_func=None, on_change=None):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.hash_func = hash_func or hashing.gost_hash
+        self.on_change = on_change
+        self._entries = {}   # путь -> (размер, mtime_ns, хеш)
+        self._dirty = {}     # путь -> момент, не раньше которого файл хешируется
+        self._watches = {}   # дескриптор наблюдения -> путь каталога
+        self._moved = {}     # cookie -> (путь, каталог ли, записи, ожидающие пути) для IN_MOVED_FROM
+        self._changed = []
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._thread = None
+        self._inotify = Inotify()
+        self._wake_r, self._wake_w = os.pipe()
+        self._poller = select.poll()
+        self._poller.register(self._inotify.fd, select.POLLIN)
+        self._poller.register(self._wake_r, select.POLLIN)
+        try:
+            # Наблюдение ставится до начального хеширования: запись во время него даст событие
+            self._watch_tree('', strict=True)
+            now = time.monotonic()
+            errors = []
+            for rel, size, hexdigest in manifest.hash_tree(self.root, max_workers, errors, self.hash_func):
+                try:
+                    st = os.stat(self._path(rel), follow_symlinks=False)
+                except OSError:
+                    continue
+                self._entries[rel] = (size, st.st_mtime_ns, hexdigest)
+                if st.st_size != size:
+                    self._dirty[rel] = now
+            self.errors.update(errors)
+        except BaseException:
+            self.close()
+            raise
+
+    def _path(self, rel):
+        return os.path.join(self.root, *rel.split('/')) if rel else self.root
+
+    # --- запросы к манифесту ---
+
+    def get(self, rel):
+        """(размер, хеш) файла по пути относительно root или None."""
+        with self._lock:
+            entry = self._entries.get(rel)
+        return None if entry is None else (entry[0], entry[2])
+
+    def snapshot(self):
+        """Копия манифеста: {путь: (размер, хеш)}."""
+        with self._lock:
+            return {rel: (size, hexdigest) for rel, (size, _, hexdigest) in self._entries.items()}
+
+    def pending(self):
+        """Пути, ожидающие перехеширования."""
+        with self._lock:
+            return sorted(self._dirty)
+
+    def dump(self, out):
+        """Пишет манифест в текстовый поток out (формат manifest.format_entry), возвращает число файлов."""
+        entries = self.snapshot()
+        for rel in sorted(entries):
+            size, hexdigest = entries[rel]
+            out.write(manifest.format_entry(rel, size, hexdigest))
+        return len(entries)
+
+    # --- наблюдение ---
+
+    def _watch_tree(self, rel, strict=False):
+        """Ставит наблюдение на каталог rel и все его подкаталоги."""
+        stack = [rel]
+        while stack:
+            rel_dir = stack.pop()
+            path = self._path(rel_dir)
+            try:
+                self._watches[self._inotify.add_watch(path)] = rel_dir
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(_join(rel_dir, entry.name))
+            except OSError:
+                if strict and rel_dir == rel:
+                    raise
+
+    def _unwatch(self, prefix):
+        for wd, rel_dir in list(self._watches.items()):
+            if _under(rel_dir, prefix):
+                self._inotify.rm_watch(wd)
+                del self._watches[wd]
+
+    def _notify(self, rel, value):
+        self._changed.append(rel)
+        if self.on_change is not None:
+            self.on_change(rel, value)
+
+    def _mark(self, rel, now):
+        with self._lock:
+            self._dirty[rel] = now + self.debounce
+
+    def _forget(self, rel, is_dir):
+        """Убирает из манифеста файл или все файлы каталога, возвращает (записи, ожидающие пути)."""
+        with self._lock:
+            keys = [key for key in self._entries if _under(key, rel)] if is_dir else [rel]
+            entries = {key: self._entries.pop(key) for key in keys if key in self._entries}
+            dirty = [key for key in self._dirty if _under(key, rel)] if is_dir else [rel]
+            dirty = [key for key in dirty if self._dirty.pop(key, None) is not None]
+        for key in entries:
+            self._notify(key, None)
+        return entries, dirty
+
+    def _add_dir(self, rel, now):
+        """Новый каталог в дереве: наблюдение и хеширование всех его файлов."""
+        self._watch_tree(rel)
+        for sub, _ in manifest.iter_files(self._path(rel), onerror=lambda e: None):
+            self._mark(_join(rel, sub), now)
+
+    def _rename(self, moved, rel, now):
+        """Переименование внутри дерева: записи переносятся без перехеширования."""
+        old, is_dir, entries, dirty = moved
+        if is_dir:
+            for wd, rel_dir in self._watches.items():
+                if _under(rel_dir, old):
+                    self._watches[wd] = rel + rel_dir[len(old):]
+        with self._lock:
+            if not is_dir:
+                # Файл, заменённый переименованием, перехешировать уже не нужно
+                self._dirty.pop(rel, None)
+            renamed = {rel + key[len(old):]: entry for key, entry in entries.items()}
+            self._entries.update(renamed)
+            for key in dirty:
+                self._dirty[rel + key[len(old):]] = now + self.debounce
+        for key, (size, _, hexdigest) in renamed.items():
+            self._notify(key, (size, hexdigest))
+
+    def _rescan(self, now):
+        """После переполнения очереди событий: сверка дерева по размеру и mtime."""
+        self._watch_tree('')
+        current = {}
+        # Каталог может исчезнуть во время обхода; его файлы проверяются ниже по lexists
+        for rel, _ in manifest.iter_files(self.root, onerror=lambda e: None):
+            try:
+                current[rel] = os.stat(self._path(rel), follow_symlinks=False)
+            except OSError:
+                pass
+        with self._lock:
+            gone = [rel for rel in self._entries
+                    if rel not in current and not os.path.lexists(self._path(rel))]
+        for rel in gone:
+            self._forget(rel, False)
+        for rel, st in current.items():
+            with self._lock:
+                entry = self._entries.get(rel)
+            if entry is None or entry[:2] != (st.st_size, st.st_mtime_ns):
+                self._mark(rel, now)
+
+    def _handle(self, wd, mask, cookie, name, now):
+        if mask & IN_Q_OVERFLOW:
+            self._rescan(now)
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        rel_dir = self._watches.get(wd)
+        if rel_dir is None or not name:
+            return
+        rel = _join(rel_dir, name)
+        is_dir = bool(mask & IN_ISDIR)
+        if mask & (IN_MOVED_FROM | IN_DELETE):
+            with self._lock:
+                for key in [key for key in self.errors if _under(key, rel)]:
+                    del self.errors[key]
+        if mask & IN_MOVED_FROM:
+            self._moved[cookie] = (rel, is_dir) + self._forget(rel, is_dir)
+        elif mask & IN_DELETE:
+            self._forget(rel, is_dir)
+        elif mask & IN_MOVED_TO:
+            moved = self._moved.pop(cookie, None)
+            if moved is not None and moved[1] == is_dir:
+                self._rename(moved, rel, now)
+            elif is_dir:
+                self._add_dir(rel, now)
+            else:
+                self._mark(rel, now)
+        elif mask & IN_CREATE:
+            if is_dir:
+                self._add_dir(rel, now)
+        elif mask & IN_CLOSE_WRITE:
+            self._mark(rel, now)
+
+    def _process_events(self):
+        while True:
+            events = self._inotify.read_events()
+            if not events:
+                break
+            now = time.monotonic()
+            for event in events:
+                self._handle(*event, now)
+        # Каталоги, перемещённые за пределы дерева, больше не наблюдаются
+        for rel, is_dir, _, _ in self._moved.values():
+            if is_dir:
+                self._unwatch(rel)
+        self._moved.clear()
+
+    def _hash_file(self, rel):
+        """Хеширует файл: (размер, mtime_ns, хеш); None — файла нет или он не читается,
+        False — файл менялся во время хеширования."""
+        path = self._path(rel)
+        try:
+            before = os.stat(path, follow_symlinks=False)
+            if not stat.S_ISREG(before.st_mode):
+                return None
+            hexdigest = self.hash_func(path)
+            after = os.stat(path, follow_symlinks=False)
+        except Exception as e:
+            # Ошибка одного файла (в том числе RuntimeError бинарника или libstribog) не останавливает наблюдение
+            with self._lock:
+                self.errors[rel] = e
+            return None
+        with self._lock:
+            self.errors.pop(rel, None)
+        if (before.st_size, before.st_mtime_ns) != (after.st_size, after.st_mtime_ns):
+            return False
+        return after.st_size, after.st_mtime_ns, hexdigest
+
+    def _flush(self, now):
+        """Хеширует файлы, по которым истекла пауза debounce."""
+        with self._lock:
+            due = [rel for rel, at in self._dirty.items() if at <= now]
+            for rel in due:
+                del self._dirty[rel]
+        for rel in due:
+            entry = self._hash_file(rel)
+            if entry is False:
+                self._mark(rel, time.monotonic())
+            elif entry is None:
+                self._forget(rel, False)
+            else:
+                with self._lock:
+                    self._entries[rel] = entry
+                self._notify(rel, (entry[0], entry[2]))
+
+    def _next_due(self):
+        with self._lock:
+            return min(self._dirty.values(), default=None)
+
+    def _wait(self, timeout):
+        timeout_ms = None if timeout is None else max(0, int(timeout * 1000) + 1)
+        for fd, _ in self._poller.poll(timeout_ms):
+            if fd == self._wake_r:
+                os.read(self._wake_r, 4096)
+
+    def poll(self, timeout=None):
+        """Обрабатывает события и хеширует файлы, по которым истекла пауза debounce.
+
+        Возвращается, как только изменилась хотя бы одна запись, по истечении
+        timeout секунд (None — без ограничения) или после stop(). Возвращает
+        список изменившихся путей (удалённые — тоже).
+        """
+        changed = self._changed = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            self._flush(now)
+            if changed or self._stopping or (deadline is not None and now >= deadline):
+                return changed
+            waits = [at - now for at in (deadline, self._next_due()) if at is not None]
+            self._wait(min(waits) if waits else None)
+            self._process_events()
+
+    def start(self):
+        """Обрабатывает события в фоновом потоке до stop()."""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopping:
+            self.poll()
+
+    def stop(self):
+        self._stopping = True
+        os.write(self._wake_w, b'\0')
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        if self._thread is not None:
+            self.stop()
+        self._inotify.close()
+        if self._wake_r >= 0:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()